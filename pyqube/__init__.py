@@ -1,32 +1,27 @@
-from pyqube.events.clients import MQTTClient
-from pyqube.rest.clients import RestClient
-
-
-class QubeClient(MQTTClient, RestClient):
-    """
-    A unified client that combines both MQTT and REST capabilities.
-    It supports interacting with MQTT brokers for real-time messaging and with a REST API for general requests.
-    """
-
-    def __init__(
-        self,
-        api_key: str,
-        location_id: int,
-        broker_url: str = None,
-        broker_port: int = None,
-        base_url: str = None,
-        queue_management_manager: object = None
-    ):
-        """
-        Initializes the QubeClient by setting up both MQTT and REST components.
-
-        Args:
-            api_key (str): API key for client authentication.
-            location_id (int): Location ID to use in requests.
-            broker_url (str, optional): URL of the MQTT broker. Defaults to MQTTClient.DEFAULT_BROKER_URL.
-            broker_port (int, optional): Port of the MQTT broker. Defaults to MQTTClient.DEFAULT_BROKER_PORT.
-            base_url (str, optional): Base URL for REST API requests. Defaults to RestClient.API_BASE_URL.
-            queue_management_manager (object, optional): Manager used for queue management via REST API.
-        """
-        MQTTClient.__init__(self, api_key, location_id, broker_url, broker_port)
-        RestClient.__init__(self, api_key, location_id, queue_management_manager, base_url)
+import importlib
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from pyqube.client import QubeClient
+
+# Public names of the package, mapped to the module that defines them. Modules are only imported when a name is first
+# used, so that importing `pyqube` (or only `pyqube.types`) doesn't import paho-mqtt and requests.
+_LAZY_ATTRIBUTES = {
+    "QubeClient": "pyqube.client",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # Later lookups don't go through __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,282 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from pyqube.analytics.sketches import QuantileSketch, RollingSketch
+from pyqube.types import Answering, Queue, QueuesWaitingTicketsBatch
+
+
+logger = logging.getLogger(__name__)
+
+WAITING_TIME = "waiting_time"
+SERVICE_TIME = "service_time"
+WAITING_TICKETS = "waiting_tickets"
+
+QUEUE = "queue"
+COUNTER = "counter"
+
+
+@dataclass
+class KPIThresholds:
+    """
+    KPI thresholds of a queue, as configured on Qube's Queue.
+    """
+    wait_time: Optional[int] = None
+    service_time: Optional[int] = None
+    wait_count: Optional[int] = None
+
+    @classmethod
+    def from_queue(cls, queue: Queue) -> "KPIThresholds":
+        return cls(queue.kpi_wait_time, queue.kpi_service_time, queue.kpi_wait_count)
+
+
+@dataclass
+class KPIBreach:
+    """
+    A value that exceeded the KPI threshold of its queue.
+    """
+    queue: int
+    metric: str  # WAITING_TIME, SERVICE_TIME or WAITING_TICKETS
+    value: float
+    threshold: float
+    counter: Optional[int] = None
+    answering: Optional[Answering] = None
+
+
+@dataclass
+class KPISummary:
+    """
+    Summary of the values of a metric of a queue or counter in the rolling window.
+    """
+    count: int
+    mean: Optional[float]
+    p50: Optional[float]
+    p90: Optional[float]
+    p99: Optional[float]
+    max: Optional[float]
+    breaches: int  # Breaches since the engine started (only for queues)
+
+    @classmethod
+    def from_sketch(cls, sketch: QuantileSketch, breaches: int = 0) -> "KPISummary":
+        return cls(
+            count=sketch.count,
+            mean=sketch.mean,
+            p50=sketch.quantile(0.5),
+            p90=sketch.quantile(0.9),
+            p99=sketch.quantile(0.99),
+            max=sketch.max,
+            breaches=breaches,
+        )
+
+
+class KPIEngine:
+    """
+    Streaming aggregation of the waiting and service times of Answerings (e.g. returned by `end_answering` or
+    `call_next_ticket_ending_current`), per queue and per counter.
+    Each metric keeps a rolling window of mergeable quantile sketches (p50/p90/p99), so recording an Answering is
+    O(1), and values are compared with the KPI thresholds of their queue as they arrive, flagging breaches.
+    Sketches of many engines (e.g. one per process or location) can be exported and merged for fleet-wide rollups.
+    """
+
+    def __init__(
+        self,
+        window: float = 3600,
+        slots: int = 12,
+        relative_accuracy: float = 0.01,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initializes the KPI Engine.
+
+        Args:
+            window (float, optional): Length in seconds of the rolling windows. Defaults to 1 hour.
+            slots (int, optional): Number of sub-windows of each rolling window. Defaults to 12.
+            relative_accuracy (float, optional): Relative accuracy of quantiles. Defaults to 1%.
+            clock (Callable[[], float], optional): Clock in seconds. Defaults to time.time.
+        """
+        self.window = window
+        self.slots = slots
+        self.relative_accuracy = relative_accuracy
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sketches: Dict[Tuple[str, int, str], RollingSketch] = {}
+        self._thresholds: Dict[int, KPIThresholds] = {}
+        self._breaches: Dict[Tuple[int, str], int] = {}
+        self._breach_handlers: List[Callable[[KPIBreach], None]] = []
+
+    def set_queue_thresholds(self, queues: Iterable[Queue]) -> None:
+        """
+        Sets the KPI thresholds of queues from their `kpi_wait_time`, `kpi_service_time` and `kpi_wait_count`
+        (e.g. with the result of `list_queues` or `sync_queues`). Thresholds are in the same unit as the values.
+
+        Args:
+            queues (Iterable[Queue]): Queues.
+        """
+        with self._lock:
+            for queue in queues:
+                self._thresholds[queue.id] = KPIThresholds.from_queue(queue)
+
+    def on_breach(self):
+        """
+        Registers a handler called with each KPIBreach.
+
+        Returns:
+            The decorator for the handler function.
+        """
+
+        def decorator(func: Callable[[KPIBreach], None]):
+            self._breach_handlers.append(func)
+            return func
+
+        return decorator
+
+    def record_answering(self, answering: Answering) -> List[KPIBreach]:
+        """
+        Records the waiting and service times of an Answering in the windows of its queue and counter.
+
+        Args:
+            answering (Answering): The Answering. Times that are not known yet (None) are skipped.
+
+        Returns:
+            List[KPIBreach]: Breaches of the KPI thresholds of the queue.
+        """
+        breaches = []
+        now = self._clock()
+        with self._lock:
+            thresholds = self._thresholds.get(answering.queue)
+            for metric, value, threshold in (
+                (WAITING_TIME, answering.waiting_time, thresholds and thresholds.wait_time),
+                (SERVICE_TIME, answering.service_time, thresholds and thresholds.service_time),
+            ):
+                if value is None:
+                    continue
+                self._get_sketch(QUEUE, answering.queue, metric).add(value, now)
+                self._get_sketch(COUNTER, answering.counter, metric).add(value, now)
+                if threshold and value > threshold:
+                    breaches.append(
+                        KPIBreach(answering.queue, metric, value, threshold, answering.counter, answering)
+                    )
+                    self._count_breach(answering.queue, metric)
+        self._notify(breaches)
+        return breaches
+
+    def record_waiting_tickets(self, batch: QueuesWaitingTicketsBatch) -> List[KPIBreach]:
+        """
+        Records the number of waiting tickets of queues (e.g. from `on_queues_changed_waiting_number_batch`).
+
+        Args:
+            batch (QueuesWaitingTicketsBatch): Waiting tickets of each queue.
+
+        Returns:
+            List[KPIBreach]: Queues whose number of waiting tickets exceeds their `kpi_wait_count`.
+        """
+        breaches = []
+        now = self._clock()
+        with self._lock:
+            for queue_id, waiting_tickets in batch:
+                self._get_sketch(QUEUE, queue_id, WAITING_TICKETS).add(waiting_tickets, now)
+                thresholds = self._thresholds.get(queue_id)
+                if thresholds and thresholds.wait_count and waiting_tickets > thresholds.wait_count:
+                    breaches.append(KPIBreach(queue_id, WAITING_TICKETS, waiting_tickets, thresholds.wait_count))
+                    self._count_breach(queue_id, WAITING_TICKETS)
+        self._notify(breaches)
+        return breaches
+
+    def get_queue_summary(self, queue_id: int, metric: str = WAITING_TIME) -> KPISummary:
+        """
+        Summarizes a metric of a queue in the rolling window.
+
+        Args:
+            queue_id (int): Queue's id.
+            metric (str, optional): WAITING_TIME, SERVICE_TIME or WAITING_TICKETS. Defaults to WAITING_TIME.
+
+        Returns:
+            KPISummary: The summary.
+        """
+        with self._lock:
+            return KPISummary.from_sketch(
+                self._get_snapshot(QUEUE, queue_id, metric), self._breaches.get((queue_id, metric), 0)
+            )
+
+    def get_counter_summary(self, counter_id: int, metric: str = SERVICE_TIME) -> KPISummary:
+        """
+        Summarizes a metric of a counter in the rolling window.
+
+        Args:
+            counter_id (int): Counter's id.
+            metric (str, optional): WAITING_TIME or SERVICE_TIME. Defaults to SERVICE_TIME.
+
+        Returns:
+            KPISummary: The summary.
+        """
+        with self._lock:
+            return KPISummary.from_sketch(self._get_snapshot(COUNTER, counter_id, metric))
+
+    def export(self) -> dict:
+        """
+        Exports the sketches of the current windows as a JSON serializable dict, to be merged by other engines.
+
+        Returns:
+            dict: Sketches by entity ("queue" or "counter"), id and metric.
+        """
+        with self._lock:
+            return {
+                "sketches": [{
+                    "entity": entity,
+                    "id": entity_id,
+                    "metric": metric,
+                    "sketch": rolling_sketch.snapshot().to_dict(),
+                } for (entity, entity_id, metric), rolling_sketch in self._sketches.items()],
+            }
+
+    @staticmethod
+    def merge_exports(exports: Iterable[dict]) -> Dict[Tuple[str, int, str], QuantileSketch]:
+        """
+        Merges the exports of many engines into one sketch per entity, id and metric, for fleet-wide rollups.
+
+        Args:
+            exports (Iterable[dict]): Results of `export`.
+
+        Returns:
+            Dict[Tuple[str, int, str], QuantileSketch]: Merged sketches by entity, id and metric.
+        """
+        merged = {}
+        for export in exports:
+            for item in export["sketches"]:
+                key = (item["entity"], item["id"], item["metric"])
+                sketch = QuantileSketch.from_dict(item["sketch"])
+                merged[key] = merged[key].merge(sketch) if key in merged else sketch
+        return merged
+
+    def _get_sketch(self, entity: str, entity_id: int, metric: str) -> RollingSketch:
+        key = (entity, entity_id, metric)
+        sketch = self._sketches.get(key)
+        if sketch is None:
+            sketch = self._sketches[key] = RollingSketch(
+                self.window, self.slots, self.relative_accuracy, self._clock
+            )
+        return sketch
+
+    def _get_snapshot(self, entity: str, entity_id: int, metric: str) -> QuantileSketch:
+        sketch = self._sketches.get((entity, entity_id, metric))
+        return sketch.snapshot() if sketch else QuantileSketch(self.relative_accuracy)
+
+    def _count_breach(self, queue_id: int, metric: str) -> None:
+        self._breaches[(queue_id, metric)] = self._breaches.get((queue_id, metric), 0) + 1
+
+    def _notify(self, breaches: List[KPIBreach]) -> None:
+        for breach in breaches:
+            for handler in list(self._breach_handlers):
+                try:
+                    handler(breach)
+                except Exception:
+                    logger.exception("KPI breach handler failed.")
@@ -0,0 +1,242 @@
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class QuantileSketch:
+    """
+    Mergeable sketch of a distribution of non-negative values (e.g. waiting times) that answers quantiles with a
+    bounded relative error, using logarithmic buckets: a value x is counted in bucket ceil(log(x) / log(gamma)), with
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy).
+    Adding a value is O(1). Sketches with the same relative accuracy are merged by adding their buckets, so sketches
+    of many processes can be combined into one.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        """
+        Initializes the Quantile Sketch.
+
+        Args:
+            relative_accuracy (float, optional): Maximum relative error of quantiles (0 to 1). Defaults to 1%.
+            max_buckets (int, optional): Maximum number of buckets. When exceeded, the lowest buckets are collapsed,
+                so only the accuracy of the lowest quantiles degrades. Defaults to 2048.
+
+        Raises:
+            ValueError: If `relative_accuracy` is not between 0 and 1.
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("Relative accuracy must be between 0 and 1.")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0  # Values too small to be counted in a bucket (i.e. zero)
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, count: int = 1) -> None:
+        """
+        Adds a value to the sketch.
+
+        Args:
+            value (float): Non-negative value.
+            count (int, optional): Number of times the value is added. Defaults to 1.
+
+        Raises:
+            ValueError: If the value is negative.
+        """
+        if value < 0:
+            raise ValueError("Only non-negative values can be added.")
+        if value < 1e-9:
+            self.zero_count += count
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += count
+        self.sum += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def _collapse(self) -> None:
+        """Merges the two lowest buckets, keeping the number of buckets bounded."""
+        count = self.buckets.pop(min(self.buckets))
+        self.buckets[min(self.buckets)] += count
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Adds the values of another sketch to this one.
+
+        Args:
+            other (QuantileSketch): Sketch with the same relative accuracy.
+
+        Returns:
+            QuantileSketch: This sketch.
+
+        Raises:
+            ValueError: If the relative accuracies differ.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Only sketches with the same relative accuracy can be merged.")
+        if not other.count:
+            return self
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimates a quantile.
+
+        Args:
+            q (float): Quantile between 0 and 1 (e.g. 0.99 for p99).
+
+        Returns:
+            Optional[float]: The estimate, or None if the sketch is empty.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1.")
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                estimate = 2 * self.gamma**index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean of the values, or None if the sketch is empty."""
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self) -> dict:
+        """
+        Exports the sketch as a JSON serializable dict, to be merged in another process with `from_dict`.
+        """
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        """
+        Imports a sketch exported by `to_dict`.
+        """
+        sketch = cls(data["relative_accuracy"], data["max_buckets"])
+        sketch.buckets = {int(index): count for index, count in data["buckets"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.sum = data["sum"]
+        sketch.min = data["min"]
+        sketch.max = data["max"]
+        return sketch
+
+    def copy(self) -> "QuantileSketch":
+        """Returns a copy of the sketch."""
+        return QuantileSketch(self.relative_accuracy, self.max_buckets).merge(self)
+
+
+class RollingSketch:
+    """
+    Quantile sketch of the values of the last `window` seconds. The window is split into `slots` sub-windows, each
+    with its own sketch; adding a value is O(1), and the oldest sub-window is dropped as time advances.
+    """
+
+    def __init__(
+        self,
+        window: float = 3600,
+        slots: int = 12,
+        relative_accuracy: float = 0.01,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initializes the Rolling Sketch.
+
+        Args:
+            window (float, optional): Length of the window in seconds. Defaults to 1 hour.
+            slots (int, optional): Number of sub-windows. Values leave the window with a granularity of
+                `window / slots` seconds. Defaults to 12.
+            relative_accuracy (float, optional): Relative accuracy of the sketches. Defaults to 1%.
+            clock (Callable[[], float], optional): Clock in seconds. Defaults to time.time.
+        """
+        if window <= 0 or slots <= 0:
+            raise ValueError("Window and number of slots must be positive.")
+        self.window = window
+        self.slots = slots
+        self.relative_accuracy = relative_accuracy
+        self._slot_length = window / slots
+        self._clock = clock
+        self._sketches: List[Optional[QuantileSketch]] = [None] * slots
+        self._slot_ids: List[Optional[int]] = [None] * slots
+
+    def add(self, value: float, at: Optional[float] = None) -> None:
+        """
+        Adds a value to the window. Late values, whose time has already left the window (or whose sub-window was
+        reused by a newer one), are ignored, so they never reset the sub-window of newer values.
+
+        Args:
+            value (float): Non-negative value.
+            at (float, optional): Time of the value in seconds of the clock. Defaults to now.
+        """
+        now_slot_id = int(self._clock() // self._slot_length)
+        slot_id = now_slot_id if at is None else int(at // self._slot_length)
+        if slot_id <= now_slot_id - self.slots:
+            return
+        position = slot_id % self.slots
+        stored_slot_id = self._slot_ids[position]
+        if stored_slot_id is not None and stored_slot_id > slot_id:
+            return
+        if stored_slot_id != slot_id:
+            self._slot_ids[position] = slot_id
+            self._sketches[position] = QuantileSketch(self.relative_accuracy)
+        self._sketches[position].add(value)
+
+    def snapshot(self) -> QuantileSketch:
+        """
+        Returns a sketch of the values that are currently in the window.
+        """
+        current_slot_id = int(self._clock() // self._slot_length)
+        sketch = QuantileSketch(self.relative_accuracy)
+        for slot_id, slot_sketch in zip(self._slot_ids, self._sketches):
+            if slot_id is not None and current_slot_id - self.slots < slot_id <= current_slot_id:
+                sketch.merge(slot_sketch)
+        return sketch
+
+
+def merge_sketches(sketches: Iterable[QuantileSketch]) -> Optional[QuantileSketch]:
+    """
+    Merges sketches (e.g. of many processes or queues) into a new one.
+
+    Args:
+        sketches (Iterable[QuantileSketch]): Sketches with the same relative accuracy.
+
+    Returns:
+        Optional[QuantileSketch]: The merged sketch, or None if there were no sketches.
+    """
+    merged = None
+    for sketch in sketches:
+        merged = sketch.copy() if merged is None else merged.merge(sketch)
+    return merged
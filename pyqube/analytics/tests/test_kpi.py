@@ -0,0 +1,132 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+
+from pyqube.analytics.kpi import (
+    COUNTER,
+    QUEUE,
+    SERVICE_TIME,
+    WAITING_TICKETS,
+    WAITING_TIME,
+    KPIEngine,
+)
+from pyqube.decoders import decode
+from pyqube.testing.rest_server import MockQubeServer
+from pyqube.types import Answering, Queue, QueuesWaitingTicketsBatch
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestKPIEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockQubeServer()
+        self.clock = FakeClock()
+        self.engine = KPIEngine(window=60, slots=6, clock=self.clock)
+        # Thresholds of the mock server: kpi_wait_time=600, kpi_service_time=300 and kpi_wait_count=10
+        self.engine.set_queue_thresholds([decode(Queue, self.server.build_queue(1, 1))])
+
+    def build_answering(self, waiting_time, service_time, counter=1) -> Answering:
+        data = self.server.build_answering(1, 1)
+        data.update(waiting_time=waiting_time, service_time=service_time, counter=counter)
+        return decode(Answering, data)
+
+    def test_record_answering_updates_queue_and_counter_summaries(self):
+        for waiting_time in (100, 200, 300):
+            self.engine.record_answering(self.build_answering(waiting_time, 60))
+        self.engine.record_answering(self.build_answering(400, 120, counter=2))
+
+        queue_summary = self.engine.get_queue_summary(1, WAITING_TIME)
+        self.assertEqual(queue_summary.count, 4)
+        self.assertEqual(queue_summary.mean, 250)
+        self.assertAlmostEqual(queue_summary.p50, 200, delta=2)
+        self.assertEqual(queue_summary.max, 400)
+        self.assertEqual(queue_summary.breaches, 0)
+
+        counter_summary = self.engine.get_counter_summary(1, SERVICE_TIME)
+        self.assertEqual(counter_summary.count, 3)
+        self.assertAlmostEqual(counter_summary.p99, 60, delta=1)
+        self.assertEqual(self.engine.get_counter_summary(2, SERVICE_TIME).count, 1)
+
+    def test_unknown_times_are_skipped(self):
+        self.engine.record_answering(self.build_answering(100, None))
+
+        self.assertEqual(self.engine.get_queue_summary(1, WAITING_TIME).count, 1)
+        self.assertEqual(self.engine.get_queue_summary(1, SERVICE_TIME).count, 0)
+        self.assertIsNone(self.engine.get_queue_summary(1, SERVICE_TIME).p50)
+
+    def test_breaches_are_flagged_and_notified(self):
+        handler = MagicMock()
+        self.engine.on_breach()(handler)
+
+        answering = self.build_answering(700, 100)
+        breaches = self.engine.record_answering(answering)
+
+        self.assertEqual(len(breaches), 1)
+        self.assertEqual(breaches[0].queue, 1)
+        self.assertEqual(breaches[0].metric, WAITING_TIME)
+        self.assertEqual(breaches[0].value, 700)
+        self.assertEqual(breaches[0].threshold, 600)
+        self.assertEqual(breaches[0].answering, answering)
+        handler.assert_called_once_with(breaches[0])
+        self.assertEqual(self.engine.get_queue_summary(1, WAITING_TIME).breaches, 1)
+
+    def test_failing_breach_handler_does_not_stop_recording(self):
+        self.engine.on_breach()(MagicMock(side_effect=Exception("Handler failed")))
+        handler = MagicMock()
+        self.engine.on_breach()(handler)
+
+        with self.assertLogs("pyqube.analytics.kpi", level="ERROR"):
+            breaches = self.engine.record_answering(self.build_answering(100, 400))
+
+        handler.assert_called_once_with(breaches[0])
+        self.assertEqual(self.engine.get_queue_summary(1, SERVICE_TIME).count, 1)
+
+    def test_queues_without_thresholds_are_not_flagged(self):
+        data = self.server.build_answering(1, 1)
+        data.update(queue=2, waiting_time=10000)
+
+        self.assertEqual(self.engine.record_answering(decode(Answering, data)), [])
+
+    def test_record_waiting_tickets(self):
+        self.engine.set_queue_thresholds([decode(Queue, self.server.build_queue(1, 2))])
+        batch = QueuesWaitingTicketsBatch.decode([
+            {"queue": {"id": 1}, "waiting_tickets": 4},
+            {"queue": {"id": 2}, "waiting_tickets": 12},
+        ])
+
+        breaches = self.engine.record_waiting_tickets(batch)
+
+        self.assertEqual([(breach.queue, breach.value, breach.threshold) for breach in breaches], [(2, 12, 10)])
+        self.assertEqual(self.engine.get_queue_summary(1, WAITING_TICKETS).count, 1)
+
+    def test_rolling_window(self):
+        self.engine.record_answering(self.build_answering(100, 60))
+        self.clock.now = 30
+        self.engine.record_answering(self.build_answering(200, 60))
+
+        self.clock.now = 65
+        self.assertEqual(self.engine.get_queue_summary(1, WAITING_TIME).count, 1)
+        self.clock.now = 100
+        self.assertEqual(self.engine.get_queue_summary(1, WAITING_TIME).count, 0)
+
+    def test_merge_exports_of_many_engines(self):
+        other_engine = KPIEngine(window=60, slots=6, clock=self.clock)
+        self.engine.record_answering(self.build_answering(100, 60))
+        other_engine.record_answering(self.build_answering(300, 90))
+        other_engine.record_answering(self.build_answering(500, 90, counter=2))
+
+        exports = [json.loads(json.dumps(engine.export())) for engine in (self.engine, other_engine)]
+        merged = KPIEngine.merge_exports(exports)
+
+        self.assertEqual(merged[(QUEUE, 1, WAITING_TIME)].count, 3)
+        self.assertEqual(merged[(QUEUE, 1, WAITING_TIME)].mean, 300)
+        self.assertEqual(merged[(COUNTER, 1, SERVICE_TIME)].count, 2)
+        self.assertEqual(merged[(COUNTER, 2, SERVICE_TIME)].count, 1)
@@ -0,0 +1,141 @@
+import json
+import random
+import unittest
+
+from pyqube.analytics.sketches import QuantileSketch, RollingSketch, merge_sketches
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def exact_quantile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def setUp(self):
+        self.random = random.Random(42)
+        self.values = [self.random.expovariate(1 / 300) for _ in range(10000)]
+
+    def test_quantiles_within_relative_accuracy(self):
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in self.values:
+            sketch.add(value)
+
+        for q in (0.5, 0.9, 0.99):
+            exact = exact_quantile(self.values, q)
+            self.assertAlmostEqual(sketch.quantile(q), exact, delta=exact * 0.01)
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertAlmostEqual(sketch.mean, sum(self.values) / len(self.values))
+        self.assertAlmostEqual(sketch.quantile(0), min(self.values), delta=min(self.values) * 0.01)
+        self.assertAlmostEqual(sketch.quantile(1), max(self.values), delta=max(self.values) * 0.01)
+
+    def test_empty_sketch(self):
+        sketch = QuantileSketch()
+
+        self.assertIsNone(sketch.quantile(0.5))
+        self.assertIsNone(sketch.mean)
+
+    def test_zero_values(self):
+        sketch = QuantileSketch()
+        sketch.add(0, count=3)
+        sketch.add(10)
+
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+        self.assertAlmostEqual(sketch.quantile(1), 10)
+
+    def test_negative_value_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            QuantileSketch().add(-1)
+
+    def test_merge_equals_sketch_of_all_values(self):
+        first, second, both = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for index, value in enumerate(self.values):
+            (first if index % 2 else second).add(value)
+            both.add(value)
+
+        merged = merge_sketches([first, second])
+
+        self.assertEqual(merged.buckets, both.buckets)
+        self.assertEqual(merged.count, both.count)
+        self.assertEqual(merged.quantile(0.99), both.quantile(0.99))
+        self.assertEqual(first.count + second.count, len(self.values))  # Inputs are not modified
+
+    def test_merge_with_different_accuracy_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+    def test_max_buckets_collapses_lowest_buckets(self):
+        sketch = QuantileSketch(relative_accuracy=0.01, max_buckets=10)
+        for value in range(1, 1000):
+            sketch.add(value)
+
+        self.assertEqual(len(sketch.buckets), 10)
+        self.assertEqual(sketch.count, 999)
+        self.assertAlmostEqual(sketch.quantile(1), 999)
+
+    def test_to_dict_and_from_dict(self):
+        sketch = QuantileSketch()
+        for value in self.values[:100]:
+            sketch.add(value)
+
+        restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+
+        self.assertEqual(restored.buckets, sketch.buckets)
+        self.assertEqual(restored.quantile(0.9), sketch.quantile(0.9))
+
+
+class TestRollingSketch(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sketch = RollingSketch(window=60, slots=6, clock=self.clock)
+
+    def test_values_leave_the_window(self):
+        self.sketch.add(100)
+        self.clock.now = 30
+        self.sketch.add(200)
+
+        self.assertEqual(self.sketch.snapshot().count, 2)
+
+        self.clock.now = 65
+        self.assertEqual(self.sketch.snapshot().count, 1)
+        self.assertAlmostEqual(self.sketch.snapshot().quantile(0.5), 200)
+
+        self.clock.now = 95
+        self.assertEqual(self.sketch.snapshot().count, 0)
+
+    def test_late_and_out_of_order_values(self):
+        self.clock.now = 100
+        for _ in range(100):
+            self.sketch.add(100)
+        self.sketch.add(300, at=95)
+
+        self.sketch.add(200, at=30)  # Left the window, and maps to the slot of the current values
+        self.sketch.add(200, at=40)
+
+        self.assertEqual(self.sketch.snapshot().count, 101)
+
+        self.clock.now = 45
+        self.sketch.add(200)  # The clock went back: its slot holds newer values
+
+        self.clock.now = 100
+        self.assertEqual(self.sketch.snapshot().count, 101)
+
+    def test_reused_slots_are_reset(self):
+        self.sketch.add(100)
+        self.clock.now = 60
+        self.sketch.add(200)
+
+        snapshot = self.sketch.snapshot()
+
+        self.assertEqual(snapshot.count, 1)
+        self.assertAlmostEqual(snapshot.quantile(0.5), 200)
@@ -0,0 +1,159 @@
+import dataclasses
+import threading
+import typing
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+)
+
+
+T = TypeVar("T")
+
+DECODE_HOOK = "decode"  # Name of the classmethod that a model may define to decode itself from parsed JSON
+
+_decoders: Dict[Any, Callable[[dict], Any]] = {}
+_decoders_lock = threading.RLock()
+
+
+def get_decoder(model: Type[T]) -> Callable[[dict], T]:
+    """
+    Returns the decoder of a model, compiling it on first use.
+    Args:
+        model (Type[T]): Model's class.
+    Returns:
+        Callable[[dict], T]: Function that builds an instance of the model from a dict.
+    """
+    try:
+        return _decoders[model]
+    except KeyError:
+        pass
+    with _decoders_lock:
+        if model not in _decoders:
+            _decoders[model] = compile_decoder(model)
+        return _decoders[model]
+
+
+def decode(model: Type[T], data: dict) -> T:
+    """
+    Builds an instance of a model from a dict with its compiled decoder. See compile_decoder.
+    Args:
+        model (Type[T]): Model's class.
+        data (dict): Model's data, e.g. a parsed JSON payload.
+    Returns:
+        T: The instance.
+    Raises:
+        TypeError: If a required field is missing.
+    """
+    return get_decoder(model)(data)
+
+
+def decode_list(model: Type[T], items: Iterable[dict]) -> List[T]:
+    """
+    Builds instances of a model from dicts with its compiled decoder. See compile_decoder.
+    Args:
+        model (Type[T]): Model's class.
+        items (Iterable[dict]): Models' data.
+    Returns:
+        List[T]: The instances.
+    Raises:
+        TypeError: If a required field is missing.
+    """
+    decoder = get_decoder(model)
+    return [decoder(item) for item in items]
+
+
+def _is_optional(type_hint) -> bool:
+    """Returns True if a field is annotated with Optional."""
+    return typing.get_origin(type_hint) is typing.Union and type(None) in typing.get_args(type_hint)
+
+
+def _get_nested_model(type_hint) -> Optional[type]:
+    """Returns the dataclass of a field annotated with a dataclass or Optional of a dataclass, if any."""
+    if typing.get_origin(type_hint) is typing.Union:
+        arguments = [argument for argument in typing.get_args(type_hint) if argument is not type(None)]
+        type_hint = arguments[0] if len(arguments) == 1 else None
+    return type_hint if isinstance(type_hint, type) and dataclasses.is_dataclass(type_hint) else None
+
+
+def compile_decoder(model: Type[T]) -> Callable[[dict], T]:
+    """
+    Compiles the decoder of a model. For dataclasses, the source of a function that reads each field from the dict is
+    generated and compiled once, so that:
+        - keys that are not fields of the model are ignored, instead of raising TypeError like `Model(**data)`;
+        - missing fields take their default values (None for Optional fields without one), and other missing fields
+          raise TypeError;
+        - fields annotated with another dataclass (e.g. `Answering.ticket`) are decoded with its decoder;
+        - `__post_init__` (e.g. conversion of datetimes) runs as it does when the model is initialized.
+    Instances are created without calling `__init__`, so custom initializers are bypassed.
+    Models with a `decode` classmethod are decoded by it, with the parsed JSON value (which may not be a dict), and
+    other classes are initialized with `Model(**data)`.
+    Args:
+        model (Type[T]): Model's class.
+    Returns:
+        Callable[[dict], T]: Function that builds an instance of the model from a dict.
+    """
+    hook = getattr(model, DECODE_HOOK, None)
+    if hook is not None:
+        return hook
+    if not (isinstance(model, type) and dataclasses.is_dataclass(model)):
+        return lambda data: model(**data)
+
+    type_hints = typing.get_type_hints(model)
+    namespace = {
+        "model": model,
+        "new": object.__new__,
+    }
+    required = []
+    lines = []
+    for field in dataclasses.fields(model):
+        if not field.init:
+            continue
+        name = field.name
+        if field.default is not dataclasses.MISSING:
+            namespace[f"default_{name}"] = field.default
+            value = f"data.get({name!r}, default_{name})"
+        elif field.default_factory is not dataclasses.MISSING:
+            namespace[f"factory_{name}"] = field.default_factory
+            value = f"data[{name!r}] if {name!r} in data else factory_{name}()"
+        elif _is_optional(type_hints.get(name)):
+            value = f"data.get({name!r})"
+        else:
+            required.append(name)
+            value = f"data[{name!r}]"
+
+        nested_model = _get_nested_model(type_hints.get(name))
+        if nested_model is None:
+            lines.append(f"instance.{name} = {value}")
+        else:
+            namespace[f"decode_{name}"] = get_decoder(nested_model)
+            lines.append(f"value = {value}")
+            lines.append(f"instance.{name} = decode_{name}(value) if isinstance(value, dict) else value")
+
+    namespace["REQUIRED"] = tuple(required)
+    # Attributes are set one by one, like in `__init__`, which is faster than building a dict of them
+    source = "\n".join([
+        "def decode(data):",
+        "    if not isinstance(data, dict):",
+        "        raise TypeError(f'{model.__name__} must be decoded from a dict, not {type(data).__name__}')",
+        "    instance = new(model)",
+        "    try:",
+        *[f"        {line}" for line in lines],
+        "    except KeyError:",
+        "        missing = [name for name in REQUIRED if name not in data]",
+        "        if not missing:",
+        "            raise",
+        "        raise TypeError(f'{model.__name__} is missing required fields: {missing}') from None",
+        *(["    instance.__post_init__()"] if hasattr(model, "__post_init__") else []),
+        "    return instance",
+    ])
+    exec(compile(source, f"<decoder of {model.__qualname__}>", "exec"), namespace)
+    decoder = namespace["decode"]
+    decoder.__qualname__ = decoder.__name__ = f"decode_{model.__name__}"
+    decoder.__source__ = source
+    return decoder
@@ -1,13 +1,29 @@
+import hashlib
+import logging
 import paho.mqtt.client as mqtt
+import threading
+from contextlib import contextmanager
 from datetime import UTC, datetime
-from typing import Callable, Dict, Optional
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set
 
-from pyqube.events.exceptions import MessageHandlingError, SubscriptionError
+from pyqube.events.exceptions import MessageHandlingError, SpoolError, SubscriptionError
 from pyqube.events.handlers import (
     QueueHandler,
     QueuingSystemResetHandler,
     TicketHandler,
 )
+from pyqube.events.reconnect import (
+    ConnectionGap,
+    ConnectionStats,
+    ReconnectPolicy,
+)
+from pyqube.events.routing import Handlers, RoutingTable
+from pyqube.events.spool import EventSpool, SpoolReader, record_size
+
+
+logger = logging.getLogger(__name__)
 
 
 class MQTTClient(TicketHandler, QueuingSystemResetHandler, QueueHandler):
@@ -18,37 +34,142 @@ class MQTTClient(TicketHandler, QueuingSystemResetHandler, QueueHandler):
 
     DEFAULT_BROKER_URL = "mqtt.qube.q-better.com"
     DEFAULT_BROKER_PORT = 443
+    SUBSCRIBE_BATCH_SIZE = 100  # Maximum number of topics sent in one SUBSCRIBE/UNSUBSCRIBE packet
+    SUBACK_FAILURE = 0x80
+    DEFAULT_SESSION_EXPIRY_INTERVAL = 3600  # Seconds the broker keeps a persistent MQTT v5 session after disconnecting
+    SHARED_SUBSCRIPTION_PREFIX = "$share"
 
-    def __init__(self, api_key: str, location_id: id, broker_url: str = None, broker_port: int = None):
+    def __init__(
+        self,
+        api_key: str,
+        location_id: id,
+        broker_url: str = None,
+        broker_port: int = None,
+        reconnect_policy: ReconnectPolicy = None,
+        wildcard_subscriptions: bool = False,
+        client_id: Optional[str] = None,
+        clean_session: bool = True,
+        protocol: int = mqtt.MQTTv311,
+        session_expiry_interval: Optional[int] = None,
+        spool: Optional[EventSpool] = None,
+        spool_reader: Optional[SpoolReader] = None,
+        spool_commit_every: int = 100,
+        lazy_connect: bool = False,
+        share_group: Optional[str] = None
+    ):
         """
-        Initializes and connects the MQTT client.
+        Initializes and connects the MQTT client, unless `lazy_connect` is set.
 
         Args:
             api_key (str): API key for client authentication.
             location_id (int): Location ID to use in requests.
             broker_url (str, optional): URL of the MQTT broker. Defaults to DEFAULT_BROKER_URL.
             broker_port (int, optional): Port of the MQTT broker. Defaults to DEFAULT_BROKER_PORT.
+            reconnect_policy (ReconnectPolicy, optional): Backoff used to reconnect after the connection to the broker
+                is lost. Defaults to ReconnectPolicy().
+            wildcard_subscriptions (bool, optional): If True, per-queue and per-counter handlers share one wildcard
+                subscription (e.g. `locations/{id}/queues/+/tickets/called`) and messages are dispatched to them
+                locally. Defaults to False.
+            client_id (str, optional): MQTT client id. Persistent sessions need a stable one, so when `clean_session`
+                is False and no id is given, one is derived from the API key and location. Defaults to a random id.
+            clean_session (bool, optional): If False, the broker keeps the session (subscriptions and QoS 1/2
+                messages) while the client is disconnected, so brief disconnections don't lose events. Defaults to
+                True.
+            protocol (int, optional): MQTT protocol version, `mqtt.MQTTv311` or `mqtt.MQTTv5`. Defaults to MQTTv311.
+            session_expiry_interval (int, optional): MQTT v5 only. Seconds the broker keeps the session after the
+                client disconnects. Defaults to DEFAULT_SESSION_EXPIRY_INTERVAL for persistent sessions and 0 otherwise.
+            spool (EventSpool, optional): Spool where every received message is appended before it is dispatched, so
+                that it can be replayed with SpoolReader after handlers crash or the application is redeployed.
+            spool_reader (SpoolReader, optional): Reader of `spool` whose checkpoint is advanced as received messages
+                are handled, so that replaying it after a crash only dispatches the messages that weren't handled.
+                Replay it before the client connects, since received messages move its checkpoint past the unreplayed
+                ones. After a handler fails, the checkpoint is no longer advanced, so that the next replay starts at
+                the failed message.
+            spool_commit_every (int, optional): Number of handled messages between commits of the checkpoint of
+                `spool_reader`, which is also committed on disconnection. Defaults to 100.
+            lazy_connect (bool, optional): If True, the constructor doesn't connect: the connection starts in the
+                background when the first handler is registered or `start` is called, and `ready` is set once it is
+                established. Clients that never register handlers (e.g. REST-only scripts) never connect, and many
+                clients can connect in parallel. Defaults to False, which connects before returning.
+            share_group (str, optional): MQTT v5 only. Name of a shared subscription group: topics are subscribed as
+                `$share/{share_group}/{topic}`, so the broker delivers each message to only one of the clients of the
+                group (e.g. the replicas of a consumer), balancing the load between them. Handlers are still matched
+                with the topic each message was published to. Persistent sessions need a different `client_id` in
+                each replica. Defaults to None, which receives every message.
         Raises:
             ConnectionError: If unable to connect to the broker.
+            ValueError: If `share_group` is invalid or used without MQTT v5.
         """
 
         super().__init__()
         self.broker_url = broker_url or self.DEFAULT_BROKER_URL
         self.broker_port = broker_port or self.DEFAULT_BROKER_PORT
         self.location_id = location_id
+        self.wildcard_subscriptions = wildcard_subscriptions
+        self.clean_session = clean_session
+        self.protocol = protocol
+        self.session_expiry_interval = session_expiry_interval
+        self.spool = spool
+        self.spool_reader = spool_reader
+        self.spool_commit_every = spool_commit_every
+        self._spool_offset: Optional[int] = None  # Offset after the last handled message, not committed yet
+        self._spool_uncommitted = 0
+        self._spool_checkpoint_stopped = False  # Set when a handler fails, to replay from its message
+        self.lazy_connect = lazy_connect
+        self.share_group = share_group
+        self.ready = threading.Event()  # Set while the client is connected to the broker
+        self._started = False
+        self._start_lock = threading.Lock()
+        if share_group is not None:
+            if protocol != mqtt.MQTTv5:
+                raise ValueError("Shared subscriptions need the MQTT v5 protocol.")
+            if not share_group or any(character in share_group for character in "/+#"):
+                raise ValueError(f"Invalid share group '{share_group}'.")
+            if client_id is None and not clean_session:
+                # The generated id is the same in every replica, so their persistent sessions would take over each other
+                raise ValueError("Persistent sessions of a share group need a different client_id in each replica.")
+        if client_id is None and not clean_session:
+            client_id = self.generate_client_id(api_key, location_id)
+        self.client_id = client_id or ""
 
-        self.client = mqtt.Client()
+        if protocol == mqtt.MQTTv5:
+            # MQTT v5 replaces clean session with clean start, which is set on connect
+            self.client = mqtt.Client(client_id=self.client_id, protocol=protocol)
+        elif self.client_id or not clean_session:
+            self.client = mqtt.Client(client_id=self.client_id, clean_session=clean_session, protocol=protocol)
+        else:
+            self.client = mqtt.Client()
 
-        self.message_handlers: Dict[str, list[Callable[[bytes], None]]] = {}  # Maps topics to handler functions
+        self._routes = RoutingTable()  # Maps topics to handler functions, replaced (never modified) on registration
+        # Guards the registries below and serializes registrations, while dispatching reads `_routes` unlocked
+        self._registration_lock = threading.RLock()
         self._subscribed_topics = set()  # Tracks subscribed topics
+        self._topic_subscriptions: Dict[str, str] = {}  # Maps handler topics to the topic subscribed on the broker
+        self._subscription_users: Dict[str, Set[str]] = {}  # Maps subscribed topics to the handler topics using them
+        self._subscription_qos: Dict[str, int] = {}  # Maps subscribed topics to their QoS
         self._created_at = datetime.now(UTC)
 
+        self.reconnect_policy = reconnect_policy or ReconnectPolicy()
+        self.connection_stats = ConnectionStats()
+        self._connection_gap_handlers: List[Callable[[ConnectionGap], None]] = []
+        self._disconnected_at: Optional[datetime] = None
+        self._reconnect_attempts = 0
+        self._disconnect_requested = False
+
+        self.subscription_results: Dict[str, int] = {}  # Maps topics to the QoS (or failure code) granted in SUBACK
+        self._pending_subacks: Dict[int, List[str]] = {}  # Maps SUBSCRIBE message ids to their topics
+        self._subscription_lock = threading.Lock()
+        self._batched_topics: Optional[List[str]] = None  # Topics waiting to be subscribed by batch_subscriptions
+
         # Set the username for authentication
         self.client.username_pw_set(api_key, None)
 
         # Register internal event callbacks
         self.client.on_message = self._on_message
         self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_connect_fail = self._on_connect_fail
+        self.client.on_subscribe = self._on_subscribe
 
         # Configure WebSocket and TLS options for secure connection
         self.client.ws_set_options(path='/')
@@ -56,54 +177,247 @@ class MQTTClient(TicketHandler, QueuingSystemResetHandler, QueueHandler):
         self.client.tls_insecure_set(False)
 
         # Connect to the MQTT broker
-        self._connect_to_broker()
+        if not lazy_connect:
+            self._connect_to_broker()
+
+    @property
+    def message_handlers(self) -> Mapping[str, Handlers]:
+        """
+        Read-only snapshot of the handlers of each topic. Registering or removing handlers replaces it, so it can be
+        iterated while handlers change in other threads.
+        """
+        return self._routes.handlers
+
+    @message_handlers.setter
+    def message_handlers(self, handlers: Optional[Mapping[str, Iterable[Callable[[bytes], None]]]]) -> None:
+        self._routes = RoutingTable(handlers)
+
+    @staticmethod
+    def generate_client_id(api_key: str, location_id: int) -> str:
+        """
+        Generates a client id that is stable across restarts for the same API key and location, as needed by
+        persistent sessions. The API key itself is not exposed.
+
+        Returns:
+            str: The client id.
+        """
+        api_key_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+        return f"pyqube-{location_id}-{api_key_hash}"
+
+    def _shared_topic(self, topic: str) -> str:
+        """Returns the topic to subscribe to on the broker, which is a shared subscription if `share_group` is set."""
+        if self.share_group is None:
+            return topic
+        return f"{self.SHARED_SUBSCRIPTION_PREFIX}/{self.share_group}/{topic}"
+
+    def _get_connect_options(self) -> dict:
+        """Returns the extra arguments of `connect` needed by MQTT v5 sessions."""
+        if self.protocol != mqtt.MQTTv5:
+            return {}
+
+        session_expiry_interval = self.session_expiry_interval
+        if session_expiry_interval is None:
+            session_expiry_interval = 0 if self.clean_session else self.DEFAULT_SESSION_EXPIRY_INTERVAL
+        properties = Properties(PacketTypes.CONNECT)
+        properties.SessionExpiryInterval = session_expiry_interval
+        return {
+            "clean_start": self.clean_session,
+            "properties": properties,
+        }
 
     def _connect_to_broker(self) -> None:
         """Connects to the MQTT broker and starts the network loop."""
+        with self._start_lock:
+            self._started = True
         try:
-            self.client.connect(host=self.broker_url, port=self.broker_port, keepalive=60)
+            self.client.connect(
+                host=self.broker_url, port=self.broker_port, keepalive=60, **self._get_connect_options()
+            )
             self.client.loop_start()
         except Exception as e:
             raise ConnectionError(f"Failed to connect to MQTT broker at {self.broker_url}:{self.broker_port}: {e}")
 
+    def start(self) -> "MQTTClient":
+        """
+        Starts connecting to the MQTT broker in the background, without waiting for the connection (DNS, TCP, TLS and
+        the WebSocket upgrade happen in the network loop's thread). Calling it again has no effect.
+        Failed attempts are retried according to the reconnect policy.
+
+        Returns:
+            MQTTClient: The client, whose `ready` event is set once it is connected.
+
+        Raises:
+            ConnectionError: If the connection can't be started (e.g. invalid options).
+        """
+        with self._start_lock:
+            if self._started:
+                return self
+            self._started = True
+        try:
+            self.client.connect_async(
+                host=self.broker_url, port=self.broker_port, keepalive=60, **self._get_connect_options()
+            )
+            self.client.loop_start()
+        except Exception as e:
+            with self._start_lock:
+                self._started = False
+            raise ConnectionError(f"Failed to connect to MQTT broker at {self.broker_url}:{self.broker_port}: {e}")
+        return self
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the client is connected to the broker, starting the connection if needed.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Defaults to waiting until it is connected.
+
+        Returns:
+            bool: False if the timeout elapsed first.
+        """
+        self.start()
+        return self.ready.wait(timeout)
+
     def disconnect(self) -> None:
         """Stops the MQTT network loop and disconnects from the broker."""
+        self._disconnect_requested = True
+        self.ready.clear()
         self.client.loop_stop()
         self.client.disconnect()
+        if self.spool is not None:
+            self.spool.flush()
+        self._commit_spool_checkpoint()
 
-    def _on_connect(self, client: mqtt.Client, userdata: Optional[object], flags: dict, rc: int) -> None:
+    def _on_connect(
+        self,
+        client: mqtt.Client,
+        userdata: Optional[object],
+        flags: dict,
+        rc: int,
+        properties: Optional[object] = None
+    ) -> None:
         """
         Callback triggered when the client successfully connects to the MQTT broker.
-        Subscribes to all topics that have registered handlers.
+        Subscribes to all tracked topics and, when this is a reconnection, notifies connection gap handlers.
 
         Args:
             client (mqtt.Client): The MQTT client instance.
             userdata (Optional[object]): Optional user data (not used in this implementation).
             flags (dict): A dictionary of response flags from the broker.
             rc (int): The connection result code. A value of 0 indicates success, while any other value indicates failure.
+            properties (Optional[object]): MQTT v5 properties (not used).
 
         Raises:
-            ConnectionError: If the connection to the broker fails (rc != 0).
-            SubscriptionError: If subscribing to any topic fails after a successful connection.
+            SubscriptionError: If subscribing to the topics fails after a successful connection.
 
         Notes:
-            - The method subscribes to topics only if the connection is successful (rc == 0).
-            - It attempts to subscribe to each topic stored in `_subscribed_topics` that has a registered handler.
+            - The method subscribes to topics only if the connection is successful (rc == 0). Refused connections are
+              logged and retried according to the reconnect policy, instead of raising in the network loop's thread,
+              which would stop it.
+            - All topics stored in `_subscribed_topics` are subscribed again in multi-topic SUBSCRIBE packets, because
+              the broker may have dropped them while the client was disconnected.
         """
-        if rc == 0:
-            for topic in self._subscribed_topics:
-                try:
-                    if topic not in self.message_handlers:
-                        client.subscribe(topic)
-                except Exception as e:
-                    raise SubscriptionError(f"Failed to subscribe to topic '{topic}': {e}")
-        else:
-            raise ConnectionError(f"Failed to connect to MQTT broker with return code {rc}")
+        if rc != 0:
+            self.connection_stats.failed_attempts += 1
+            logger.error("The MQTT broker refused the connection with return code %s.", rc)
+            self._schedule_reconnect()
+            return
+
+        now = datetime.now(UTC)
+        self.connection_stats.connections += 1
+        self.connection_stats.last_connected_at = now
+
+        # Set before listing the topics, so that topics registered concurrently are either listed or subscribed again
+        self.ready.set()
+        with self._registration_lock:
+            topics = sorted(self._subscribed_topics)
+        self._subscribe_topics(topics)
+
+        if self._disconnected_at is not None:
+            gap = ConnectionGap(
+                disconnected_at=self._disconnected_at,
+                reconnected_at=now,
+                attempts=self._reconnect_attempts,
+                session_present=bool(flags.get("session present")) if isinstance(flags, dict) else False,
+            )
+            self._disconnected_at = None
+            self._reconnect_attempts = 0
+            self.connection_stats.reconnections += 1
+            self.connection_stats.total_downtime += gap.duration
+            self._notify_connection_gap(gap)
+
+    def _on_disconnect(
+        self, client: mqtt.Client, userdata: Optional[object], rc: int, properties: Optional[object] = None
+    ) -> None:
+        """
+        Callback triggered when the connection to the broker is closed.
+        Unexpected disconnections are counted and the next reconnection attempt is scheduled.
+
+        Args:
+            client (mqtt.Client): The MQTT client instance.
+            userdata (Optional[object]): Optional user data (not used).
+            rc (int): The disconnection reason code.
+            properties (Optional[object]): MQTT v5 properties (not used).
+        """
+        self.ready.clear()
+        if self._disconnect_requested:
+            return
+
+        now = datetime.now(UTC)
+        self.connection_stats.disconnections += 1
+        self.connection_stats.last_disconnected_at = now
+        if self._disconnected_at is None:
+            self._disconnected_at = now
+            self._reconnect_attempts = 0
+        self._schedule_reconnect()
+
+    def _on_connect_fail(self, client: mqtt.Client, userdata: Optional[object]) -> None:
+        """
+        Callback triggered when a reconnection attempt fails before reaching the broker.
+        Schedules the next attempt with a longer delay.
+        """
+        self.connection_stats.failed_attempts += 1
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        """
+        Sets the delay that the network loop waits before its next reconnection attempt, according to the reconnect
+        policy.
+        """
+        delay = self.reconnect_policy.get_delay(self._reconnect_attempts)
+        self._reconnect_attempts += 1
+        self.client.reconnect_delay_set(min_delay=delay, max_delay=delay)
+
+    def _notify_connection_gap(self, gap: ConnectionGap) -> None:
+        """
+        Calls every connection gap handler. Errors are logged, so that a failing handler can't stop the network loop.
+        """
+        for handler in self._connection_gap_handlers:
+            try:
+                handler(gap)
+            except Exception:
+                logger.exception("Error in connection gap handler '%s'.", getattr(handler, "__name__", handler))
+
+    def on_connection_gap(self):
+        """
+        Registers a handler called after the client reconnects to the broker, with the ConnectionGap in which events
+        may have been lost. It can be used to re-sync state through the REST API.
+
+        Returns:
+            The decorator for the handler function.
+        """
+
+        def decorator(func: Callable[[ConnectionGap], None]):
+            if func not in self._connection_gap_handlers:
+                self._connection_gap_handlers.append(func)
+            return func
+
+        return decorator
 
     def _on_message(self, client: mqtt.Client, userdata: Optional[object], msg: mqtt.MQTTMessage) -> None:
         """
         Callback triggered when a message is received on a subscribed topic.
-        Dispatches the message to the appropriate handler.
+        Appends the message to the spool, if any, and dispatches it to the appropriate handler. Messages that can't be
+        spooled are still dispatched. Once handled, the checkpoint of `spool_reader`, if any, is advanced past them.
 
         Args:
             client (mqtt.Client): The MQTT client instance.
@@ -113,15 +427,155 @@ class MQTTClient(TicketHandler, QueuingSystemResetHandler, QueueHandler):
         Raises:
             MessageHandlingError: If the handler for a topic fails.
         """
-        for topic, handlers in self.message_handlers.items():
-            if mqtt.topic_matches_sub(topic, msg.topic):
-                for handler in handlers:
-                    try:
-                        handler(msg.payload)
-                    except Exception as e:
-                        raise MessageHandlingError(f"Error in handler for topic '{topic}': {e}")
+        self.connection_stats.messages_received += 1
+        next_offset = None
+        if self.spool is not None:
+            try:
+                offset = self.spool.append(msg.topic, msg.payload)
+                next_offset = offset + record_size(msg.topic.encode('utf-8'), msg.payload)
+            except SpoolError:
+                logger.exception("Failed to spool message of topic '%s'.", msg.topic)
+        try:
+            self.dispatch_message(msg.topic, msg.payload)
+        except Exception:
+            if next_offset is not None and self.spool_reader is not None and not self._spool_checkpoint_stopped:
+                self._commit_spool_checkpoint()
+                self._spool_checkpoint_stopped = True
+            raise
+        if next_offset is not None:
+            self._advance_spool_checkpoint(next_offset)
+
+    def _advance_spool_checkpoint(self, next_offset: int) -> None:
+        """Moves the checkpoint of `spool_reader` past a handled message, committing it every `spool_commit_every`."""
+        if self.spool_reader is None or self._spool_checkpoint_stopped:
+            return
+        self._spool_offset = next_offset
+        self._spool_uncommitted += 1
+        if self._spool_uncommitted >= self.spool_commit_every:
+            self._commit_spool_checkpoint()
+
+    def _commit_spool_checkpoint(self) -> None:
+        """Commits the offset after the last handled message as the checkpoint of `spool_reader`."""
+        if self.spool_reader is None or self._spool_offset is None or self._spool_checkpoint_stopped:
+            return
+        try:
+            self.spool_reader.commit(self._spool_offset)
+            self._spool_uncommitted = 0
+        except OSError:
+            logger.exception("Failed to commit the checkpoint of spool reader '%s'.", self.spool_reader.name)
+
+    def dispatch_message(self, topic: str, payload: bytes) -> None:
+        """
+        Dispatches a message to the handlers registered for its topic or for matching wildcard topics. See
+        RoutingTable.matching.
+
+        Args:
+            topic (str): The topic the message was published to.
+            payload (bytes): The message payload.
+
+        Raises:
+            MessageHandlingError: If the handler for a topic fails.
+        """
+        # Handlers registered meanwhile don't affect this message
+        for handler_topic, handlers in self._routes.matching(topic):
+            self._call_handlers(handler_topic, handlers, payload)
+
+    @staticmethod
+    def _call_handlers(topic: str, handlers: Iterable[Callable[[bytes], None]], payload: bytes) -> None:
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception as e:
+                raise MessageHandlingError(f"Error in handler for topic '{topic}': {e}")
+
+    def _on_subscribe(
+        self,
+        client: mqtt.Client,
+        userdata: Optional[object],
+        mid: int,
+        granted_qos: list,
+        properties: Optional[object] = None
+    ) -> None:
+        """
+        Callback triggered when the broker acknowledges a SUBSCRIBE packet (SUBACK).
+        Stores the result of each topic in `subscription_results`.
+
+        Args:
+            client (mqtt.Client): The MQTT client instance.
+            userdata (Optional[object]): Optional user data (not used).
+            mid (int): Message id of the acknowledged SUBSCRIBE packet.
+            granted_qos (list): Granted QoS (or MQTT v5 reason code) of each topic, in the order they were sent.
+            properties (Optional[object]): MQTT v5 properties (not used).
+        """
+        with self._subscription_lock:
+            topics = self._pending_subacks.pop(mid, [])
+            for topic, result in zip(topics, granted_qos):
+                self.subscription_results[topic] = int(getattr(result, "value", result))
+
+    def _track_subscription(self, result: object, topics: List[str]) -> None:
+        """Remembers which topics were sent in a SUBSCRIBE packet, so that its SUBACK can be matched."""
+        if isinstance(result, tuple) and len(result) == 2 and result[0] == mqtt.MQTT_ERR_SUCCESS:
+            self._pending_subacks[result[1]] = topics
+
+    @staticmethod
+    def _is_not_connected(result: object) -> bool:
+        """Returns True if paho refused a SUBSCRIBE because the client isn't connected yet."""
+        return isinstance(result, tuple) and len(result) == 2 and result[0] == mqtt.MQTT_ERR_NO_CONN
+
+    def _check_unsubscribe(self, result: object, topics: List[str]) -> None:
+        """
+        Raises SubscriptionError if paho refused an UNSUBSCRIBE. While disconnected, clean sessions have no
+        subscriptions left on the broker and the topics won't be subscribed again, so they count as unsubscribed.
+        """
+        if not isinstance(result, tuple) or len(result) != 2 or result[0] == mqtt.MQTT_ERR_SUCCESS:
+            return
+        if result[0] == mqtt.MQTT_ERR_NO_CONN and self.clean_session:
+            return
+        raise SubscriptionError(f"Failed to unsubscribe from topics {topics}: {mqtt.error_string(result[0])}")
 
-    def subscribe_to_topic(self, topic: str, handler: Callable[[bytes], None]) -> None:
+    def _subscribe_topics(self, topics: List[str]) -> None:
+        """
+        Subscribes to many topics, sending them in multi-topic SUBSCRIBE packets of up to SUBSCRIBE_BATCH_SIZE topics.
+
+        Raises:
+            SubscriptionError: If subscribing to a chunk of topics fails.
+        """
+        for start in range(0, len(topics), self.SUBSCRIBE_BATCH_SIZE):
+            chunk = topics[start:start + self.SUBSCRIBE_BATCH_SIZE]
+            try:
+                with self._subscription_lock:
+                    result = self.client.subscribe([(topic, self._subscription_qos.get(topic, 0)) for topic in chunk])
+                    self._track_subscription(result, chunk)
+            except Exception as e:
+                raise SubscriptionError(f"Failed to subscribe to topics {chunk}: {e}")
+
+    def _unsubscribe_topics(self, topics: List[str]) -> None:
+        """
+        Unsubscribes from many topics, sending them in multi-topic UNSUBSCRIBE packets of up to SUBSCRIBE_BATCH_SIZE
+        topics, and forgets each chunk once paho accepted it. Called with the registration lock held.
+
+        Raises:
+            SubscriptionError: If unsubscribing from a chunk of topics fails. Its topics, and those of the next chunks,
+                are still subscribed.
+        """
+        for start in range(0, len(topics), self.SUBSCRIBE_BATCH_SIZE):
+            chunk = topics[start:start + self.SUBSCRIBE_BATCH_SIZE]
+            try:
+                result = self.client.unsubscribe(chunk)
+            except Exception as e:
+                raise SubscriptionError(f"Failed to unsubscribe from topics {chunk}: {e}")
+            self._check_unsubscribe(result, chunk)
+            for subscription_topic in chunk:
+                self._subscribed_topics.discard(subscription_topic)
+                self.subscription_results.pop(subscription_topic, None)
+
+    def subscribe_to_topic(
+        self,
+        topic: str,
+        handler: Callable[[bytes], None],
+        subscription_topic: Optional[str] = None,
+        qos: int = 0
+    ) -> None:
         """
         Subscribes to an MQTT topic and registers a handler function to process incoming messages.
 
@@ -129,43 +583,216 @@ class MQTTClient(TicketHandler, QueuingSystemResetHandler, QueueHandler):
             topic (str): The MQTT topic to subscribe to.
             handler (Callable[[bytes], None]): A function that processes messages for this topic.
                 It must accept a single argument of type `bytes` (the message payload).
+            subscription_topic (str, optional): Topic to subscribe to on the broker, when it differs from `topic`
+                (e.g. a wildcard topic shared by many handler topics). Defaults to `topic`.
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscription. Defaults to 0.
 
         Raises:
             SubscriptionError: If subscribing to the topic fails.
 
         Notes:
             - The same handler will not be registered more than once for the same topic.
-            - A topic is subscribed to only once, even if multiple handlers are added.
+            - A topic is subscribed to only once, even if multiple handlers are added. If a handler asks for a
+              higher QoS than the current subscription, the topic is subscribed again with the higher QoS.
+            - Inside `batch_subscriptions`, the topic is only subscribed when the block exits.
+            - With `lazy_connect`, registering the first handler starts the connection. Topics registered before it
+              is established are subscribed when it is.
+            - With `share_group`, the topic is subscribed as a shared subscription of the group.
+        """
+        if not self._started:
+            self.start()
+        subscription_topic = self._shared_topic(subscription_topic or topic)
+
+        with self._registration_lock:
+            self._register_handler(topic, handler, subscription_topic, qos)
+
+    def _register_handler(
+        self, topic: str, handler: Callable[[bytes], None], subscription_topic: str, qos: int
+    ) -> None:
+        """Registers a handler and subscribes to its topic if needed. Called with the registration lock held."""
+        if handler not in self.message_handlers.get(topic, ()):
+            self._routes = self._routes.with_handler(topic, handler)
+            self._topic_subscriptions[topic] = subscription_topic
+            self._subscription_users.setdefault(subscription_topic, set()).add(topic)
+
+            current_qos = self._subscription_qos.get(subscription_topic)
+            if subscription_topic in self._subscribed_topics and current_qos is not None and current_qos >= qos:
+                return
+            self._subscription_qos[subscription_topic] = qos
+
+            if self._batched_topics is not None:
+                if subscription_topic not in self._batched_topics:
+                    self._batched_topics.append(subscription_topic)
+                self._subscribed_topics.add(subscription_topic)
+                return
+            try:
+                with self._subscription_lock:
+                    if qos:
+                        result = self.client.subscribe(subscription_topic, qos)
+                    else:
+                        result = self.client.subscribe(subscription_topic)
+                    self._track_subscription(result, [subscription_topic])
+                self._subscribed_topics.add(subscription_topic)
+                if self._is_not_connected(result) and self.ready.is_set():
+                    # The connection was established after the SUBSCRIBE was refused and before the topic was tracked
+                    self._subscribe_topics([subscription_topic])
+            except Exception as e:
+                if current_qos is None:
+                    self._subscription_qos.pop(subscription_topic, None)
+                else:
+                    self._subscription_qos[subscription_topic] = current_qos
+                raise SubscriptionError(f"Failed to subscribe to topic '{subscription_topic}': {e}")
+
+    def _remove_topic_handlers(self, topic: str) -> Optional[str]:
         """
-        if topic not in self.message_handlers:
-            self.message_handlers[topic] = []
+        Removes the handlers of a topic. Called with the registration lock held.
 
-        if handler not in self.message_handlers[topic]:
-            self.message_handlers[topic].append(handler)
-            if topic not in self._subscribed_topics:
+        Returns:
+            Optional[str]: The subscribed topic that is no longer used by any handler topic, if any.
+        """
+        self._routes = self._routes.without_topic(topic)
+        subscription_topic = self._topic_subscriptions.pop(topic, topic)
+        users = self._subscription_users.get(subscription_topic, set())
+        users.discard(topic)
+        if users:
+            return None
+        self._subscription_users.pop(subscription_topic, None)
+        self._subscription_qos.pop(subscription_topic, None)
+        return subscription_topic
+
+    @contextmanager
+    def batch_subscriptions(self):
+        """
+        Context manager that collects the topics of every handler registered inside it and subscribes to all of them
+        when it exits, in multi-topic SUBSCRIBE packets.
+
+        Example:
+            with client.batch_subscriptions():
+                for queue_id in queue_ids:
+                    client.on_ticket_called(queue_id=queue_id)(handle_called_ticket)
+
+        Raises:
+            SubscriptionError: If subscribing to the collected topics fails.
+        """
+        with self._registration_lock:
+            nested = self._batched_topics is not None
+            if not nested:
+                self._batched_topics = []
+        if nested:
+            yield self
+            return
+
+        try:
+            yield self
+        finally:
+            with self._registration_lock:
+                topics, self._batched_topics = self._batched_topics, None
+            self._subscribe_topics(topics)
+
+    def subscribe_to_topics(self, topic_handlers: Dict[str, Callable[[bytes], None]]) -> None:
+        """
+        Subscribes to many MQTT topics at once, registering one handler for each of them.
+
+        Args:
+            topic_handlers (Dict[str, Callable[[bytes], None]]): Maps topics to the handler of their messages.
+
+        Raises:
+            SubscriptionError: If subscribing to the topics fails.
+        """
+        with self.batch_subscriptions():
+            for topic, handler in topic_handlers.items():
+                self.subscribe_to_topic(topic, handler)
+
+    def unsubscribe_from_topic(self, topic: str) -> None:
+        """
+        Removes the handlers of an MQTT topic and unsubscribes from it on the broker, unless its subscription is
+        still shared with other handler topics.
+
+        Raises:
+            SubscriptionError: If unsubscribing fails, in which case the handlers are kept.
+        """
+        with self._registration_lock:
+            subscription_topic = self._topic_subscriptions.get(topic, topic)
+            if subscription_topic in self._subscribed_topics:
+                if self._subscription_users.get(subscription_topic, set()) - {topic}:
+                    self._remove_topic_handlers(topic)
+                    return
                 try:
-                    self.client.subscribe(topic)
-                    self._subscribed_topics.add(topic)
+                    result = self.client.unsubscribe(subscription_topic)
                 except Exception as e:
-                    raise SubscriptionError(f"Failed to subscribe to topic '{topic}': {e}")
+                    raise SubscriptionError(f"Failed to unsubscribe from topic '{subscription_topic}': {e}")
+                self._check_unsubscribe(result, [subscription_topic])
+                self._subscribed_topics.remove(subscription_topic)
+                self._remove_topic_handlers(topic)
+                self.subscription_results.pop(subscription_topic, None)
 
-    def unsubscribe_from_topic(self, topic: str) -> None:
+    def remove_handler(self, topic: str, handler: Callable[[bytes], None]) -> None:
+        """
+        Removes one handler of an MQTT topic, leaving its other handlers. When it is the last one, the topic is
+        unsubscribed as with `unsubscribe_from_topic`.
+
+        Args:
+            topic (str): Topic the handler was registered for.
+            handler (Callable[[bytes], None]): The handler, as registered (e.g. returned by an `on_*` decorator).
+
+        Raises:
+            SubscriptionError: If unsubscribing from the topic fails, in which case the handler is kept.
         """
-        Unsubscribes from an MQTT topic and removes its handler.
+        with self._registration_lock:
+            topic_handlers = self.message_handlers.get(topic, ())
+            if handler not in topic_handlers:
+                return
+            if len(topic_handlers) > 1:
+                self._routes = self._routes.without_handler(topic, handler)
+            elif self._topic_subscriptions.get(topic, topic) in self._subscribed_topics:
+                self.unsubscribe_from_topic(topic)
+            else:
+                self._remove_topic_handlers(topic)
+
+    def unsubscribe_from_topics(self, topics: Iterable[str]) -> None:
         """
-        if topic in self._subscribed_topics:
+        Unsubscribes from many MQTT topics at once and removes their handlers.
+
+        Args:
+            topics (Iterable[str]): Topics to unsubscribe from. Topics that are not subscribed are ignored.
+
+        Raises:
+            SubscriptionError: If unsubscribing from the topics fails. The handlers of the topics that are still
+                subscribed are kept.
+        """
+        with self._registration_lock:
+            topics = [topic for topic in dict.fromkeys(topics) if self._topic_subscriptions.get(topic, topic) in
+                      self._subscribed_topics]
+            subscription_topics = {topic: self._topic_subscriptions.get(topic, topic) for topic in topics}
+            # Subscriptions whose handler topics are all removed, which are unsubscribed before any handler is removed
+            unused_subscription_topics = list(
+                dict.fromkeys(
+                    subscription_topic for subscription_topic in subscription_topics.values()
+                    if self._subscription_users.get(subscription_topic, set()) <= subscription_topics.keys()
+                )
+            )
             try:
-                self.client.unsubscribe(topic)
-                self._subscribed_topics.remove(topic)
-                self.message_handlers.pop(topic, None)
-            except Exception as e:
-                raise SubscriptionError(f"Failed to unsubscribe from topic '{topic}': {e}")
+                self._unsubscribe_topics(unused_subscription_topics)
+            except SubscriptionError:
+                for topic, subscription_topic in subscription_topics.items():
+                    if subscription_topic not in self._subscribed_topics:
+                        self._remove_topic_handlers(topic)
+                raise
+            for topic in topics:
+                self._remove_topic_handlers(topic)
+
+    def failed_subscriptions(self) -> List[str]:
+        """
+        Lists the topics that the broker refused to subscribe in its SUBACK.
+        """
+        return [topic for topic, result in self.subscription_results.items() if result >= self.SUBACK_FAILURE]
 
     def list_subscribed_topics(self) -> list:
         """
         Lists all currently subscribed topics.
         """
-        return list(self._subscribed_topics)
+        with self._registration_lock:
+            return list(self._subscribed_topics)
 
     def age(self) -> int:
         """
@@ -36,3 +36,8 @@ class HandlerRegistrationError(MQTTClientError):
 class InvalidTicketHandlerArgumentsError(MQTTClientError):
     """Raised when both or neither 'queue_id' and 'counter_id' are provided."""
     pass
+
+
+class SpoolError(MQTTClientError):
+    """Raised when the event spool can't be written or read."""
+    pass
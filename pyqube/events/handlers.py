@@ -3,14 +3,18 @@ from abc import ABC, abstractmethod
 from functools import wraps
 from typing import Callable, List, Optional, Type, Union
 
+from pyqube.decoders import decode, decode_list
 from pyqube.events.exceptions import (
     HandlerRegistrationError,
     InvalidTicketHandlerArgumentsError,
     PayloadFormatError,
     PayloadTypeError,
 )
+from pyqube.serialization import loads
 from pyqube.types import (
     AnsweringTicket,
+    QueuesAverageWaitingTimeBatch,
+    QueuesWaitingTicketsBatch,
     QueueWithAverageWaitingTime,
     QueueWithWaitingTickets,
     QueuingSystemReset,
@@ -27,7 +31,8 @@ class MQTTEventHandlerBase(ABC):
         self,
         topic: str,
         payload_type: Optional[Union[List[Type], Type]] = None,
-        payload_filter: Optional[Callable] = None
+        payload_filter: Optional[Callable] = None,
+        **subscribe_options
     ):
         """
         Registers an MQTT handler for a given topic and message type.
@@ -37,6 +42,7 @@ class MQTTEventHandlerBase(ABC):
             payload_type (Type or List[Type]): Expected data type for decoding the message payload.
                 If a list type is specified, the payload is expected to be a list of dictionaries.
             payload_filter (Callable, optional): A function to filter the payload before passing it to the handler.
+            **subscribe_options: Extra options forwarded to `subscribe_to_topic` (e.g. `qos` or `subscription_topic`).
         """
 
         def decorator(func):
@@ -59,7 +65,7 @@ class MQTTEventHandlerBase(ABC):
 
             try:
                 # Register the handler
-                self.subscribe_to_topic(topic, wrapper)
+                self.subscribe_to_topic(topic, wrapper, **subscribe_options)
             except Exception as e:
                 raise HandlerRegistrationError(f"Failed to register handler for topic '{topic}': {e}")
 
@@ -70,10 +76,11 @@ class MQTTEventHandlerBase(ABC):
     @staticmethod
     def _decode_payload(payload: bytes, payload_type: Union[Type, List[Type]]):
         """
-        Decodes a JSON payload into a specified message type.
+        Decodes a JSON payload into a specified message type, with its compiled decoder (see pyqube.decoders), so
+        fields unknown to dataclass types are ignored.
 
         Args:
-            payload (bytes): The raw message payload.
+            payload (bytes): The raw message payload, parsed without decoding it into a `str` first.
             payload_type (Type or List[Type]): The type(s) to decode the payload into.
 
         Returns:
@@ -81,23 +88,31 @@ class MQTTEventHandlerBase(ABC):
             None if decoding fails.
         """
         try:
-            data = json.loads(payload.decode('utf-8'))
+            data = loads(payload)
 
             # Check if we expect a list of items
             if isinstance(payload_type, list) and payload_type:
                 item_type = payload_type[0]
                 if isinstance(data, list):
-                    return [item_type(**item) for item in data]
+                    return decode_list(item_type, data)
                 else:
                     raise PayloadFormatError("Expected payload to be a list of dictionaries.")
 
             # For a single item
-            return payload_type(**data)
+            return decode(payload_type, data)
         except json.JSONDecodeError as e:
             raise PayloadFormatError("Invalid JSON payload.") from e
         except TypeError as e:
             raise PayloadTypeError(f"Type mismatch in payload for type '{payload_type}': {e}") from e
 
+    @staticmethod
+    def _subscribe_options(**options) -> dict:
+        """
+        Returns the subscription options that differ from their defaults. Only these are forwarded, so subclasses
+        implementing the original `subscribe_to_topic(topic, handler)` signature keep working.
+        """
+        return {option: value for option, value in options.items() if value}
+
     @abstractmethod
     def subscribe_to_topic(self, topic: str, handler) -> None:
         pass
@@ -112,15 +127,18 @@ class QueuingSystemResetHandler(MQTTEventHandlerBase, ABC):
         super().__init__()
         self.location_id = None
 
-    def on_queuing_system_resets_created(self):
+    def on_queuing_system_resets_created(self, qos: int = 0):
         """
         Registers a handler for the 'created' event of queuing system resets.
 
+        Args:
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscription. Defaults to 0.
+
         Returns:
             The decorator for the handler function.
         """
         topic = f"locations/{self.location_id}/queuing-system-resets/created"
-        return self.add_mqtt_handler(topic, QueuingSystemReset)
+        return self.add_mqtt_handler(topic, QueuingSystemReset, **self._subscribe_options(qos=qos))
 
 
 class QueueHandler(MQTTEventHandlerBase, ABC):
@@ -132,31 +150,65 @@ class QueueHandler(MQTTEventHandlerBase, ABC):
         super().__init__()
         self.location_id = None
 
-    def on_queues_changed_average_waiting_time(self, queue_id: Optional[int] = None):
+    def on_queues_changed_average_waiting_time(self, queue_id: Optional[int] = None, qos: int = 0):
         """
         Registers a handler for the 'changed average waiting time' event of queues.
 
         Args:
             queue_id (Optional[int]): The ID of the queue to filter events for. If not provided, all queues are handled.
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscription. Defaults to 0.
 
         Returns:
             The decorator for the handler function.
         """
         topic = f"locations/{self.location_id}/queues/changed-average-waiting-time"
-        return self.add_mqtt_handler(topic, [QueueWithAverageWaitingTime], self._get_queue_filter(queue_id))
+        return self.add_mqtt_handler(
+            topic, [QueueWithAverageWaitingTime], self._get_queue_filter(queue_id), **self._subscribe_options(qos=qos)
+        )
 
-    def on_queues_changed_waiting_number(self, queue_id: Optional[int] = None):
+    def on_queues_changed_waiting_number(self, queue_id: Optional[int] = None, qos: int = 0):
         """
         Registers a handler for the 'changed waiting number' event of queues.
 
         Args:
             queue_id (Optional[int]): The ID of the queue to filter events for. If not provided, all queues are handled.
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscription. Defaults to 0.
+
+        Returns:
+            The decorator for the handler function.
+        """
+        topic = f"locations/{self.location_id}/queues/changed-waiting-number"
+        return self.add_mqtt_handler(
+            topic, [QueueWithWaitingTickets], self._get_queue_filter(queue_id), **self._subscribe_options(qos=qos)
+        )
+
+    def on_queues_changed_average_waiting_time_batch(self, qos: int = 0):
+        """
+        Registers a handler for the 'changed average waiting time' event of queues, receiving the average waiting
+        times of all queues as a QueuesAverageWaitingTimeBatch, in columns, instead of one object per queue.
+
+        Args:
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscription. Defaults to 0.
+
+        Returns:
+            The decorator for the handler function.
+        """
+        topic = f"locations/{self.location_id}/queues/changed-average-waiting-time"
+        return self.add_mqtt_handler(topic, QueuesAverageWaitingTimeBatch, **self._subscribe_options(qos=qos))
+
+    def on_queues_changed_waiting_number_batch(self, qos: int = 0):
+        """
+        Registers a handler for the 'changed waiting number' event of queues, receiving the number of waiting tickets
+        of all queues as a QueuesWaitingTicketsBatch, in columns, instead of one object per queue.
+
+        Args:
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscription. Defaults to 0.
 
         Returns:
             The decorator for the handler function.
         """
         topic = f"locations/{self.location_id}/queues/changed-waiting-number"
-        return self.add_mqtt_handler(topic, [QueueWithWaitingTickets], self._get_queue_filter(queue_id))
+        return self.add_mqtt_handler(topic, QueuesWaitingTicketsBatch, **self._subscribe_options(qos=qos))
 
     @staticmethod
     def _get_queue_filter(queue_id: Optional[int] = None):
@@ -190,35 +242,56 @@ class TicketHandler(MQTTEventHandlerBase, ABC):
     def __init__(self):
         super().__init__()
         self.location_id = None
+        self.wildcard_subscriptions = False
 
-    def on_ticket_generated(self):
+    def on_ticket_generated(self, qos: int = 0):
         """
         Registers a handler for the 'generated' event of tickets.
 
+        Args:
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscription. Defaults to 0.
+
         Returns:
             The decorator for the handler function.
         """
         topic = f"locations/{self.location_id}/tickets/generated"
-        return self.add_mqtt_handler(topic, Ticket)
+        return self.add_mqtt_handler(topic, Ticket, **self._subscribe_options(qos=qos))
 
     def on_ticket_called(
         self,
         queue_id: Optional[int] = None,
         counter_id: Optional[int] = None,
+        qos: int = 0,
+        all_queues: bool = False,
     ):
         """
         Registers a handler for the 'called' event of tickets.
+        When `wildcard_subscriptions` is enabled, handlers of all queues (or counters) share one wildcard subscription
+        and each message is dispatched locally to the handlers of the queue (or counter) in its topic.
 
         Args:
             queue_id (int, optional): The ID of the queue to filter by.
             counter_id (int, optional): The ID of the counter to filter by.
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscription. Defaults to 0.
+            all_queues (bool, optional): If True, the handler receives the tickets called in every queue of the
+                location, through the wildcard topic `locations/{id}/queues/+/tickets/called`, instead of filtering by
+                `queue_id` or `counter_id`. Defaults to False.
 
         Returns:
             The decorator for the handler function.
 
         Raises:
-            InvalidTicketHandlerArgumentsError: If both or neither `queue_id` and `counter_id` are provided.
+            InvalidTicketHandlerArgumentsError: If both or neither `queue_id` and `counter_id` are provided, or if one
+                of them is provided with `all_queues`.
         """
+        if all_queues:
+            if (queue_id is not None) or (counter_id is not None):
+                raise InvalidTicketHandlerArgumentsError(
+                    "You can't provide 'queue_id' or 'counter_id' with 'all_queues'."
+                )
+            topic = f"locations/{self.location_id}/queues/+/tickets/called"
+            return self.add_mqtt_handler(topic, AnsweringTicket, **self._subscribe_options(qos=qos))
+
         # Check that exactly one of the arguments is provided
         if (queue_id is not None) and (counter_id is not None):
             raise InvalidTicketHandlerArgumentsError(
@@ -227,10 +300,16 @@ class TicketHandler(MQTTEventHandlerBase, ABC):
         if (queue_id is None) and (counter_id is None):
             raise InvalidTicketHandlerArgumentsError("You must provide exactly one of 'queue_id' or 'counter_id'.")
 
-        topic = f"locations/{self.location_id}"
         if queue_id is not None:
-            topic += f"/queues/{queue_id}/tickets/called"
+            entity, entity_id = "queues", queue_id
         else:
-            topic += f"/counters/{counter_id}/tickets/called"
+            entity, entity_id = "counters", counter_id
+        topic = f"locations/{self.location_id}/{entity}/{entity_id}/tickets/called"
+
+        subscription_topic = None
+        if self.wildcard_subscriptions:
+            subscription_topic = f"locations/{self.location_id}/{entity}/+/tickets/called"
 
-        return self.add_mqtt_handler(topic, AnsweringTicket)
+        return self.add_mqtt_handler(
+            topic, AnsweringTicket, **self._subscribe_options(subscription_topic=subscription_topic, qos=qos)
+        )
@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Callable, List, Optional, Tuple
+
+from pyqube.events.handlers import QueuingSystemResetHandler, TicketHandler
+from pyqube.types import (
+    AnsweringTicket,
+    QueuingSystemReset,
+    Ticket,
+    convert_str_to_datetime,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def _as_utc_datetime(value) -> datetime:
+    """Converts a datetime (or its string) to a timezone-aware datetime, considering naive datetimes to be in UTC."""
+    if isinstance(value, str):
+        value = convert_str_to_datetime(value)
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value
+
+
+@dataclass
+class TicketLifecycle:
+    """
+    Lifecycle of a ticket, from its generation until it was called.
+    """
+    ticket: Ticket
+    answering_ticket: AnsweringTicket
+    generated_at: datetime
+    called_at: datetime
+
+    @property
+    def waiting_time(self) -> float:
+        """Seconds the ticket waited until it was called."""
+        return (self.called_at - self.generated_at).total_seconds()
+
+
+@dataclass
+class TicketLifecycleStats:
+    """
+    Counters of a TicketLifecycleTracker.
+    """
+    generated: int = 0
+    completed: int = 0
+    expired: int = 0  # Open tickets dropped because they were not called within the TTL
+    evicted: int = 0  # Open tickets dropped because there were more than `max_open_tickets`
+    reset: int = 0  # Open tickets dropped by resets of the queuing system
+    unmatched_calls: int = 0  # Calls of tickets that were not open (e.g. generated before tracking started)
+
+
+class TicketLifecycleTracker:
+    """
+    Joins the 'generated' and 'called' events of tickets in memory, emitting a TicketLifecycle (with the waiting time)
+    when a ticket is called.
+    Open tickets are indexed by id, in generation order, so that matching a call and expiring the oldest tickets are
+    O(1). Memory is bounded: tickets expire after `ttl` seconds, at most `max_open_tickets` are kept (the oldest are
+    evicted first) and all of them are dropped when the queuing system is reset.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 12 * 3600,
+        max_open_tickets: int = 100000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initializes the Ticket Lifecycle Tracker.
+
+        Args:
+            ttl (float, optional): Seconds an open ticket is kept without being called. Defaults to 12 hours.
+            max_open_tickets (int, optional): Maximum number of open tickets kept. Defaults to 100000.
+            clock (Callable[[], float], optional): Monotonic clock used for expiration, in seconds.
+
+        Raises:
+            ValueError: If `ttl` or `max_open_tickets` is not positive.
+        """
+        if ttl <= 0 or max_open_tickets <= 0:
+            raise ValueError("TTL and maximum number of open tickets must be positive.")
+        self.ttl = ttl
+        self.max_open_tickets = max_open_tickets
+        self.stats = TicketLifecycleStats()
+        self._clock = clock
+        self._open_tickets: "OrderedDict[int, Tuple[Ticket, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._lifecycle_handlers: List[Callable[[TicketLifecycle], None]] = []
+
+    def __len__(self) -> int:
+        """Number of open tickets."""
+        return len(self._open_tickets)
+
+    def __contains__(self, ticket_id: int) -> bool:
+        return ticket_id in self._open_tickets
+
+    def on_lifecycle_completed(self):
+        """
+        Registers a handler called with each TicketLifecycle, when a tracked ticket is called.
+
+        Returns:
+            The decorator for the handler function.
+        """
+
+        def decorator(func: Callable[[TicketLifecycle], None]):
+            self._lifecycle_handlers.append(func)
+            return func
+
+        return decorator
+
+    def attach(self, events: TicketHandler, qos: int = 0) -> "TicketLifecycleTracker":
+        """
+        Registers the handlers of the events that the tracker needs: tickets generated, tickets called in any queue
+        and, if supported by `events`, resets of the queuing system.
+
+        Args:
+            events (TicketHandler): Client (e.g. MQTTClient or LocationEvents) that receives the events of a location.
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscriptions. Defaults to 0.
+
+        Returns:
+            TicketLifecycleTracker: The tracker.
+        """
+        events.on_ticket_generated(qos=qos)(self.track_generated)
+        events.on_ticket_called(all_queues=True, qos=qos)(self.track_called)
+        if isinstance(events, QueuingSystemResetHandler):
+            events.on_queuing_system_resets_created(qos=qos)(self.reset)
+        return self
+
+    def track_generated(self, ticket: Ticket) -> None:
+        """
+        Opens the lifecycle of a generated ticket.
+
+        Args:
+            ticket (Ticket): The generated ticket.
+        """
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            self._open_tickets[ticket.id] = (ticket, now + self.ttl)
+            self._open_tickets.move_to_end(ticket.id)
+            self.stats.generated += 1
+            while len(self._open_tickets) > self.max_open_tickets:
+                self._open_tickets.popitem(last=False)
+                self.stats.evicted += 1
+
+    def track_called(self, answering_ticket: AnsweringTicket) -> Optional[TicketLifecycle]:
+        """
+        Closes the lifecycle of a called ticket and emits it to the handlers.
+
+        Args:
+            answering_ticket (AnsweringTicket): The called ticket.
+
+        Returns:
+            Optional[TicketLifecycle]: The lifecycle, or None if the ticket was not open.
+        """
+        with self._lock:
+            self._expire(self._clock())
+            entry = self._open_tickets.pop(answering_ticket.id, None)
+            if entry is None:
+                self.stats.unmatched_calls += 1
+                return None
+            self.stats.completed += 1
+
+        ticket = entry[0]
+        lifecycle = TicketLifecycle(
+            ticket=ticket,
+            answering_ticket=answering_ticket,
+            generated_at=_as_utc_datetime(ticket.created_at),
+            called_at=_as_utc_datetime(answering_ticket.created_at),
+        )
+        for handler in list(self._lifecycle_handlers):
+            try:
+                handler(lifecycle)
+            except Exception:
+                logger.exception("Ticket lifecycle handler failed.")
+        return lifecycle
+
+    def reset(self, queuing_system_reset: Optional[QueuingSystemReset] = None) -> None:
+        """
+        Drops every open ticket, since tickets are invalidated by resets of the queuing system.
+
+        Args:
+            queuing_system_reset (QueuingSystemReset, optional): The reset event.
+        """
+        with self._lock:
+            self.stats.reset += len(self._open_tickets)
+            self._open_tickets.clear()
+
+    def expire(self) -> int:
+        """
+        Drops the open tickets whose TTL elapsed. This also happens whenever an event is tracked.
+
+        Returns:
+            int: Number of dropped tickets.
+        """
+        with self._lock:
+            return self._expire(self._clock())
+
+    def _expire(self, now: float) -> int:
+        expired = 0
+        while self._open_tickets:
+            ticket_id, (_, expires_at) = next(iter(self._open_tickets.items()))
+            if expires_at > now:
+                break
+            del self._open_tickets[ticket_id]
+            expired += 1
+        self.stats.expired += expired
+        return expired
@@ -0,0 +1,214 @@
+import time
+import zlib
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, List, Optional
+
+from pyqube.events.clients import MQTTClient
+from pyqube.events.handlers import (
+    QueueHandler,
+    QueuingSystemResetHandler,
+    TicketHandler,
+)
+from pyqube.events.reconnect import ConnectionGap
+
+
+class LocationEvents(TicketHandler, QueuingSystemResetHandler, QueueHandler):
+    """
+    Event handlers of one location, registered on an MQTT connection shared with other locations.
+    It exposes the same `on_*` decorators as MQTTClient, scoped to its location.
+    """
+
+    def __init__(self, connection: MQTTClient, location_id: int):
+        """
+        Initializes the Location Events.
+
+        Args:
+            connection (MQTTClient): Connection to the broker where handlers are registered and dispatched.
+            location_id (int): Location ID used in the topics of the handlers.
+        """
+        super().__init__()
+        self.connection = connection
+        self.location_id = location_id
+        self.wildcard_subscriptions = connection.wildcard_subscriptions
+
+    @property
+    def message_handlers(self):
+        """Handlers of the shared connection. See MQTTClient.message_handlers."""
+        return self.connection.message_handlers
+
+    @message_handlers.setter
+    def message_handlers(self, handlers) -> None:
+        # Handlers are kept by the connection: only the empty table set by MQTTEventHandlerBase is accepted
+        if handlers is not None:
+            raise AttributeError("Handlers of a location are kept by its connection and can't be replaced.")
+
+    def subscribe_to_topic(self, topic: str, handler: Callable[[bytes], None], **subscribe_options) -> None:
+        """Registers a handler on the shared connection. See MQTTClient.subscribe_to_topic."""
+        self.connection.subscribe_to_topic(topic, handler, **subscribe_options)
+
+    def unsubscribe_from_topic(self, topic: str) -> None:
+        """Removes the handlers of a topic from the shared connection. See MQTTClient.unsubscribe_from_topic."""
+        self.connection.unsubscribe_from_topic(topic)
+
+    def remove_handler(self, topic: str, handler: Callable[[bytes], None]) -> None:
+        """Removes one handler of a topic from the shared connection. See MQTTClient.remove_handler."""
+        self.connection.remove_handler(topic, handler)
+
+    def batch_subscriptions(self):
+        """Batches the subscriptions of the shared connection. See MQTTClient.batch_subscriptions."""
+        return self.connection.batch_subscriptions()
+
+
+class MultiLocationMQTTClient:
+    """
+    MQTT client that receives the events of many locations over one connection, or a small pool of connections,
+    to the broker, instead of one connection and network thread per location.
+    Locations are assigned to connections by their id and each connection dispatches the messages of all its
+    locations.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        broker_url: str = None,
+        broker_port: int = None,
+        connections: int = 1,
+        client_id: Optional[str] = None,
+        **mqtt_options
+    ):
+        """
+        Initializes and connects the pool of MQTT connections.
+
+        Args:
+            api_key (str): API key for client authentication.
+            broker_url (str, optional): URL of the MQTT broker. Defaults to MQTTClient.DEFAULT_BROKER_URL.
+            broker_port (int, optional): Port of the MQTT broker. Defaults to MQTTClient.DEFAULT_BROKER_PORT.
+            connections (int, optional): Number of connections to the broker. Defaults to 1.
+            client_id (str, optional): MQTT client id. With more than one connection, the index of each connection is
+                appended to it. Persistent sessions derive one from the API key when it is not given.
+            **mqtt_options: Extra options of each MQTTClient (e.g. `wildcard_subscriptions` or `clean_session`).
+
+        Raises:
+            ValueError: If `connections` is lower than 1.
+            ConnectionError: If unable to connect to the broker.
+        """
+        if connections < 1:
+            raise ValueError("At least one connection is needed.")
+
+        if client_id is None and not mqtt_options.get("clean_session", True):
+            client_id = MQTTClient.generate_client_id(api_key, "multi")
+
+        self._connections: List[MQTTClient] = []
+        for index in range(connections):
+            connection_client_id = client_id
+            if client_id and connections > 1:
+                connection_client_id = f"{client_id}-{index}"
+            self._connections.append(
+                MQTTClient(api_key, None, broker_url, broker_port, client_id=connection_client_id, **mqtt_options)
+            )
+        self._locations: Dict[int, LocationEvents] = {}
+
+    @property
+    def connections(self) -> List[MQTTClient]:
+        """Connections to the broker."""
+        return list(self._connections)
+
+    def get_connection(self, location_id: int) -> MQTTClient:
+        """
+        Returns the connection that receives the events of a location, from the CRC32 of its id, which (unlike
+        `hash`) is the same in every process and for any type of id.
+
+        Args:
+            location_id (int): Location ID.
+
+        Returns:
+            MQTTClient: The connection assigned to the location.
+        """
+        return self._connections[zlib.crc32(str(location_id).encode('utf-8')) % len(self._connections)]
+
+    def location(self, location_id: int) -> LocationEvents:
+        """
+        Returns the event handlers of a location, whose `on_*` decorators register handlers on the shared connection.
+
+        Args:
+            location_id (int): Location ID.
+
+        Returns:
+            LocationEvents: Event handlers of the location.
+        """
+        if location_id not in self._locations:
+            self._locations[location_id] = LocationEvents(self.get_connection(location_id), location_id)
+        return self._locations[location_id]
+
+    def list_locations(self) -> List[int]:
+        """
+        Lists the locations whose event handlers were requested through `location`.
+        """
+        return list(self._locations)
+
+    @contextmanager
+    def batch_subscriptions(self):
+        """
+        Batches the subscriptions of every connection, so that handlers registered for many locations are subscribed
+        in multi-topic SUBSCRIBE packets. See MQTTClient.batch_subscriptions.
+        """
+        with ExitStack() as stack:
+            for connection in self._connections:
+                stack.enter_context(connection.batch_subscriptions())
+            yield self
+
+    def on_connection_gap(self):
+        """
+        Registers a handler called after any of the connections reconnects, with the ConnectionGap in which events may
+        have been lost and the IDs of the locations assigned to that connection, which may need to be re-synced.
+        See MQTTClient.on_connection_gap.
+
+        Returns:
+            The decorator for the handler function.
+        """
+
+        def decorator(func: Callable[[ConnectionGap, List[int]], None]):
+            for connection in self._connections:
+
+                def connection_gap_handler(gap: ConnectionGap, connection: MQTTClient = connection):
+                    func(gap, [
+                        location_id for location_id, location in self._locations.items()
+                        if location.connection is connection
+                    ])
+
+                connection.on_connection_gap()(connection_gap_handler)
+            return func
+
+        return decorator
+
+    def start(self) -> "MultiLocationMQTTClient":
+        """
+        Starts every connection in the background, so that they connect in parallel. Only needed with the
+        `lazy_connect` option. See MQTTClient.start.
+        """
+        for connection in self._connections:
+            connection.start()
+        return self
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Starts every connection and waits until all of them are connected.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait for all connections. Defaults to no limit.
+
+        Returns:
+            bool: False if the timeout elapsed first.
+        """
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for connection in self._connections:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not connection.ready.wait(remaining):
+                return False
+        return True
+
+    def disconnect(self) -> None:
+        """Disconnects every connection from the broker."""
+        for connection in self._connections:
+            connection.disconnect()
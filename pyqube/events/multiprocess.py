@@ -0,0 +1,430 @@
+import logging
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+from pyqube.events.clients import MQTTClient
+from pyqube.events.handlers import (
+    QueueHandler,
+    QueuingSystemResetHandler,
+    TicketHandler,
+)
+from pyqube.events.routing import Handlers, RoutingTable
+from pyqube.serialization import loads
+
+
+logger = logging.getLogger(__name__)
+
+PartitionKey = Callable[[str, bytes], Hashable]
+
+
+class SharedRingBuffer:
+    """
+    Single-producer, single-consumer ring buffer of (topic, payload) records in shared memory, so that one process can
+    hand raw messages to another without pickling nor pipes.
+    The write and read positions grow monotonically and live on separate cache lines of the header; each side only
+    writes its own position, after the record itself. Records are 8-byte aligned and never split: when one doesn't
+    fit before the end of the buffer, a wrap marker sends the reader back to the start.
+    A position is published, and the other side's position read, while holding a process-shared lock, whose acquire
+    and release are memory barriers: the reader never sees a new write position before the bytes of its record, nor
+    the writer a new read position before the record was copied, even on processors with weak memory ordering (e.g.
+    ARM). Record bytes are copied outside the lock, which is only held to load or store one position.
+    """
+
+    HEADER_SIZE = 192  # Write position at 0, read position at 64 and capacity at 128, on separate cache lines
+    WRITE_POSITION = 0
+    READ_POSITION = 64
+    CAPACITY = 128
+    POSITION = struct.Struct("<Q")
+    RECORD_HEADER = struct.Struct("<IH")  # Payload length and topic length
+    WRAP_MARKER = 0xFFFFFFFF
+    ALIGNMENT = 8
+
+    def __init__(self, shared_memory: SharedMemory, owner: bool, lock):
+        self.shared_memory = shared_memory
+        self.owner = owner
+        self.lock = lock
+        self.name = shared_memory.name
+        self._buffer = shared_memory.buf
+        self.capacity = self.POSITION.unpack_from(self._buffer, self.CAPACITY)[0]
+
+    @classmethod
+    def create(cls, capacity: int = 4 * 1024 * 1024, lock=None) -> "SharedRingBuffer":
+        """
+        Creates a ring buffer in a new block of shared memory.
+
+        Args:
+            capacity (int, optional): Size in bytes of the records area. Defaults to 4MB.
+            lock (multiprocessing.Lock, optional): Lock that publishes the positions, which must be given to the
+                processes that attach to the buffer. Defaults to a new lock of the default context.
+
+        Returns:
+            SharedRingBuffer: The ring buffer, which owns (and unlinks when closed) the shared memory.
+        """
+        capacity -= capacity % cls.ALIGNMENT
+        if capacity <= 0:
+            raise ValueError("The capacity of the ring buffer must be positive.")
+        shared_memory = SharedMemory(create=True, size=cls.HEADER_SIZE + capacity)
+        buffer = shared_memory.buf
+        cls.POSITION.pack_into(buffer, cls.WRITE_POSITION, 0)
+        cls.POSITION.pack_into(buffer, cls.READ_POSITION, 0)
+        cls.POSITION.pack_into(buffer, cls.CAPACITY, capacity)
+        return cls(shared_memory, owner=True, lock=lock or multiprocessing.Lock())
+
+    @classmethod
+    def attach(cls, name: str, lock) -> "SharedRingBuffer":
+        """
+        Attaches to a ring buffer created by another process. The processes must share the resource tracker of the
+        creator (as its child processes do), which would otherwise unlink the shared memory when this one exits.
+
+        Args:
+            name (str): Name of the ring buffer's shared memory.
+            lock (multiprocessing.Lock): The `lock` of the ring buffer, as created.
+
+        Returns:
+            SharedRingBuffer: The ring buffer.
+        """
+        return cls(SharedMemory(name=name), owner=False, lock=lock)
+
+    def _get_position(self, position: int) -> int:
+        """Reads a position written by this side, which needs no synchronization."""
+        return self.POSITION.unpack_from(self._buffer, position)[0]
+
+    def _load_position(self, position: int) -> int:
+        """Reads a position published by the other side, after the bytes it covers."""
+        with self.lock:
+            return self.POSITION.unpack_from(self._buffer, position)[0]
+
+    def _store_position(self, position: int, value: int) -> None:
+        """Publishes a position, after the bytes it covers."""
+        with self.lock:
+            self.POSITION.pack_into(self._buffer, position, value)
+
+    def __len__(self) -> int:
+        """Number of bytes written and not read yet."""
+        with self.lock:
+            return self._get_position(self.WRITE_POSITION) - self._get_position(self.READ_POSITION)
+
+    def _aligned(self, size: int) -> int:
+        return (size + self.ALIGNMENT - 1) // self.ALIGNMENT * self.ALIGNMENT
+
+    def put(self, topic: bytes, payload: bytes) -> bool:
+        """
+        Writes a record. Only one process (the producer) may call it.
+
+        Args:
+            topic (bytes): The topic, encoded.
+            payload (bytes): The payload.
+
+        Returns:
+            bool: False if there is not enough free space.
+
+        Raises:
+            ValueError: If the record is larger than the buffer.
+        """
+        size = self._aligned(self.RECORD_HEADER.size + len(topic) + len(payload))
+        if size > self.capacity:
+            raise ValueError(f"Record of {size} bytes doesn't fit in a ring buffer of {self.capacity} bytes.")
+        write_position = self._get_position(self.WRITE_POSITION)
+        offset = write_position % self.capacity
+        skipped = self.capacity - offset if size > self.capacity - offset else 0
+        if write_position + skipped + size - self._load_position(self.READ_POSITION) > self.capacity:
+            return False
+
+        buffer = self._buffer
+        if skipped:
+            self.RECORD_HEADER.pack_into(buffer, self.HEADER_SIZE + offset, self.WRAP_MARKER, 0)
+            offset = 0
+        start = self.HEADER_SIZE + offset
+        self.RECORD_HEADER.pack_into(buffer, start, len(payload), len(topic))
+        start += self.RECORD_HEADER.size
+        buffer[start:start + len(topic)] = topic
+        start += len(topic)
+        buffer[start:start + len(payload)] = payload
+        # Published only after every byte of the record is written, so the consumer never sees a partial record
+        self._store_position(self.WRITE_POSITION, write_position + skipped + size)
+        return True
+
+    def get(self) -> Optional[Tuple[bytes, bytes]]:
+        """
+        Reads the oldest record. Only one process (the consumer) may call it.
+
+        Returns:
+            Optional[Tuple[bytes, bytes]]: Topic and payload, or None if the buffer is empty.
+        """
+        buffer = self._buffer
+        read_position = self._get_position(self.READ_POSITION)
+        while read_position != self._load_position(self.WRITE_POSITION):
+            offset = read_position % self.capacity
+            start = self.HEADER_SIZE + offset
+            payload_length, topic_length = self.RECORD_HEADER.unpack_from(buffer, start)
+            if payload_length == self.WRAP_MARKER:
+                read_position += self.capacity - offset
+                self._store_position(self.READ_POSITION, read_position)
+                continue
+            start += self.RECORD_HEADER.size
+            topic = bytes(buffer[start:start + topic_length])
+            start += topic_length
+            payload = bytes(buffer[start:start + payload_length])
+            size = self._aligned(self.RECORD_HEADER.size + topic_length + payload_length)
+            self._store_position(self.READ_POSITION, read_position + size)
+            return topic, payload
+        return None
+
+    def close(self) -> None:
+        """Detaches from the shared memory, which is also unlinked by its owner."""
+        self._buffer = None
+        self.shared_memory.close()
+        if self.owner:
+            self.shared_memory.unlink()
+
+
+def topic_partition_key(topic: str, payload: bytes) -> Hashable:
+    """
+    Partitions messages by the queue or counter in their topic (e.g. `locations/1/queues/3/tickets/called`), and other
+    messages by topic.
+    """
+    levels = topic.split("/")
+    for index, level in enumerate(levels[:-1]):
+        if level in ("queues", "counters") and levels[index + 1].isdigit():
+            return level, int(levels[index + 1])
+    return topic
+
+
+def queue_partition_key(topic: str, payload: bytes) -> Hashable:
+    """
+    Partitions messages by the queue of their payload, so that the events of a ticket (e.g. generated and called)
+    are handled in order by the same worker. Payloads without a queue are partitioned by `topic_partition_key`.
+    """
+    try:
+        data = loads(payload)
+    except ValueError:
+        data = None
+    if isinstance(data, dict) and "queue" in data:
+        queue = data["queue"]
+        return "queues", queue.get("id") if isinstance(queue, dict) else queue
+    return topic_partition_key(topic, payload)
+
+
+class WorkerEvents(TicketHandler, QueuingSystemResetHandler, QueueHandler):
+    """
+    Event handlers of a worker process. Handlers are registered with the same `on_*` decorators as on MQTTClient and
+    called with the messages read from the worker's ring buffer.
+    """
+
+    def __init__(self, location_id: int, wildcard_subscriptions: bool = False):
+        super().__init__()
+        self.location_id = location_id
+        self.wildcard_subscriptions = wildcard_subscriptions
+
+    @property
+    def message_handlers(self) -> Mapping[str, Handlers]:
+        """Read-only snapshot of the handlers of each topic. See MQTTClient.message_handlers."""
+        return self._routes.handlers
+
+    @message_handlers.setter
+    def message_handlers(self, handlers: Optional[Mapping[str, Iterable[Callable[[bytes], None]]]]) -> None:
+        self._routes = RoutingTable(handlers)
+
+    def subscribe_to_topic(
+        self,
+        topic: str,
+        handler: Callable[[bytes], None],
+        subscription_topic: Optional[str] = None,
+        qos: int = 0
+    ) -> None:
+        """Registers a handler. The subscription itself is made by the process that owns the connection."""
+        self._routes = self._routes.with_handler(topic, handler)
+
+    def dispatch_message(self, topic: str, payload: bytes) -> None:
+        """
+        Calls the handlers of a message. Errors are logged, so that a failing handler doesn't stop the worker.
+        """
+        for handler_topic, handlers in self._routes.matching(topic):
+            for handler in handlers:
+                try:
+                    handler(payload)
+                except Exception:
+                    logger.exception("Error in handler for topic '%s'.", handler_topic)
+
+
+def _run_worker(
+    ring_name: str,
+    ring_lock,
+    setup: Callable[[WorkerEvents], None],
+    location_id: int,
+    wildcard_subscriptions: bool,
+    stop_event,
+    max_idle_sleep: float,
+) -> None:
+    """Entry point of worker processes: registers the handlers and dispatches the messages of the ring buffer."""
+    ring = SharedRingBuffer.attach(ring_name, ring_lock)
+    events = WorkerEvents(location_id, wildcard_subscriptions)
+    setup(events)
+    idle_sleep = 0.0
+    try:
+        while True:
+            record = ring.get()
+            if record is None:
+                if stop_event.is_set():
+                    return
+                # Back off while idle, up to `max_idle_sleep`, so that an idle worker barely uses CPU
+                idle_sleep = min(max(idle_sleep * 2, 0.0001), max_idle_sleep)
+                time.sleep(idle_sleep)
+                continue
+            idle_sleep = 0.0
+            topic, payload = record
+            events.dispatch_message(topic.decode('utf-8'), payload)
+    finally:
+        ring.close()
+
+
+@dataclass
+class FanoutStats:
+    """
+    Counters of a MultiProcessMQTTClient.
+    """
+    forwarded: int = 0
+    dropped: int = 0  # Messages dropped because the ring buffer of their worker was full
+
+
+class MultiProcessMQTTClient(MQTTClient):
+    """
+    MQTT client that owns the connection to the broker and fans out the raw messages to worker processes, which
+    decode them and run the handlers, so that handler work scales across cores instead of sharing one GIL.
+    Handlers are registered by a `setup` function, called with this client (to subscribe to the topics) and with the
+    WorkerEvents of each worker (to run the handlers there), so the usual `on_*` decorators are used. Messages are
+    partitioned by a key (by default the queue or counter of the topic) and each worker has its own shared-memory
+    ring buffer, so that the messages of a key are handled in order by one worker.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        location_id: int,
+        setup: Callable[[TicketHandler], None],
+        workers: Optional[int] = None,
+        partition_key: PartitionKey = topic_partition_key,
+        ring_size: int = 4 * 1024 * 1024,
+        max_idle_sleep: float = 0.005,
+        mp_context: Optional[multiprocessing.context.BaseContext] = None,
+        **mqtt_options
+    ):
+        """
+        Initializes the client, starts the workers and registers the handlers of `setup`.
+
+        Args:
+            api_key (str): API key for client authentication.
+            location_id (int): Location ID to use in requests.
+            setup (Callable[[TicketHandler], None]): Function that registers the handlers with the `on_*` decorators
+                of the client given to it. It must be picklable (e.g. a module-level function) with the `spawn` start
+                method.
+            workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            partition_key (Callable[[str, bytes], Hashable], optional): Function of the topic and payload of a message
+                that returns its key. Defaults to topic_partition_key.
+            ring_size (int, optional): Size in bytes of each worker's ring buffer. Messages that don't fit in it are
+                dropped, so it must absorb the bursts that the worker can't keep up with. Defaults to 4MB.
+            max_idle_sleep (float, optional): Maximum seconds an idle worker sleeps between checks of its ring
+                buffer. Defaults to 5ms.
+            mp_context (multiprocessing.context.BaseContext, optional): Context used to start the workers.
+            **mqtt_options: Extra options of MQTTClient (e.g. `reconnect_policy` or `lazy_connect`).
+        """
+        lazy_connect = mqtt_options.pop("lazy_connect", False)
+        # The connection is only made once the workers are running, so no message is received before
+        super().__init__(api_key, location_id, lazy_connect=True, **mqtt_options)
+        self.setup = setup
+        self.partition_key = partition_key
+        self.fanout_stats = FanoutStats()
+        self._mp_context = mp_context or multiprocessing.get_context()
+        self._stop_event = self._mp_context.Event()
+        self._rings: List[SharedRingBuffer] = []
+        self._workers = []
+        self._fanout_lock = threading.Lock()
+
+        try:
+            for _ in range(workers or os.cpu_count() or 1):
+                ring = SharedRingBuffer.create(ring_size, self._mp_context.Lock())
+                self._rings.append(ring)
+                worker = self._mp_context.Process(
+                    target=_run_worker,
+                    args=(
+                        ring.name, ring.lock, setup, location_id, self.wildcard_subscriptions, self._stop_event,
+                        max_idle_sleep
+                    ),
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+        except Exception:
+            self.stop_workers()
+            raise
+
+        if not lazy_connect:
+            self._connect_to_broker()
+        setup(self)
+
+    @property
+    def workers(self) -> list:
+        """Worker processes."""
+        return list(self._workers)
+
+    def get_worker_index(self, topic: str, payload: bytes) -> int:
+        """
+        Returns the index of the worker that handles a message, from the CRC32 of its key, which (unlike `hash`) is
+        the same in every process.
+        """
+        key = self.partition_key(topic, payload)
+        return zlib.crc32(repr(key).encode('utf-8')) % len(self._rings)
+
+    def dispatch_message(self, topic: str, payload: bytes) -> None:
+        """
+        Writes a message to the ring buffer of the worker of its key, instead of calling the handlers in this process.
+        If the ring buffer is full, the message is dropped and counted at once: waiting for the worker would stall the
+        network loop, and with it keepalives and the messages of every other worker.
+
+        Args:
+            topic (str): The topic the message was published to.
+            payload (bytes): The message payload.
+        """
+        ring = self._rings[self.get_worker_index(topic, payload)]
+        topic_bytes = topic.encode('utf-8')
+        with self._fanout_lock:
+            if ring.put(topic_bytes, payload):
+                self.fanout_stats.forwarded += 1
+                return
+            self.fanout_stats.dropped += 1
+        logger.error("Dropped message of topic '%s': the ring buffer of its worker is full.", topic)
+
+    def backlog(self) -> List[int]:
+        """Bytes waiting to be handled in the ring buffer of each worker."""
+        return [len(ring) for ring in self._rings]
+
+    def stop_workers(self, timeout: Optional[float] = 10) -> None:
+        """
+        Stops the workers once they have handled the messages of their ring buffers, and releases the shared memory.
+
+        Args:
+            timeout (float, optional): Seconds to wait for each worker before terminating it. Defaults to 10.
+        """
+        self._stop_event.set()
+        for worker in self._workers:
+            worker.join(timeout)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+        self._workers = []
+        with self._fanout_lock:
+            for ring in self._rings:
+                ring.close()
+            self._rings = []
+
+    def disconnect(self) -> None:
+        """Disconnects from the broker and stops the workers."""
+        super().disconnect()
+        self.stop_workers()
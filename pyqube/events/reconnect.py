@@ -0,0 +1,82 @@
+import random
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+class ReconnectPolicy:
+    """
+    Exponential backoff with jitter used to space reconnection attempts to the MQTT broker.
+    Jitter spreads the reconnections of many clients that lost the broker at the same time.
+    """
+
+    def __init__(
+        self,
+        min_delay: float = 1.0,
+        max_delay: float = 120.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+        rng: Optional[random.Random] = None,
+    ):
+        """
+        Initializes the Reconnect Policy.
+
+        Args:
+            min_delay (float, optional): Delay in seconds before the first reconnection attempt. Defaults to 1.
+            max_delay (float, optional): Upper bound in seconds of the delay between attempts. Defaults to 120.
+            multiplier (float, optional): Factor applied to the delay after each failed attempt. Defaults to 2.
+            jitter (float, optional): Fraction (0 to 1) of the delay that is randomized. Defaults to 0.5, which
+                gives delays between 50% and 100% of the exponential value.
+            rng (random.Random, optional): Random generator used for jitter.
+        """
+        if not 0 <= jitter <= 1:
+            raise ValueError("Jitter must be between 0 and 1.")
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        Returns the delay to wait before a reconnection attempt.
+
+        Args:
+            attempt (int): Number of attempts already made since the connection was lost (0 for the first one).
+
+        Returns:
+            float: Delay in seconds.
+        """
+        delay = min(self.max_delay, self.min_delay * self.multiplier**attempt)
+        return delay * (1 - self.jitter * self._rng.random())
+
+
+@dataclass
+class ConnectionGap:
+    """
+    Period in which the client was disconnected from the broker. Events published in this period may have been lost.
+    """
+    disconnected_at: datetime
+    reconnected_at: datetime
+    attempts: int
+    session_present: bool = False
+
+    @property
+    def duration(self) -> float:
+        """Duration of the gap in seconds."""
+        return (self.reconnected_at - self.disconnected_at).total_seconds()
+
+
+@dataclass
+class ConnectionStats:
+    """
+    Counters about the connection of an MQTT client to the broker.
+    """
+    connections: int = 0
+    reconnections: int = 0
+    disconnections: int = 0
+    failed_attempts: int = 0
+    messages_received: int = 0
+    total_downtime: float = 0.0
+    last_connected_at: Optional[datetime] = None
+    last_disconnected_at: Optional[datetime] = None
@@ -0,0 +1,77 @@
+from types import MappingProxyType
+from typing import Callable, Iterable, Iterator, Mapping, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+
+Handlers = Tuple[Callable[[bytes], None], ...]
+
+
+class RoutingTable:
+    """
+    Immutable table of the handlers of each topic, read when messages are dispatched.
+    Registering or removing handlers builds a new table, which replaces the previous one with a single assignment, so
+    messages can be dispatched without locks while handlers change in other threads: each message is dispatched with
+    the table that was current when it arrived, and is never affected by changes made meanwhile. Building a table
+    copies the mapping of topics, which is cheap compared to the subscription it comes with.
+    """
+
+    __slots__ = ("handlers", "wildcard_topics")
+
+    def __init__(self, handlers: Optional[Mapping[str, Iterable[Callable[[bytes], None]]]] = None):
+        """
+        Initializes the Routing Table.
+
+        Args:
+            handlers (Mapping[str, Iterable[Callable[[bytes], None]]], optional): Handlers of each topic.
+        """
+        table = {topic: tuple(topic_handlers) for topic, topic_handlers in (handlers or {}).items()}
+        self.handlers: Mapping[str, Handlers] = MappingProxyType(table)
+        # Handler topics that need MQTT wildcard matching, in registration order, so dispatch order is deterministic
+        self.wildcard_topics: Tuple[str, ...] = tuple(topic for topic in table if "+" in topic or "#" in topic)
+
+    def with_handler(self, topic: str, handler: Callable[[bytes], None]) -> "RoutingTable":
+        """
+        Returns a table where `handler` is also registered for `topic`, or this table if it already is.
+        """
+        topic_handlers = self.handlers.get(topic, ())
+        if handler in topic_handlers:
+            return self
+        return RoutingTable({**self.handlers, topic: topic_handlers + (handler, )})
+
+    def without_handler(self, topic: str, handler: Callable[[bytes], None]) -> "RoutingTable":
+        """
+        Returns a table without `handler` for `topic` (nor `topic`, if it was its last handler), or this table if it
+        isn't registered.
+        """
+        topic_handlers = self.handlers.get(topic, ())
+        if handler not in topic_handlers:
+            return self
+        handlers = dict(self.handlers)
+        handlers[topic] = tuple(topic_handler for topic_handler in topic_handlers if topic_handler != handler)
+        if not handlers[topic]:
+            del handlers[topic]
+        return RoutingTable(handlers)
+
+    def without_topic(self, topic: str) -> "RoutingTable":
+        """
+        Returns a table without the handlers of `topic`, or this table if it has none.
+        """
+        if topic not in self.handlers:
+            return self
+        handlers = dict(self.handlers)
+        del handlers[topic]
+        return RoutingTable(handlers)
+
+    def matching(self, topic: str) -> Iterator[Tuple[str, Handlers]]:
+        """
+        Yields the handler topics that match a message topic, with their handlers. Handlers registered for the exact
+        topic (like per-queue handlers behind a wildcard subscription) are found with a single lookup; only handlers
+        registered with wildcard topics are matched one by one, in the order their topics were registered.
+        """
+        handlers = self.handlers.get(topic)
+        if handlers:
+            yield topic, handlers
+        for handler_topic in self.wildcard_topics:
+            if mqtt.topic_matches_sub(handler_topic, topic):
+                yield handler_topic, self.handlers[handler_topic]
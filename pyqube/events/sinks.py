@@ -0,0 +1,316 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from pyqube.events.handlers import TicketHandler
+from pyqube.types import Answering, AnsweringTicket, Ticket
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS tickets (
+        id INTEGER PRIMARY KEY,
+        queue INTEGER,
+        number INTEGER,
+        printed_tag TEXT,
+        printed_number TEXT,
+        priority INTEGER,
+        state INTEGER,
+        created_at TEXT,
+        updated_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS called_tickets (
+        ticket INTEGER,
+        answering INTEGER,
+        queue INTEGER,
+        counter INTEGER,
+        printed_tag TEXT,
+        printed_number TEXT,
+        priority INTEGER,
+        created_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS answerings (
+        id INTEGER PRIMARY KEY,
+        ticket INTEGER,
+        queue INTEGER,
+        counter INTEGER,
+        profile INTEGER,
+        finish_reason INTEGER,
+        waiting_time INTEGER,
+        service_time INTEGER,
+        created_at TEXT,
+        started_at TEXT,
+        finished_at TEXT
+    )
+    """,
+)
+
+# Tickets and Answerings are updated when they are written again (e.g. when an Answering ends)
+INSERT_STATEMENTS = {
+    "tickets": "INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "called_tickets": "INSERT INTO called_tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "answerings": "INSERT OR REPLACE INTO answerings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+}
+
+
+def _to_text(value) -> Optional[str]:
+    """Converts datetimes to ISO 8601 strings, which SQLite sorts chronologically."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+@dataclass
+class SinkStats:
+    """
+    Counters of a SQLiteSink.
+    """
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0  # Records refused because the backlog was full
+    failed: int = 0  # Records lost because their transaction failed
+    flushes: int = 0
+    last_flush_latency: float = 0.0  # Seconds taken by the last transaction
+    max_flush_latency: float = 0.0
+    last_flushed_at: Optional[float] = None
+
+
+class SQLiteSink:
+    """
+    Persists Tickets, called tickets (AnsweringTicket) and Answerings to a local SQLite database.
+    Records are only appended to an in-memory buffer by the handlers, so the MQTT network thread is never blocked by
+    the database. A background writer inserts them in batched transactions, with one prepared statement per table
+    (`executemany`), when `batch_size` records are buffered or `flush_interval` seconds have elapsed. The database is
+    used in WAL mode, so reports can read it while events are written.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_backlog: int = 100000,
+    ):
+        """
+        Initializes the SQLite Sink, creating its tables if needed, and starts its writer.
+
+        Args:
+            path (str): Path of the SQLite database.
+            batch_size (int, optional): Number of buffered records that triggers a flush. Defaults to 500.
+            flush_interval (float, optional): Maximum seconds a record stays buffered. Defaults to 1.
+            max_backlog (int, optional): Maximum number of buffered records. Records written while the backlog is
+                full are dropped (and counted in `stats.dropped`). Defaults to 100000.
+
+        Raises:
+            sqlite3.Error: If the database can't be opened.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backlog = max_backlog
+        self.stats = SinkStats()
+        self._buffer: Deque[Tuple[str, tuple]] = deque()
+        self._condition = threading.Condition()
+        self._flush_requests = 0
+        self._completed_flushes = 0
+        self._closed = False
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+
+        self._writer = threading.Thread(target=self._run_writer, name="pyqube-sqlite-sink", daemon=True)
+        self._writer.start()
+
+    def __enter__(self) -> "SQLiteSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def backlog(self) -> int:
+        """Number of records waiting to be written."""
+        return len(self._buffer)
+
+    def attach(self, events: TicketHandler, qos: int = 0) -> "SQLiteSink":
+        """
+        Registers the handlers that write generated tickets and tickets called in any queue.
+
+        Args:
+            events (TicketHandler): Client (e.g. MQTTClient or LocationEvents) that receives the events of a location.
+            qos (int, optional): MQTT QoS level (0, 1 or 2) of the subscriptions. Defaults to 0.
+
+        Returns:
+            SQLiteSink: The sink.
+        """
+        events.on_ticket_generated(qos=qos)(self.write_ticket)
+        events.on_ticket_called(all_queues=True, qos=qos)(self.write_answering_ticket)
+        return self
+
+    def write_ticket(self, ticket: Ticket) -> bool:
+        """
+        Buffers a Ticket to be written.
+
+        Returns:
+            bool: False if it was dropped because the backlog is full.
+        """
+        return self._enqueue(
+            "tickets", (
+                ticket.id,
+                ticket.queue,
+                ticket.number,
+                ticket.printed_tag,
+                ticket.printed_number,
+                ticket.priority,
+                ticket.state,
+                _to_text(ticket.created_at),
+                _to_text(ticket.updated_at),
+            )
+        )
+
+    def write_answering_ticket(self, answering_ticket: AnsweringTicket) -> bool:
+        """
+        Buffers a called ticket to be written.
+
+        Returns:
+            bool: False if it was dropped because the backlog is full.
+        """
+        return self._enqueue(
+            "called_tickets", (
+                answering_ticket.id,
+                answering_ticket.answering,
+                answering_ticket.queue,
+                answering_ticket.counter,
+                answering_ticket.printed_tag,
+                answering_ticket.printed_number,
+                answering_ticket.priority,
+                _to_text(answering_ticket.created_at),
+            )
+        )
+
+    def write_answering(self, answering: Answering) -> bool:
+        """
+        Buffers an Answering (e.g. returned by `end_answering`) to be written.
+
+        Returns:
+            bool: False if it was dropped because the backlog is full.
+        """
+        ticket = answering.ticket.id if isinstance(answering.ticket, Ticket) else answering.ticket
+        return self._enqueue(
+            "answerings", (
+                answering.id,
+                ticket,
+                answering.queue,
+                answering.counter,
+                answering.profile,
+                answering.finish_reason,
+                answering.waiting_time,
+                answering.service_time,
+                _to_text(answering.created_at),
+                _to_text(answering.started_at),
+                _to_text(answering.finished_at),
+            )
+        )
+
+    def _enqueue(self, table: str, row: tuple) -> bool:
+        # Checked and appended under the condition, so that no record is appended after the writer's last batch, nor
+        # past `max_backlog` by concurrent producers
+        with self._condition:
+            if self._closed or len(self._buffer) >= self.max_backlog:
+                self.stats.dropped += 1
+                return False
+            self._buffer.append((table, row))
+            self.stats.enqueued += 1
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Writes every buffered record, waiting for the writer to commit them. Once the sink is closed, it only waits
+        for the writer to write the records buffered before closing, if it is still writing them.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Defaults to waiting until they are written.
+
+        Returns:
+            bool: False if the timeout elapsed first.
+        """
+        with self._condition:
+            if not self._closed:
+                self._flush_requests += 1
+                request = self._flush_requests
+                self._condition.notify_all()
+                return self._condition.wait_for(lambda: self._completed_flushes >= request, timeout)
+        # The writer writes every buffered record before it exits, and requests made before closing are completed by
+        # its last batch
+        self._writer.join(timeout)
+        return not self._writer.is_alive()
+
+    def close(self) -> None:
+        """Writes the buffered records, stops the writer and closes the database."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self._connection.close()
+
+    def _run_writer(self) -> None:
+        """Writes batches of buffered records until the sink is closed."""
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            with self._condition:
+                self._condition.wait_for(self._should_write, max(deadline - time.monotonic(), 0))
+                request = self._flush_requests
+                closed = self._closed
+            self._write_buffer()
+            deadline = time.monotonic() + self.flush_interval
+            with self._condition:
+                self._completed_flushes = request
+                self._condition.notify_all()
+            if closed:
+                return
+
+    def _should_write(self) -> bool:
+        return self._closed or self._flush_requests > self._completed_flushes or len(self._buffer) >= self.batch_size
+
+    def _write_buffer(self) -> None:
+        """Writes the buffered records in one transaction."""
+        rows_by_table: Dict[str, List[tuple]] = {}
+        count = len(self._buffer)
+        if not count:
+            return
+        for _ in range(count):
+            table, row = self._buffer.popleft()
+            rows_by_table.setdefault(table, []).append(row)
+
+        start = time.monotonic()
+        try:
+            with self._connection:
+                for table, rows in rows_by_table.items():
+                    self._connection.executemany(INSERT_STATEMENTS[table], rows)
+        except sqlite3.Error:
+            logger.exception("Failed to write %d records to '%s'.", count, self.path)
+            self.stats.failed += count
+            return
+        latency = time.monotonic() - start
+        self.stats.written += count
+        self.stats.flushes += 1
+        self.stats.last_flush_latency = latency
+        self.stats.max_flush_latency = max(self.stats.max_flush_latency, latency)
+        self.stats.last_flushed_at = time.time()
@@ -0,0 +1,454 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from pyqube.events.exceptions import SpoolError
+
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".segment"
+CHECKPOINT_SUFFIX = ".checkpoint"
+# Header of each record: payload length, topic length, CRC32 of topic and payload, and time the message was received
+RECORD_HEADER = struct.Struct("<IHId")
+MAX_TOPIC_LENGTH = 0xFFFF
+
+
+@dataclass
+class SpooledMessage:
+    """
+    A message read from the spool. Offsets are positions in the spool, in bytes, across its segments.
+    """
+    offset: int
+    next_offset: int  # Offset of the next message, to be committed once this one is handled
+    topic: str
+    payload: bytes
+    received_at: float
+
+
+@dataclass
+class SpoolStats:
+    """
+    Counters of an EventSpool.
+    """
+    appended: int = 0
+    appended_bytes: int = 0
+    syncs: int = 0  # Each fsync commits every record appended since the previous one
+    rotations: int = 0
+    truncated_bytes: int = 0  # Bytes of incomplete records dropped when the spool was opened after a crash
+
+
+def record_size(topic: bytes, payload: bytes) -> int:
+    """Returns the size in the spool of the record of a message, which is the offset of the next one minus its own."""
+    return RECORD_HEADER.size + len(topic) + len(payload)
+
+
+def _segment_path(directory: str, base_offset: int) -> str:
+    return os.path.join(directory, f"{base_offset:020d}{SEGMENT_SUFFIX}")
+
+
+def list_segments(directory: str) -> List[int]:
+    """
+    Lists the segments of a spool.
+
+    Args:
+        directory (str): Spool's directory.
+
+    Returns:
+        List[int]: Offsets of the first record of each segment, in order.
+    """
+    return sorted(
+        int(name[:-len(SEGMENT_SUFFIX)]) for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX)
+    )
+
+
+def _map_segment(path: str) -> Optional[mmap.mmap]:
+    """Maps a segment to memory, read-only. Returns None if it is empty or was deleted."""
+    try:
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if not size:
+                return None
+            return mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+
+def _iter_records(buffer, position: int) -> Iterator[Tuple[int, int, bytes, bytes, float]]:
+    """
+    Iterates over the records of a segment from a position, stopping at the first incomplete or corrupted record,
+    which is where the writer stopped (or crashed).
+
+    Yields:
+        Tuple[int, int, bytes, bytes, float]: Start and end positions, topic, payload and time of each record.
+    """
+    end = len(buffer)
+    while position + RECORD_HEADER.size <= end:
+        payload_length, topic_length, checksum, received_at = RECORD_HEADER.unpack_from(buffer, position)
+        start = position + RECORD_HEADER.size
+        record_end = start + topic_length + payload_length
+        if not topic_length or record_end > end:
+            return
+        topic = buffer[start:start + topic_length]
+        payload = buffer[start + topic_length:record_end]
+        if zlib.crc32(payload, zlib.crc32(topic)) != checksum:
+            return
+        yield position, record_end, topic, payload, received_at
+        position = record_end
+
+
+def _fsync_directory(directory: str) -> None:
+    """Persists the creation of files in a directory. Not supported (nor needed) on every platform."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class EventSpool:
+    """
+    Durable, append-only log of received MQTT messages, stored in a directory as segments of records (each with its
+    topic, payload, time and checksum).
+    Appends are written to the current segment and made durable with group commits: one fsync covers every record
+    appended in the last `fsync_interval` seconds (or the last `fsync_max_records` records), instead of one fsync per
+    message. Segments are rotated when they reach `segment_max_bytes` or `segment_max_age` seconds, so that consumed
+    segments can be deleted. Messages are read back with SpoolReader.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        segment_max_age: float = 3600,
+        fsync_interval: float = 0.05,
+        fsync_max_records: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initializes the Event Spool, recovering its last segment if the previous writer crashed.
+
+        Args:
+            directory (str): Spool's directory. It is created if it doesn't exist.
+            segment_max_bytes (int, optional): Size in bytes after which a new segment is started. Defaults to 64MB.
+            segment_max_age (float, optional): Seconds after which a new segment is started. Defaults to 1 hour.
+            fsync_interval (float, optional): Maximum seconds between group commits. If 0, every record is fsynced
+                when it is appended. Defaults to 50ms.
+            fsync_max_records (int, optional): Number of records after which a group commit is made right away.
+                Defaults to 1000.
+            clock (Callable[[], float], optional): Monotonic clock used for the age of segments, in seconds.
+
+        Raises:
+            SpoolError: If the directory or its last segment can't be opened.
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_age = segment_max_age
+        self.fsync_interval = fsync_interval
+        self.fsync_max_records = fsync_max_records
+        self.stats = SpoolStats()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pending = 0  # Records appended since the last fsync
+        self._closed = False
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            segments = list_segments(directory)
+            if segments:
+                self._open_segment(segments[-1], self._recover(segments[-1]))
+            else:
+                self._open_segment(0, 0)
+        except OSError as e:
+            raise SpoolError(f"Failed to open spool at '{directory}': {e}") from e
+
+        self._stop_flusher = threading.Event()
+        self._flusher = None
+        if fsync_interval > 0:
+            self._flusher = threading.Thread(target=self._run_flusher, name="pyqube-spool-flusher", daemon=True)
+            self._flusher.start()
+
+    def __enter__(self) -> "EventSpool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def end_offset(self) -> int:
+        """Offset of the next record to be appended."""
+        return self._segment_base + self._segment_size
+
+    def _recover(self, base_offset: int) -> int:
+        """
+        Truncates the incomplete record that a crashed writer may have left at the end of a segment.
+
+        Returns:
+            int: Size of the segment.
+        """
+        path = _segment_path(self.directory, base_offset)
+        size = os.path.getsize(path)
+        buffer = _map_segment(path)
+        if buffer is None:
+            return 0
+        with buffer:
+            valid_size = 0
+            for _, valid_size, _, _, _ in _iter_records(buffer, 0):
+                pass
+        if valid_size < size:
+            logger.warning("Truncating %d bytes of incomplete records in spool segment '%s'.", size - valid_size, path)
+            os.truncate(path, valid_size)
+            self.stats.truncated_bytes += size - valid_size
+        return valid_size
+
+    def _open_segment(self, base_offset: int, size: int) -> None:
+        path = _segment_path(self.directory, base_offset)
+        is_new = not os.path.exists(path)
+        self._file = open(path, "ab")
+        if is_new:
+            _fsync_directory(self.directory)
+        self._segment_base = base_offset
+        self._segment_size = size
+        self._segment_opened_at = self._clock()
+
+    def append(self, topic: str, payload: bytes, received_at: Optional[float] = None) -> int:
+        """
+        Appends a message to the spool. It is durable after the next group commit (see `flush`).
+
+        Args:
+            topic (str): The topic the message was published to.
+            payload (bytes): The message payload.
+            received_at (float, optional): Time the message was received, as a timestamp. Defaults to now.
+
+        Returns:
+            int: Offset of the message.
+
+        Raises:
+            SpoolError: If the spool is closed or the message can't be written.
+        """
+        topic_bytes = topic.encode('utf-8')
+        if len(topic_bytes) > MAX_TOPIC_LENGTH:
+            raise SpoolError(f"Topic is too long to be spooled: '{topic[:50]}...'")
+        payload = bytes(payload)
+        header = RECORD_HEADER.pack(
+            len(payload),
+            len(topic_bytes),
+            zlib.crc32(payload, zlib.crc32(topic_bytes)),
+            time.time() if received_at is None else received_at,
+        )
+        size = record_size(topic_bytes, payload)
+
+        with self._lock:
+            if self._closed:
+                raise SpoolError("The spool is closed.")
+            try:
+                if self._segment_size and (
+                    self._segment_size + size > self.segment_max_bytes
+                    or self._clock() - self._segment_opened_at >= self.segment_max_age
+                ):
+                    self._rotate()
+                offset = self.end_offset
+                self._file.write(header + topic_bytes + payload)
+                self._segment_size += size
+                self._pending += 1
+                self.stats.appended += 1
+                self.stats.appended_bytes += size
+                if self.fsync_interval <= 0 or self._pending >= self.fsync_max_records:
+                    self._sync()
+            except OSError as e:
+                raise SpoolError(f"Failed to append message of topic '{topic}' to the spool: {e}") from e
+            return offset
+
+    def _sync(self) -> None:
+        """Writes the buffered records to the segment and fsyncs it, committing every pending record at once."""
+        if not self._pending:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self.stats.syncs += 1
+
+    def _rotate(self) -> None:
+        """Commits and closes the current segment and starts a new one at the end offset."""
+        self._sync()
+        self._file.close()
+        self._open_segment(self.end_offset, 0)
+        self.stats.rotations += 1
+
+    def _run_flusher(self) -> None:
+        """Makes the group commits of the records appended in each `fsync_interval`."""
+        while not self._stop_flusher.wait(self.fsync_interval):
+            with self._lock:
+                if self._closed:
+                    return
+                try:
+                    self._sync()
+                except OSError:
+                    logger.exception("Failed to commit records of the spool.")
+
+    def flush(self) -> None:
+        """
+        Commits every record appended so far, making it durable and visible to readers.
+
+        Raises:
+            SpoolError: If the records can't be written.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._sync()
+            except OSError as e:
+                raise SpoolError(f"Failed to commit records of the spool: {e}") from e
+
+    def delete_segments_before(self, offset: int) -> int:
+        """
+        Deletes the segments whose records are all before an offset (e.g. the checkpoint of every reader). The current
+        segment is never deleted.
+
+        Args:
+            offset (int): Offset of the first record to keep.
+
+        Returns:
+            int: Number of deleted segments.
+        """
+        with self._lock:
+            segments = list_segments(self.directory)
+            deleted = 0
+            for base_offset, next_base_offset in zip(segments, segments[1:]):
+                if next_base_offset > offset or base_offset == self._segment_base:
+                    break
+                os.remove(_segment_path(self.directory, base_offset))
+                deleted += 1
+            return deleted
+
+    def close(self) -> None:
+        """Commits the pending records and closes the spool."""
+        self._stop_flusher.set()
+        if self._flusher is not None and self._flusher is not threading.current_thread():
+            self._flusher.join()
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._sync()
+            finally:
+                self._file.close()
+                self._closed = True
+
+
+class SpoolReader:
+    """
+    Reads the messages of a spool through memory-mapped segments, keeping its progress in a checkpoint file, so that
+    a consumer can resume where it stopped after crashing or being redeployed.
+    Many readers, each with its own name and checkpoint, can read the same spool.
+    """
+
+    def __init__(self, directory: str, name: str = "default"):
+        """
+        Initializes the Spool Reader.
+
+        Args:
+            directory (str): Spool's directory.
+            name (str, optional): Reader's name, which identifies its checkpoint. Defaults to "default".
+        """
+        self.directory = directory
+        self.name = name
+        self.checkpoint_path = os.path.join(directory, f"{name}{CHECKPOINT_SUFFIX}")
+
+    def load_checkpoint(self) -> int:
+        """
+        Returns the offset of the first message not handled yet, or 0 if nothing was committed.
+        """
+        try:
+            with open(self.checkpoint_path, "r") as file:
+                return int(file.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def commit(self, offset: int) -> None:
+        """
+        Durably stores the checkpoint, replacing the previous one atomically.
+
+        Args:
+            offset (int): Offset of the first message not handled yet (the `next_offset` of the last handled one).
+        """
+        temporary_path = f"{self.checkpoint_path}.tmp"
+        with open(temporary_path, "w") as file:
+            file.write(str(offset))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def read(self, offset: Optional[int] = None) -> Iterator[SpooledMessage]:
+        """
+        Reads the messages of the spool, in order, up to the last record written to its segments. Records appended
+        since then (see `EventSpool.flush`) are not read, and neither are records that weren't fsynced yet, if the
+        spool's process crashed.
+
+        Args:
+            offset (int, optional): Offset of the first message to read. Defaults to the checkpoint. Messages of
+                deleted segments are skipped.
+
+        Yields:
+            SpooledMessage: Each message.
+        """
+        if offset is None:
+            offset = self.load_checkpoint()
+        segments = list_segments(self.directory)
+        for index, base_offset in enumerate(segments):
+            if index + 1 < len(segments) and segments[index + 1] <= offset:
+                continue
+            buffer = _map_segment(_segment_path(self.directory, base_offset))
+            if buffer is None:
+                continue
+            try:
+                for start, end, topic, payload, received_at in _iter_records(buffer, max(offset - base_offset, 0)):
+                    yield SpooledMessage(
+                        base_offset + start, base_offset + end, topic.decode('utf-8'), payload, received_at
+                    )
+            finally:
+                buffer.close()
+
+    def replay(self, events, commit_every: int = 100) -> int:
+        """
+        Replays the messages after the checkpoint into the handlers registered on a client (e.g. with its decorators),
+        committing the checkpoint as they are handled.
+        If a handler fails, the checkpoint is left at its message, which is replayed again by the next call, so
+        messages are handled at least once.
+
+        Args:
+            events: Client with the handlers, such as MQTTClient, whose `dispatch_message(topic, payload)` is called.
+            commit_every (int, optional): Number of messages handled between commits. Defaults to 100.
+
+        Returns:
+            int: Number of replayed messages.
+
+        Raises:
+            MessageHandlingError: If a handler fails.
+        """
+        committed_offset = offset = self.load_checkpoint()
+        replayed = 0
+        try:
+            for message in self.read(offset):
+                events.dispatch_message(message.topic, message.payload)
+                offset = message.next_offset
+                replayed += 1
+                if replayed % commit_every == 0:
+                    self.commit(offset)
+                    committed_offset = offset
+        finally:
+            if offset != committed_offset:
+                self.commit(offset)
+        return replayed
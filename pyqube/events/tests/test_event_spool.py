@@ -0,0 +1,267 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from pyqube.events.clients import MQTTClient
+from pyqube.events.exceptions import MessageHandlingError, SpoolError
+from pyqube.events.spool import EventSpool, SpoolReader, list_segments
+from pyqube.testing.rest_server import MockQubeServer
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestEventSpool(unittest.TestCase):
+
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = temporary_directory.name
+        self.clock = FakeClock()
+
+    def open_spool(self, **options) -> EventSpool:
+        options.setdefault("fsync_interval", 0)
+        spool = EventSpool(self.directory, clock=self.clock, **options)
+        self.addCleanup(spool.close)
+        return spool
+
+    def test_append_and_read(self):
+        """Test that appended messages are read back in order with their offsets"""
+        spool = self.open_spool()
+        first_offset = spool.append("locations/1/tickets/generated", b'{"id": 1}', received_at=10.0)
+        second_offset = spool.append("locations/1/queues/changed-waiting-number", b'[]')
+
+        messages = list(SpoolReader(self.directory).read())
+
+        self.assertEqual([message.offset for message in messages], [first_offset, second_offset])
+        self.assertEqual(messages[0].topic, "locations/1/tickets/generated")
+        self.assertEqual(messages[0].payload, b'{"id": 1}')
+        self.assertEqual(messages[0].received_at, 10.0)
+        self.assertEqual(messages[0].next_offset, second_offset)
+        self.assertEqual(messages[1].next_offset, spool.end_offset)
+
+    def test_group_commit(self):
+        """Test that one fsync commits every record appended since the previous one"""
+        spool = self.open_spool(fsync_interval=60, fsync_max_records=3)
+        with patch("pyqube.events.spool.os.fsync") as mock_fsync:
+            for index in range(7):
+                spool.append("topic", str(index).encode('utf-8'))
+            self.assertEqual(mock_fsync.call_count, 2)
+
+            spool.flush()
+            self.assertEqual(mock_fsync.call_count, 3)
+            spool.flush()
+            self.assertEqual(mock_fsync.call_count, 3)
+        self.assertEqual(spool.stats.syncs, 3)
+        self.assertEqual(spool.stats.appended, 7)
+
+    def test_background_group_commit(self):
+        """Test that pending records are committed within the fsync interval"""
+        spool = self.open_spool(fsync_interval=0.01)
+        spool.append("topic", b"payload")
+        deadline = time.monotonic() + 5
+        while spool.stats.syncs == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(len(list(SpoolReader(self.directory).read())), 1)
+        self.assertEqual(spool.stats.syncs, 1)
+
+    def test_rotation_by_size(self):
+        """Test that segments are rotated before they exceed the maximum size"""
+        spool = self.open_spool(segment_max_bytes=100)
+        for index in range(5):
+            spool.append("topic", b"x" * 40)
+
+        self.assertEqual(spool.stats.rotations, 4)
+        self.assertEqual(len(list_segments(self.directory)), 5)
+        self.assertEqual(len(list(SpoolReader(self.directory).read())), 5)
+
+    def test_rotation_by_age(self):
+        """Test that segments are rotated after the maximum age"""
+        spool = self.open_spool(segment_max_age=60)
+        spool.append("topic", b"1")
+        spool.append("topic", b"2")
+        self.clock.now = 61
+        offset = spool.append("topic", b"3")
+
+        self.assertEqual(list_segments(self.directory), [0, offset])
+
+    def test_read_from_offset_across_segments(self):
+        """Test that reading starts at the given offset, in any segment"""
+        spool = self.open_spool(segment_max_bytes=100)
+        offsets = [spool.append("topic", str(index).encode('utf-8') * 30) for index in range(6)]
+
+        messages = list(SpoolReader(self.directory).read(offsets[3]))
+
+        self.assertEqual([message.offset for message in messages], offsets[3:])
+
+    def test_recover_truncates_incomplete_record(self):
+        """Test that a record partially written by a crashed writer is dropped and appends continue after it"""
+        spool = self.open_spool()
+        spool.append("topic", b"complete")
+        spool.close()
+        path = os.path.join(self.directory, f"{0:020d}.segment")
+        with open(path, "ab") as file:
+            file.write(b"\x10\x00\x00\x00\x05\x00incomplete")
+
+        spool = self.open_spool()
+        spool.append("topic", b"after crash")
+
+        self.assertGreater(spool.stats.truncated_bytes, 0)
+        self.assertEqual(
+            [message.payload for message in SpoolReader(self.directory).read()], [b"complete", b"after crash"]
+        )
+
+    def test_append_to_closed_spool_raises_spool_error(self):
+        """Test that a closed spool refuses appends"""
+        spool = self.open_spool()
+        spool.close()
+
+        with self.assertRaises(SpoolError):
+            spool.append("topic", b"payload")
+
+    def test_delete_segments_before(self):
+        """Test that only segments whose records are all before the offset are deleted"""
+        spool = self.open_spool(segment_max_bytes=100)
+        offsets = [spool.append("topic", b"x" * 40) for _ in range(4)]
+
+        self.assertEqual(spool.delete_segments_before(offsets[2] + 1), 2)
+        self.assertEqual(list_segments(self.directory), offsets[2:])
+        self.assertEqual(spool.delete_segments_before(spool.end_offset), 1)
+        self.assertEqual(list_segments(self.directory), offsets[3:])
+
+
+class TestSpoolReplay(unittest.TestCase):
+
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = temporary_directory.name
+
+        patcher = patch('paho.mqtt.client.Client')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client = self.mock_client_class.return_value
+        self.mock_client.subscribe = MagicMock()
+
+        self.spool = EventSpool(self.directory, fsync_interval=0)
+        self.addCleanup(self.spool.close)
+        self.server = MockQubeServer()
+
+    def ticket_payload(self) -> bytes:
+        return json.dumps(self.server.build_ticket(1, 1, False)).encode('utf-8')
+
+    def receive(self, client: MQTTClient, topic: str, payload: dict):
+        message = Mock(topic=topic, payload=json.dumps(payload).encode('utf-8'))
+        client._on_message(client.client, None, message)
+
+    def test_client_spools_messages_before_dispatching_them(self):
+        """Test that the client appends every received message to the spool"""
+        client = MQTTClient(api_key='testapikey', location_id=1, spool=self.spool)
+        handler = Mock()
+        client.on_ticket_generated()(handler)
+
+        self.receive(client, "locations/1/tickets/generated", self.server.build_ticket(1, 1, False))
+
+        handler.assert_called_once()
+        messages = list(SpoolReader(self.directory).read())
+        self.assertEqual([message.topic for message in messages], ["locations/1/tickets/generated"])
+
+    def test_failing_spool_does_not_stop_dispatch(self):
+        """Test that messages are still dispatched if they can't be spooled"""
+        client = MQTTClient(api_key='testapikey', location_id=1, spool=self.spool)
+        handler = Mock()
+        client.on_ticket_generated()(handler)
+        self.spool.close()
+
+        with self.assertLogs("pyqube.events.clients", level="ERROR"):
+            self.receive(client, "locations/1/tickets/generated", self.server.build_ticket(1, 1, False))
+
+        handler.assert_called_once()
+
+    def test_handled_messages_advance_reader_checkpoint(self):
+        """Test that messages handled live move the reader's checkpoint, so replay doesn't dispatch them again"""
+        reader = SpoolReader(self.directory)
+        client = MQTTClient(
+            api_key='testapikey', location_id=1, spool=self.spool, spool_reader=reader, spool_commit_every=2
+        )
+        handler = Mock()
+        client.on_ticket_generated()(handler)
+
+        for _ in range(3):
+            self.receive(client, "locations/1/tickets/generated", self.server.build_ticket(1, 1, False))
+        offsets = [message.next_offset for message in reader.read(0)]
+        self.assertEqual(reader.load_checkpoint(), offsets[1])
+
+        client.disconnect()
+        self.assertEqual(reader.load_checkpoint(), self.spool.end_offset)
+        self.assertEqual(reader.replay(client), 0)
+        self.assertEqual(handler.call_count, 3)
+
+    def test_failing_handler_stops_reader_checkpoint(self):
+        """Test that the checkpoint stays at the message of a failing handler, which is replayed with the next ones"""
+        reader = SpoolReader(self.directory)
+        client = MQTTClient(
+            api_key='testapikey', location_id=1, spool=self.spool, spool_reader=reader, spool_commit_every=1
+        )
+        handler = Mock(side_effect=[None, Exception("Handler failed"), None, None, None])
+        client.on_ticket_generated()(handler)
+
+        for index in range(3):
+            ticket = self.server.build_ticket(1, 1, False)
+            if index == 1:
+                with self.assertRaises(MessageHandlingError):
+                    self.receive(client, "locations/1/tickets/generated", ticket)
+            else:
+                self.receive(client, "locations/1/tickets/generated", ticket)
+        client.disconnect()
+
+        messages = list(reader.read(0))
+        self.assertEqual(reader.load_checkpoint(), messages[1].offset)
+        self.assertEqual(reader.replay(client), 2)
+        self.assertEqual(handler.call_count, 5)
+
+    def test_replay_resumes_from_checkpoint(self):
+        """Test that replay dispatches the messages after the checkpoint to the decorated handlers"""
+        for _ in range(3):
+            self.spool.append("locations/1/tickets/generated", self.ticket_payload())
+        client = MQTTClient(api_key='testapikey', location_id=1)
+        handler = Mock()
+        client.on_ticket_generated()(handler)
+        reader = SpoolReader(self.directory, name="tickets")
+
+        self.assertEqual(reader.replay(client, commit_every=2), 3)
+        self.assertEqual(handler.call_count, 3)
+        self.assertEqual(reader.load_checkpoint(), self.spool.end_offset)
+
+        self.spool.append("locations/1/tickets/generated", self.ticket_payload())
+        self.assertEqual(reader.replay(client), 1)
+        self.assertEqual(handler.call_count, 4)
+        self.assertEqual(SpoolReader(self.directory, name="other").load_checkpoint(), 0)
+
+    def test_replay_stops_at_failing_message(self):
+        """Test that the message of a failing handler is replayed again by the next replay"""
+        offsets = [
+            self.spool.append("locations/1/tickets/generated", self.ticket_payload())
+            for _ in range(3)
+        ]
+        client = MQTTClient(api_key='testapikey', location_id=1)
+        handler = Mock(side_effect=[None, Exception("Handler failed"), None, None])
+        client.on_ticket_generated()(handler)
+        reader = SpoolReader(self.directory)
+
+        with self.assertRaises(MessageHandlingError):
+            reader.replay(client)
+        self.assertEqual(reader.load_checkpoint(), offsets[1])
+
+        self.assertEqual(reader.replay(client), 2)
+        self.assertEqual(handler.call_count, 4)
@@ -85,6 +85,23 @@ class TestMQTTClient(unittest.TestCase):
         with self.assertRaises(SubscriptionError):
             self.client.unsubscribe_from_topic(topic)
 
+    def test_remove_handler_keeps_other_handlers(self):
+        """Test that remove_handler removes one handler and unsubscribes only with the last one"""
+        topic = 'test/topic'
+        handler, other_handler = Mock(), Mock()
+        self.client.subscribe_to_topic(topic, handler)
+        self.client.subscribe_to_topic(topic, other_handler)
+
+        self.client.remove_handler(topic, handler)
+        self.assertEqual(self.client.message_handlers[topic], (other_handler, ))
+        self.mock_client.unsubscribe.assert_not_called()
+
+        self.client.remove_handler(topic, handler)
+        self.client.remove_handler(topic, other_handler)
+        self.assertNotIn(topic, self.client.message_handlers)
+        self.assertNotIn(topic, self.client._subscribed_topics)
+        self.mock_client.unsubscribe.assert_called_once_with(topic)
+
     def test_list_subscribed_topics_returns_correct_list(self):
         """Test that list_subscribed_topics returns the correct list of subscribed topics"""
         topics = ['test/topic1', 'test/topic2']
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+import paho.mqtt.client as mqtt
+
+from pyqube.events.clients import MQTTClient
+from pyqube.events.exceptions import SubscriptionError
+
+
+class TestMQTTClientBatchSubscriptions(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('paho.mqtt.client.Client')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client = self.mock_client_class.return_value
+        self.mids = iter(range(1, 1000))
+        self.mock_client.subscribe = MagicMock(side_effect=lambda *args: (mqtt.MQTT_ERR_SUCCESS, next(self.mids)))
+        self.client = MQTTClient(api_key='testapikey', location_id=1)
+
+    def test_batch_subscriptions_sends_topics_in_chunks(self):
+        """Test that handlers registered inside batch_subscriptions are subscribed in multi-topic packets"""
+        self.client.SUBSCRIBE_BATCH_SIZE = 2
+        with self.client.batch_subscriptions():
+            for queue_id in range(5):
+                self.client.on_ticket_called(queue_id=queue_id)(Mock(__name__=f"handler_{queue_id}"))
+            self.mock_client.subscribe.assert_not_called()
+
+        topics = [f"locations/1/queues/{queue_id}/tickets/called" for queue_id in range(5)]
+        sent = [call.args[0] for call in self.mock_client.subscribe.call_args_list]
+        self.assertEqual(sent, [[(topic, 0) for topic in topics[i:i + 2]] for i in range(0, 5, 2)])
+        self.assertEqual(set(self.client.list_subscribed_topics()), set(topics))
+
+    def test_subscribe_to_topics(self):
+        """Test that subscribe_to_topics registers every handler with a single SUBSCRIBE"""
+        handlers = {f"test/topic{index}": Mock() for index in range(3)}
+        self.client.subscribe_to_topics(handlers)
+
+        self.mock_client.subscribe.assert_called_once_with([(topic, 0) for topic in handlers])
+        for topic, handler in handlers.items():
+            self.assertIn(handler, self.client.message_handlers[topic])
+
+    def test_suback_results_are_tracked_per_topic(self):
+        """Test that SUBACK granted QoS and failures are matched to their topics"""
+        self.client.subscribe_to_topics({
+            "test/topic1": Mock(),
+            "test/topic2": Mock()
+        })
+        self.client.subscribe_to_topic("test/topic3", Mock())
+
+        self.client._on_subscribe(self.mock_client, None, 1, [0, 0x80])
+        self.client._on_subscribe(self.mock_client, None, 2, (1, ))
+
+        self.assertEqual(self.client.subscription_results, {
+            "test/topic1": 0,
+            "test/topic2": 0x80,
+            "test/topic3": 1
+        })
+        self.assertEqual(self.client.failed_subscriptions(), ["test/topic2"])
+
+    def test_unsubscribe_from_topics_sends_topics_in_chunks(self):
+        """Test that unsubscribe_from_topics removes handlers and sends multi-topic UNSUBSCRIBE packets"""
+        self.client.SUBSCRIBE_BATCH_SIZE = 2
+        topics = [f"test/topic{index}" for index in range(3)]
+        self.client.subscribe_to_topics({topic: Mock() for topic in topics})
+
+        self.client.unsubscribe_from_topics(topics + ["test/unknown"])
+
+        sent = [call.args[0] for call in self.mock_client.unsubscribe.call_args_list]
+        self.assertEqual(sent, [topics[:2], topics[2:]])
+        self.assertEqual(self.client.list_subscribed_topics(), [])
+        self.assertEqual(self.client.message_handlers, {})
+
+    def test_refused_unsubscribe_keeps_handlers(self):
+        """Test that handlers are only removed for the topics whose UNSUBSCRIBE paho accepted"""
+        self.client.SUBSCRIBE_BATCH_SIZE = 2
+        topics = [f"test/topic{index}" for index in range(4)]
+        self.client.subscribe_to_topics({topic: Mock() for topic in topics})
+        self.mock_client.unsubscribe.side_effect = [(mqtt.MQTT_ERR_SUCCESS, 10), (mqtt.MQTT_ERR_NOMEM, None)]
+
+        with self.assertRaises(SubscriptionError):
+            self.client.unsubscribe_from_topics(topics)
+
+        self.assertEqual(sorted(self.client.list_subscribed_topics()), topics[2:])
+        self.assertEqual(sorted(self.client.message_handlers), topics[2:])
+
+        self.mock_client.unsubscribe.side_effect = None
+        self.mock_client.unsubscribe.return_value = (mqtt.MQTT_ERR_NOMEM, None)
+        with self.assertRaises(SubscriptionError):
+            self.client.unsubscribe_from_topic("test/topic2")
+        self.assertIn("test/topic2", self.client.list_subscribed_topics())
+        self.assertIn("test/topic2", self.client.message_handlers)
+
+    def test_batch_subscription_failure_raises_subscription_error(self):
+        """Test that a failing SUBSCRIBE raises SubscriptionError"""
+        self.mock_client.subscribe.side_effect = Exception("Subscribe failed")
+        with self.assertRaises(SubscriptionError):
+            self.client.subscribe_to_topics({"test/topic": Mock()})
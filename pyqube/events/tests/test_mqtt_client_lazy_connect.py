@@ -0,0 +1,113 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+import paho.mqtt.client as mqtt
+
+from pyqube import QubeClient
+from pyqube.events.clients import MQTTClient
+from pyqube.events.multiplexing import MultiLocationMQTTClient
+
+
+class TestMQTTClientLazyConnect(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('paho.mqtt.client.Client')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client_class.side_effect = lambda *args, **kwargs: MagicMock()
+
+    def test_lazy_client_does_not_connect_on_construction(self):
+        """Test that the constructor neither connects nor starts the network loop"""
+        client = MQTTClient(api_key='testapikey', location_id=1, lazy_connect=True)
+
+        client.client.connect.assert_not_called()
+        client.client.connect_async.assert_not_called()
+        client.client.loop_start.assert_not_called()
+        self.assertFalse(client.ready.is_set())
+
+    def test_eager_client_connects_on_construction(self):
+        """Test that clients still connect before the constructor returns by default"""
+        client = MQTTClient(api_key='testapikey', location_id=1)
+
+        client.client.connect.assert_called_once()
+        client.client.connect_async.assert_not_called()
+
+    def test_start_connects_in_background_once(self):
+        """Test that start begins an asynchronous connection only the first time"""
+        client = MQTTClient(api_key='testapikey', location_id=1, lazy_connect=True)
+
+        self.assertIs(client.start(), client)
+        client.start()
+
+        client.client.connect_async.assert_called_once_with(
+            host=MQTTClient.DEFAULT_BROKER_URL, port=MQTTClient.DEFAULT_BROKER_PORT, keepalive=60
+        )
+        client.client.loop_start.assert_called_once()
+        client.client.connect.assert_not_called()
+
+    def test_failed_start_can_be_retried(self):
+        """Test that a connection that can't be started raises ConnectionError and can be started again"""
+        client = MQTTClient(api_key='testapikey', location_id=1, lazy_connect=True)
+        client.client.connect_async.side_effect = [ValueError("Invalid host"), None]
+
+        with self.assertRaises(ConnectionError):
+            client.start()
+        client.start()
+
+        self.assertEqual(client.client.connect_async.call_count, 2)
+
+    def test_first_handler_starts_connection(self):
+        """Test that registering the first handler starts the connection"""
+        client = MQTTClient(api_key='testapikey', location_id=1, lazy_connect=True)
+
+        client.on_ticket_generated()(Mock())
+        client.on_queuing_system_resets_created()(Mock())
+
+        client.client.connect_async.assert_called_once()
+        self.assertIn("locations/1/tickets/generated", client.list_subscribed_topics())
+
+    def test_ready_follows_connection(self):
+        """Test that ready is set while connected and wait_until_ready waits for it"""
+        client = MQTTClient(api_key='testapikey', location_id=1, lazy_connect=True)
+        self.assertFalse(client.wait_until_ready(timeout=0.01))
+
+        threading.Timer(0.01, client._on_connect, (client.client, None, {}, 0)).start()
+        self.assertTrue(client.wait_until_ready(timeout=5))
+
+        client._on_disconnect(client.client, None, 1)
+        self.assertFalse(client.ready.is_set())
+
+    def test_topic_registered_while_connecting_is_subscribed_again(self):
+        """Test that a SUBSCRIBE refused before the connection is sent again if the connection was established since"""
+        client = MQTTClient(api_key='testapikey', location_id=1, lazy_connect=True)
+
+        def subscribe(*args, **kwargs):
+            client.ready.set()
+            return mqtt.MQTT_ERR_NO_CONN, None
+
+        client.client.subscribe.side_effect = subscribe
+        client.subscribe_to_topic("test/topic", Mock())
+
+        self.assertEqual(client.client.subscribe.call_count, 2)
+        client.client.subscribe.assert_called_with([("test/topic", 0)])
+
+    def test_qube_client_with_lazy_connect(self):
+        """Test that REST-only usage of QubeClient doesn't connect to the broker"""
+        qube_client = QubeClient(api_key='testapikey', location_id=1, lazy_connect=True)
+
+        qube_client.client.connect.assert_not_called()
+        qube_client.client.connect_async.assert_not_called()
+        self.assertIsNotNone(qube_client.get_queue_management_manager())
+
+    def test_multi_location_client_connects_in_parallel(self):
+        """Test that every connection of the pool is started before waiting for any of them"""
+        client = MultiLocationMQTTClient(api_key='testapikey', connections=3, lazy_connect=True)
+        for connection in client.connections:
+            connection.client.connect_async.assert_not_called()
+
+        self.assertFalse(client.wait_until_ready(timeout=0.01))
+        for connection in client.connections:
+            connection.client.connect_async.assert_called_once()
+            connection._on_connect(connection.client, None, {}, 0)
+        self.assertTrue(client.wait_until_ready(timeout=0.01))
@@ -0,0 +1,148 @@
+import random
+import unittest
+from unittest.mock import MagicMock, Mock, call, patch
+
+from pyqube.events.clients import MQTTClient
+from pyqube.events.reconnect import ConnectionGap, ReconnectPolicy
+from pyqube.testing.mqtt_broker import FakeMQTTBroker
+
+
+class TestReconnectPolicy(unittest.TestCase):
+
+    def test_delay_grows_exponentially_up_to_max_delay(self):
+        """Test that delays without jitter double on every attempt and are capped"""
+        policy = ReconnectPolicy(min_delay=1, max_delay=10, jitter=0)
+        self.assertEqual([policy.get_delay(attempt) for attempt in range(6)], [1, 2, 4, 8, 10, 10])
+
+    def test_delay_with_jitter_stays_within_bounds(self):
+        """Test that jitter only reduces the delay down to the configured fraction"""
+        policy = ReconnectPolicy(min_delay=2, max_delay=60, jitter=0.5, rng=random.Random(1))
+        for attempt in range(10):
+            delay = policy.get_delay(attempt)
+            expected = min(60, 2 * 2**attempt)
+            self.assertGreaterEqual(delay, expected * 0.5)
+            self.assertLessEqual(delay, expected)
+
+    def test_invalid_jitter(self):
+        """Test that jitter outside [0, 1] is rejected"""
+        with self.assertRaises(ValueError):
+            ReconnectPolicy(jitter=2)
+
+
+class TestMQTTClientReconnect(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('paho.mqtt.client.Client')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client = self.mock_client_class.return_value
+        self.mock_client.subscribe = MagicMock()
+        self.client = MQTTClient(
+            api_key='testapikey', location_id=1, reconnect_policy=ReconnectPolicy(min_delay=1, jitter=0)
+        )
+
+    def test_reconnect_callbacks_are_registered(self):
+        """Test that disconnection callbacks are registered on the paho client"""
+        self.assertEqual(self.mock_client.on_disconnect, self.client._on_disconnect)
+        self.assertEqual(self.mock_client.on_connect_fail, self.client._on_connect_fail)
+
+    def test_on_connect_resubscribes_all_topics_in_one_packet(self):
+        """Test that every tracked topic, with or without handlers, is subscribed again after connecting"""
+        self.client.subscribe_to_topic('test/topic1', Mock())
+        self.client.subscribe_to_topic('test/topic2', Mock())
+        self.mock_client.subscribe.reset_mock()
+
+        self.client._on_connect(self.mock_client, None, {'session present': 0}, 0)
+
+        self.mock_client.subscribe.assert_called_once_with([('test/topic1', 0), ('test/topic2', 0)])
+
+    def test_on_connect_without_topics_does_not_subscribe(self):
+        """Test that no SUBSCRIBE is sent when there are no topics"""
+        self.client._on_connect(self.mock_client, None, {}, 0)
+        self.mock_client.subscribe.assert_not_called()
+        self.assertEqual(self.client.connection_stats.connections, 1)
+
+    def test_on_connect_failure_schedules_reconnection(self):
+        """Test that a refused connection is counted and retried with backoff, without raising in the network loop"""
+        with self.assertLogs("pyqube.events.clients", level="ERROR"):
+            self.client._on_connect(self.mock_client, None, {}, 5)
+
+        self.assertEqual(self.client.connection_stats.failed_attempts, 1)
+        self.assertFalse(self.client.ready.is_set())
+        self.mock_client.reconnect_delay_set.assert_called_once_with(min_delay=1, max_delay=1)
+        self.mock_client.subscribe.assert_not_called()
+
+    def test_refused_connection_is_retried_until_accepted(self):
+        """Test that the client connects once the broker accepts a connection it refused before"""
+        broker = FakeMQTTBroker()
+        broker.refused_connections = 1
+        with patch('paho.mqtt.client.Client', broker.create_client):
+            client = MQTTClient(
+                api_key='testapikey',
+                location_id=1,
+                reconnect_policy=ReconnectPolicy(min_delay=1, jitter=0),
+                lazy_connect=True,
+            )
+            with self.assertLogs("pyqube.events.clients", level="ERROR"):
+                client.on_ticket_generated()(Mock())
+
+        self.assertTrue(client.wait_until_ready(timeout=1))
+
+        self.assertEqual(client.connection_stats.failed_attempts, 1)
+        self.assertEqual(client.connection_stats.connections, 1)
+        self.assertEqual(client.client.reconnect_delays, [1])
+        self.assertIn("locations/1/tickets/generated", client.client.subscriptions)
+
+    def test_backoff_is_applied_on_disconnect_and_failed_attempts(self):
+        """Test that the reconnect delay doubles on every failed attempt"""
+        self.client._on_disconnect(self.mock_client, None, 7)
+        self.client._on_connect_fail(self.mock_client, None)
+        self.client._on_connect_fail(self.mock_client, None)
+
+        self.mock_client.reconnect_delay_set.assert_has_calls([
+            call(min_delay=1, max_delay=1),
+            call(min_delay=2, max_delay=2),
+            call(min_delay=4, max_delay=4),
+        ])
+        self.assertEqual(self.client.connection_stats.disconnections, 1)
+        self.assertEqual(self.client.connection_stats.failed_attempts, 2)
+
+    def test_connection_gap_handler_is_called_after_reconnection(self):
+        """Test that gap handlers receive the disconnected period after reconnecting"""
+        gap_handler = Mock()
+        self.client.on_connection_gap()(gap_handler)
+        self.client._on_connect(self.mock_client, None, {}, 0)
+        gap_handler.assert_not_called()
+
+        self.client._on_disconnect(self.mock_client, None, 7)
+        self.client._on_connect_fail(self.mock_client, None)
+        self.client._on_connect(self.mock_client, None, {'session present': 1}, 0)
+
+        gap_handler.assert_called_once()
+        gap = gap_handler.call_args.args[0]
+        self.assertIsInstance(gap, ConnectionGap)
+        self.assertEqual(gap.attempts, 2)
+        self.assertTrue(gap.session_present)
+        self.assertGreaterEqual(gap.duration, 0)
+        self.assertEqual(self.client.connection_stats.reconnections, 1)
+        self.assertEqual(self.client.connection_stats.connections, 2)
+
+    def test_failing_connection_gap_handler_does_not_break_reconnection(self):
+        """Test that an error in a gap handler does not propagate to the network loop"""
+        failing_handler = Mock(side_effect=Exception("Resync failed"), __name__="failing_handler")
+        other_handler = Mock()
+        self.client.on_connection_gap()(failing_handler)
+        self.client.on_connection_gap()(other_handler)
+
+        self.client._on_disconnect(self.mock_client, None, 7)
+        self.client._on_connect(self.mock_client, None, {}, 0)
+
+        other_handler.assert_called_once()
+
+    def test_requested_disconnect_is_not_counted(self):
+        """Test that disconnect() does not trigger reconnection accounting"""
+        self.client.disconnect()
+        self.client._on_disconnect(self.mock_client, None, 0)
+
+        self.assertEqual(self.client.connection_stats.disconnections, 0)
+        self.mock_client.reconnect_delay_set.assert_not_called()
@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+import paho.mqtt.client as mqtt
+
+from pyqube.events.clients import MQTTClient
+
+
+class TestMQTTClientSessions(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('paho.mqtt.client.Client')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client = self.mock_client_class.return_value
+        self.mock_client.subscribe = MagicMock()
+        self.api_key = 'testapikey'
+
+    def test_default_client_uses_clean_session(self):
+        """Test that by default the paho client is created with default settings"""
+        client = MQTTClient(api_key=self.api_key, location_id=1)
+
+        self.mock_client_class.assert_called_once_with()
+        self.assertEqual(client.client_id, "")
+
+    def test_persistent_session_uses_stable_client_id(self):
+        """Test that persistent sessions derive the same client id for the same API key and location"""
+        client = MQTTClient(api_key=self.api_key, location_id=1, clean_session=False)
+        other_client = MQTTClient(api_key=self.api_key, location_id=1, clean_session=False)
+
+        self.assertEqual(client.client_id, other_client.client_id)
+        self.assertNotIn(self.api_key, client.client_id)
+        self.assertNotEqual(client.client_id, MQTTClient.generate_client_id(self.api_key, 2))
+        self.mock_client_class.assert_called_with(
+            client_id=client.client_id, clean_session=False, protocol=mqtt.MQTTv311
+        )
+
+    def test_mqtt_v5_persistent_session_sets_session_expiry(self):
+        """Test that MQTT v5 persistent sessions connect without clean start and with a session expiry interval"""
+        MQTTClient(
+            api_key=self.api_key,
+            location_id=1,
+            client_id="my-consumer",
+            clean_session=False,
+            protocol=mqtt.MQTTv5,
+            session_expiry_interval=600
+        )
+
+        self.mock_client_class.assert_called_once_with(client_id="my-consumer", protocol=mqtt.MQTTv5)
+        connect_kwargs = self.mock_client.connect.call_args.kwargs
+        self.assertFalse(connect_kwargs["clean_start"])
+        self.assertEqual(connect_kwargs["properties"].SessionExpiryInterval, 600)
+
+    def test_mqtt_v5_persistent_session_default_expiry(self):
+        """Test that persistent MQTT v5 sessions get the default session expiry interval"""
+        MQTTClient(api_key=self.api_key, location_id=1, clean_session=False, protocol=mqtt.MQTTv5)
+
+        connect_kwargs = self.mock_client.connect.call_args.kwargs
+        self.assertEqual(
+            connect_kwargs["properties"].SessionExpiryInterval, MQTTClient.DEFAULT_SESSION_EXPIRY_INTERVAL
+        )
+
+    def test_decorator_qos_is_used_in_subscription(self):
+        """Test that the QoS given to a decorator is used to subscribe and resubscribe its topic"""
+        client = MQTTClient(api_key=self.api_key, location_id=1)
+        client.on_ticket_generated(qos=1)(Mock(__name__="handler"))
+
+        self.mock_client.subscribe.assert_called_once_with("locations/1/tickets/generated", 1)
+
+        self.mock_client.subscribe.reset_mock()
+        client._on_connect(self.mock_client, None, {}, 0)
+        self.mock_client.subscribe.assert_called_once_with([("locations/1/tickets/generated", 1)])
+
+    def test_higher_qos_resubscribes_topic(self):
+        """Test that a handler asking for a higher QoS upgrades the existing subscription"""
+        client = MQTTClient(api_key=self.api_key, location_id=1)
+        client.on_ticket_called(queue_id=1)(Mock(__name__="handler_1"))
+        client.on_ticket_called(queue_id=1, qos=2)(Mock(__name__="handler_2"))
+        client.on_ticket_called(queue_id=1, qos=1)(Mock(__name__="handler_3"))
+
+        topic = "locations/1/queues/1/tickets/called"
+        self.assertEqual([call.args for call in self.mock_client.subscribe.call_args_list], [(topic, ), (topic, 2)])
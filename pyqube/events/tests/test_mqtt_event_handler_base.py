@@ -7,6 +7,7 @@ from pyqube.events.exceptions import (
     PayloadTypeError,
 )
 from pyqube.events.handlers import MQTTEventHandlerBase
+from pyqube.types import QueuingSystemReset
 
 
 class MockPayload:
@@ -101,6 +102,30 @@ class TestMQTTEventHandlerBase(unittest.TestCase):
         with self.assertRaises(PayloadFormatError):
             self.handler._decode_payload(payload, MockPayload)
 
+    def test_decode_payload_memoryview(self):
+        """
+        Test that payloads are decoded from buffers without copying them into bytes first.
+        """
+        payload = memoryview(b'{"field1": "test", "field2": 123}')
+        result = self.handler._decode_payload(payload, MockPayload)
+        self.assertEqual(result.field1, "test")
+
+    def test_decode_payload_invalid_utf8_raises_error(self):
+        """
+        Test that decoding a payload that is not valid UTF-8 raises a PayloadFormatError.
+        """
+        payload = b'{"field1": "\xff", "field2": 123}'
+        with self.assertRaises(PayloadFormatError):
+            self.handler._decode_payload(payload, MockPayload)
+
+    def test_decode_payload_ignores_unknown_fields_of_dataclasses(self):
+        """
+        Test that fields unknown to dataclass types are ignored.
+        """
+        payload = b'{"id": 1, "location": 2, "created_at": "2024-01-01T00:00:00.000000Z", "new_field": true}'
+        result = self.handler._decode_payload(payload, QueuingSystemReset)
+        self.assertEqual(result, QueuingSystemReset(id=1, location=2, created_at="2024-01-01T00:00:00.000000Z"))
+
     def test_decode_payload_type_mismatch_raises_error(self):
         """
         Test that decoding a payload with a type mismatch raises a PayloadTypeError.
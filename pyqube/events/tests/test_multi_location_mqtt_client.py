@@ -0,0 +1,148 @@
+import json
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from pyqube.events.multiplexing import LocationEvents, MultiLocationMQTTClient
+from pyqube.events.reconnect import ConnectionGap
+from pyqube.types import Ticket
+
+
+class TestMultiLocationMQTTClient(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('paho.mqtt.client.Client')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client_class.side_effect = lambda *args, **kwargs: MagicMock()
+
+        self.ticket_payload = {
+            'id': 1,
+            'signature': '1',
+            'updated_at': '2024-01-01T00:00:00.000000Z',
+            'number': 1,
+            'printed_tag': 'A',
+            'printed_number': '001',
+            'note': None,
+            'priority': False,
+            'priority_level': 3,
+            'created_at': '2024-01-01T00:00:00.000000Z',
+            'state': 1,
+            'invalidated_by_system': None,
+            'ticket_local_runner': None,
+            'queue': 1,
+            'queue_dest': 1,
+            'counter_dest': None,
+            'profile_dest': None,
+            'generated_by_ticket_kiosk': None,
+            'generated_by_profile': None,
+            'generated_by_totem': None,
+            'is_generated_by_api_key': True,
+            'generated_by_api_key': 1,
+            'local_runner': None,
+            'tags': [],
+        }
+
+    def test_single_connection_is_shared_by_locations(self):
+        """Test that every location registers its handlers on the same connection"""
+        client = MultiLocationMQTTClient(api_key="api_key")
+        for location_id in range(1, 4):
+            client.location(location_id).on_ticket_generated()(Mock(__name__=f"handler_{location_id}"))
+
+        self.assertEqual(self.mock_client_class.call_count, 1)
+        connection = client.connections[0]
+        self.assertEqual(
+            set(connection.list_subscribed_topics()),
+            {f"locations/{location_id}/tickets/generated"
+             for location_id in range(1, 4)}
+        )
+        self.assertEqual(client.list_locations(), [1, 2, 3])
+
+    def test_locations_are_spread_over_connection_pool(self):
+        """Test that locations are assigned to the connections of the pool"""
+        client = MultiLocationMQTTClient(api_key="api_key", connections=2)
+
+        self.assertEqual(self.mock_client_class.call_count, 2)
+        self.assertIs(client.location(1).connection, client.connections[1])
+        self.assertIs(client.location(4).connection, client.connections[0])
+        self.assertIs(client.get_connection(4), client.connections[0])
+        self.assertIs(client.location(1), client.location(1))
+
+    def test_messages_are_dispatched_to_handlers_of_their_location(self):
+        """Test that the shared connection dispatches messages to the handlers of the right location"""
+        client = MultiLocationMQTTClient(api_key="api_key")
+        handler_1 = Mock(__name__="handler_1")
+        handler_2 = Mock(__name__="handler_2")
+        client.location(1).on_ticket_generated()(handler_1)
+        client.location(2).on_ticket_generated()(handler_2)
+
+        connection = client.connections[0]
+        connection._on_message(
+            connection.client, None,
+            Mock(topic="locations/2/tickets/generated", payload=json.dumps(self.ticket_payload).encode())
+        )
+
+        handler_1.assert_not_called()
+        handler_2.assert_called_once_with(Ticket(**self.ticket_payload))
+
+    def test_batch_subscriptions_across_locations(self):
+        """Test that subscriptions of many locations are sent in one SUBSCRIBE packet"""
+        client = MultiLocationMQTTClient(api_key="api_key")
+        with client.batch_subscriptions():
+            for location_id in range(1, 4):
+                client.location(location_id).on_queuing_system_resets_created()(Mock(__name__="handler"))
+
+        connection = client.connections[0]
+        connection.client.subscribe.assert_called_once_with([
+            (f"locations/{location_id}/queuing-system-resets/created", 0) for location_id in range(1, 4)
+        ])
+
+    def test_persistent_sessions_get_distinct_client_ids(self):
+        """Test that pooled connections with persistent sessions have stable and distinct client ids"""
+        client = MultiLocationMQTTClient(api_key="api_key", connections=2, clean_session=False)
+
+        client_ids = [connection.client_id for connection in client.connections]
+        self.assertEqual(len(set(client_ids)), 2)
+        self.assertTrue(all(client_id.endswith(f"-{index}") for index, client_id in enumerate(client_ids)))
+
+    def test_connection_gap_handler_receives_affected_locations(self):
+        """Test that gap handlers receive the locations of the connection that reconnected"""
+        client = MultiLocationMQTTClient(api_key="api_key", connections=2)
+        client.location(1)
+        client.location(4)
+        client.location(8)
+        gap_handler = Mock()
+        client.on_connection_gap()(gap_handler)
+
+        connection = client.connections[1]
+        connection._on_disconnect(connection.client, None, 7)
+        connection._on_connect(connection.client, None, {}, 0)
+
+        gap_handler.assert_called_once()
+        gap, location_ids = gap_handler.call_args.args
+        self.assertIsInstance(gap, ConnectionGap)
+        self.assertEqual(location_ids, [1, 8])
+
+    def test_invalid_number_of_connections(self):
+        """Test that at least one connection is required"""
+        with self.assertRaises(ValueError):
+            MultiLocationMQTTClient(api_key="api_key", connections=0)
+
+    def test_location_events_unsubscribe(self):
+        """Test that LocationEvents removes handlers from the shared connection"""
+        client = MultiLocationMQTTClient(api_key="api_key")
+        location = client.location(1)
+        self.assertIsInstance(location, LocationEvents)
+        location.on_ticket_generated()(Mock(__name__="handler"))
+
+        location.unsubscribe_from_topic("locations/1/tickets/generated")
+
+        self.assertEqual(client.connections[0].list_subscribed_topics(), [])
+
+    def test_location_events_handlers_are_read_only(self):
+        """Test that the handlers of a location can't be replaced, since they are kept by the connection"""
+        client = MultiLocationMQTTClient(api_key="api_key")
+        location = client.location(1)
+
+        with self.assertRaises(AttributeError):
+            location.message_handlers = {}
+        self.assertIs(location.message_handlers, client.connections[0].message_handlers)
@@ -0,0 +1,230 @@
+import json
+import multiprocessing
+import unittest
+from functools import partial
+from unittest.mock import MagicMock, Mock, patch
+
+from pyqube.events.multiprocess import (
+    MultiProcessMQTTClient,
+    SharedRingBuffer,
+    WorkerEvents,
+    queue_partition_key,
+    topic_partition_key,
+)
+
+
+def ticket_payload(ticket_id: int, queue_id: int) -> bytes:
+    return json.dumps(
+        {
+            "id": ticket_id,
+            "signature": f"signature-{ticket_id}",
+            "number": ticket_id,
+            "printed_number": f"{ticket_id:03d}",
+            "printed_tag": "A",
+            "queue": queue_id,
+            "queue_dest": queue_id,
+            "counter_dest": None,
+            "profile_dest": None,
+            "state": 1,
+            "invalidated_by_system": None,
+            "ticket_local_runner": None,
+            "generated_by_ticket_kiosk": None,
+            "generated_by_profile": None,
+            "generated_by_totem": None,
+            "generated_by_api_key": None,
+            "priority": False,
+            "priority_level": 0,
+            "note": None,
+            "is_generated_by_api_key": False,
+            "created_at": "2024-01-01T10:00:00Z",
+            "updated_at": "2024-01-01T10:00:00Z",
+            "deleted_at": None,
+            "local_runner": None,
+            "tags": [],
+        }
+    ).encode('utf-8')
+
+
+def register_handlers(results, events):
+    """Handlers of the workers of the tests, which report the tickets they handle."""
+
+    @events.on_ticket_generated()
+    def handle_ticket(ticket):
+        results.put((multiprocessing.current_process().name, ticket.queue, ticket.id))
+
+
+class TestSharedRingBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = SharedRingBuffer.create(capacity=256)
+        self.addCleanup(self.ring.close)
+
+    def test_records_are_read_in_order(self):
+        """Test that records are read in the order they were written"""
+        self.assertIsNone(self.ring.get())
+
+        self.assertTrue(self.ring.put(b"topic/1", b"first"))
+        self.assertTrue(self.ring.put(b"topic/2", b""))
+
+        self.assertEqual(self.ring.get(), (b"topic/1", b"first"))
+        self.assertEqual(self.ring.get(), (b"topic/2", b""))
+        self.assertIsNone(self.ring.get())
+        self.assertEqual(len(self.ring), 0)
+
+    def test_full_buffer_refuses_records(self):
+        """Test that records are refused while there is not enough free space, and accepted once it is read"""
+        while self.ring.put(b"topic", b"x" * 50):
+            pass
+
+        self.ring.get()
+        self.assertTrue(self.ring.put(b"topic", b"x" * 50))
+
+    def test_records_wrap_around(self):
+        """Test that records that don't fit before the end of the buffer are written at its start"""
+        for index in range(100):
+            payload = str(index).encode('utf-8') * 20
+            self.assertTrue(self.ring.put(b"topic", payload))
+            self.assertEqual(self.ring.get(), (b"topic", payload))
+
+    def test_record_larger_than_buffer(self):
+        """Test that a record that can never fit raises ValueError"""
+        with self.assertRaises(ValueError):
+            self.ring.put(b"topic", b"x" * 300)
+
+    def test_positions_are_published_through_lock(self):
+        """Test that each side reads the other's position and publishes its own while holding the shared lock"""
+        lock = MagicMock()
+        ring = SharedRingBuffer.create(capacity=256, lock=lock)
+        self.addCleanup(ring.close)
+
+        ring.put(b"topic", b"payload")
+        self.assertEqual(lock.__enter__.call_count, 2)  # Read position loaded, write position stored
+        ring.get()
+        self.assertEqual(lock.__enter__.call_count, 4)  # Write position loaded, read position stored
+        self.assertEqual(lock.__exit__.call_count, 4)
+
+    def test_attached_buffer_reads_records(self):
+        """Test that records written to a ring buffer are read through another attachment"""
+        ring = SharedRingBuffer.attach(self.ring.name, self.ring.lock)
+        self.addCleanup(ring.close)
+
+        self.ring.put(b"topic", b"payload")
+
+        self.assertEqual(ring.get(), (b"topic", b"payload"))
+        self.assertEqual(len(self.ring), 0)
+
+
+class TestPartitionKeys(unittest.TestCase):
+
+    def test_topic_partition_key(self):
+        """Test that messages are partitioned by the queue or counter of their topic, or else by topic"""
+        self.assertEqual(topic_partition_key("locations/1/queues/3/tickets/called", b""), ("queues", 3))
+        self.assertEqual(topic_partition_key("locations/1/counters/5/tickets/called", b""), ("counters", 5))
+        self.assertEqual(topic_partition_key("locations/1/tickets/generated", b""), "locations/1/tickets/generated")
+
+    def test_queue_partition_key(self):
+        """Test that messages are partitioned by the queue of their payload"""
+        topic = "locations/1/tickets/generated"
+
+        self.assertEqual(queue_partition_key(topic, ticket_payload(1, 3)), ("queues", 3))
+        self.assertEqual(queue_partition_key(topic, b'{"queue": {"id": 4}}'), ("queues", 4))
+        self.assertEqual(queue_partition_key(topic, b"[]"), topic)
+        self.assertEqual(queue_partition_key(topic, b"invalid"), topic)
+
+
+class TestWorkerEvents(unittest.TestCase):
+
+    def test_dispatch_calls_exact_and_wildcard_handlers(self):
+        """Test that messages are dispatched to the handlers of their topic and of matching wildcard topics"""
+        events = WorkerEvents(location_id=1)
+        exact_handler, wildcard_handler = Mock(), Mock()
+        events.subscribe_to_topic("locations/1/queues/1/tickets/called", exact_handler)
+        events.subscribe_to_topic("locations/1/queues/+/tickets/called", wildcard_handler)
+
+        events.dispatch_message("locations/1/queues/1/tickets/called", b"payload")
+        events.dispatch_message("locations/1/queues/2/tickets/called", b"other")
+
+        exact_handler.assert_called_once_with(b"payload")
+        self.assertEqual(wildcard_handler.call_count, 2)
+
+    def test_failing_handler_does_not_stop_dispatch(self):
+        """Test that an error in a handler is logged and the other handlers are still called"""
+        events = WorkerEvents(location_id=1)
+        handler = Mock()
+        events.subscribe_to_topic("topic", Mock(side_effect=ValueError("Invalid")))
+        events.subscribe_to_topic("topic", handler)
+
+        with self.assertLogs("pyqube.events.multiprocess", level="ERROR"):
+            events.dispatch_message("topic", b"payload")
+
+        handler.assert_called_once_with(b"payload")
+
+
+class TestMultiProcessMQTTClient(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('paho.mqtt.client.Client')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client_class.side_effect = lambda *args, **kwargs: MagicMock()
+        self.results = multiprocessing.Queue()
+
+    def create_client(self, **options) -> MultiProcessMQTTClient:
+        client = MultiProcessMQTTClient(
+            api_key='testapikey',
+            location_id=1,
+            setup=partial(register_handlers, self.results),
+            workers=2,
+            max_idle_sleep=0.001,
+            **options
+        )
+        self.addCleanup(client.stop_workers)
+        return client
+
+    def test_setup_subscribes_in_owner_process(self):
+        """Test that the handlers of setup are subscribed on the connection and not called in the owner process"""
+        client = self.create_client()
+
+        client.client.connect.assert_called_once()
+        self.assertIn("locations/1/tickets/generated", client.list_subscribed_topics())
+        self.assertEqual(len(client.workers), 2)
+        self.assertTrue(all(worker.is_alive() for worker in client.workers))
+
+    def test_messages_are_handled_in_order_by_key(self):
+        """Test that every message is handled by a worker and the messages of a queue by the same one, in order"""
+        client = self.create_client(partition_key=queue_partition_key)
+        messages = [(ticket_id, ticket_id % 4) for ticket_id in range(200)]
+
+        for ticket_id, queue_id in messages:
+            client._on_message(
+                client.client, None,
+                Mock(topic="locations/1/tickets/generated", payload=ticket_payload(ticket_id, queue_id))
+            )
+        client.stop_workers()
+
+        handled = [self.results.get(timeout=5) for _ in messages]
+        self.assertEqual(client.fanout_stats.forwarded, len(messages))
+        for queue_id in range(4):
+            queue_results = [result for result in handled if result[1] == queue_id]
+            self.assertEqual(len({worker for worker, _, _ in queue_results}), 1)
+            self.assertEqual([ticket_id for _, _, ticket_id in queue_results], list(range(queue_id, 200, 4)))
+
+    def test_lazy_connect(self):
+        """Test that with lazy_connect the connection is started in the background when handlers are registered"""
+        client = self.create_client(lazy_connect=True)
+
+        client.client.connect.assert_not_called()
+        client.client.connect_async.assert_called_once()
+
+    def test_full_ring_buffer_drops_messages(self):
+        """Test that messages are dropped at once when the ring buffer of their worker is full"""
+        client = self.create_client(ring_size=64)
+        client.stop_workers(timeout=5)
+        client._rings = [SharedRingBuffer.create(capacity=64)]  # Released by stop_workers
+
+        with self.assertLogs("pyqube.events.multiprocess", level="ERROR"):
+            for index in range(3):
+                client.dispatch_message("topic", b"x" * 30)
+
+        self.assertEqual(client.fanout_stats.forwarded, 1)
+        self.assertEqual(client.fanout_stats.dropped, 2)
@@ -0,0 +1,97 @@
+import json
+import unittest
+from array import array
+from unittest.mock import MagicMock, Mock
+
+from pyqube.events.exceptions import PayloadTypeError
+from pyqube.events.handlers import QueueHandler
+from pyqube.types import QueuesAverageWaitingTimeBatch, QueuesWaitingTicketsBatch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ConcreteQueueHandler(QueueHandler):
+
+    def __init__(self):
+        super().__init__()
+        self.message_handlers = {}
+
+    def subscribe_to_topic(self, topic: str, handler: Mock):
+        self.message_handlers.setdefault(topic, []).append(handler)
+
+
+class TestQueueMetricBatches(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = ConcreteQueueHandler()
+        self.handler.location_id = 1
+        self.waiting_number_payload = [{
+            "queue": {
+                "id": queue_id,
+                "tag": f"Q{queue_id}",
+                "name": f"Queue {queue_id}"
+            },
+            "waiting_tickets": queue_id * 2,
+        } for queue_id in (3, 5, 8)]
+
+    def test_on_queues_changed_waiting_number_batch(self):
+        """Test that the handler receives the payload as columns"""
+        mock_handler = MagicMock()
+        self.handler.on_queues_changed_waiting_number_batch()(mock_handler)
+
+        registered_handler = self.handler.message_handlers["locations/1/queues/changed-waiting-number"][0]
+        registered_handler(json.dumps(self.waiting_number_payload).encode('utf-8'))
+
+        batch = mock_handler.call_args[0][0]
+        self.assertIsInstance(batch, QueuesWaitingTicketsBatch)
+        self.assertEqual(batch.queue_ids, array("q", [3, 5, 8]))
+        self.assertEqual(batch.waiting_tickets, array("q", [6, 10, 16]))
+        self.assertEqual(list(batch), [(3, 6), (5, 10), (8, 16)])
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.get(5), 10)
+        self.assertIsNone(batch.get(4))
+
+    def test_on_queues_changed_average_waiting_time_batch(self):
+        """Test that average waiting times are kept as floats"""
+        mock_handler = MagicMock()
+        self.handler.on_queues_changed_average_waiting_time_batch()(mock_handler)
+
+        payload = [{
+            "queue": {
+                "id": 3,
+                "tag": "Q3",
+                "name": "Queue 3"
+            },
+            "average_waiting_time": 120
+        }]
+        registered_handler = self.handler.message_handlers["locations/1/queues/changed-average-waiting-time"][0]
+        registered_handler(json.dumps(payload).encode('utf-8'))
+
+        mock_handler.assert_called_once_with(QueuesAverageWaitingTimeBatch(array("q", [3]), array("d", [120.0])))
+
+    def test_decode_invalid_payloads(self):
+        """Test that payloads that are not lists of queue metrics raise TypeError"""
+        for payload in ({"queue": {"id": 1}}, [{"queue": {"id": 1}}], [{"waiting_tickets": 1}]):
+            with self.subTest(payload=payload):
+                with self.assertRaises(TypeError):
+                    QueuesWaitingTicketsBatch.decode(payload)
+
+        self.handler.on_queues_changed_waiting_number_batch()(MagicMock())
+        registered_handler = self.handler.message_handlers["locations/1/queues/changed-waiting-number"][0]
+        with self.assertRaises(PayloadTypeError):
+            registered_handler(b'[{"queue": {"id": 1}}]')
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_to_numpy_shares_memory(self):
+        """Test that columns are exported to NumPy without copies"""
+        batch = QueuesWaitingTicketsBatch.decode(self.waiting_number_payload)
+
+        queue_ids, waiting_tickets = batch.to_numpy()
+
+        self.assertEqual(queue_ids.tolist(), [3, 5, 8])
+        self.assertEqual(int(waiting_tickets.sum()), 32)
+        batch.values[0] = 0
+        self.assertEqual(waiting_tickets[0], 0)
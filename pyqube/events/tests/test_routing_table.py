@@ -0,0 +1,193 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+import paho.mqtt.client as mqtt
+
+from pyqube.events.clients import MQTTClient
+from pyqube.events.routing import RoutingTable
+
+
+class TestRoutingTable(unittest.TestCase):
+
+    def test_registrations_build_new_tables(self):
+        """Test that adding and removing handlers returns new tables and leaves the previous ones unchanged"""
+        handler, wildcard_handler = Mock(), Mock()
+        empty = RoutingTable()
+
+        routes = empty.with_handler("topic", handler).with_handler("queues/+/tickets", wildcard_handler)
+
+        self.assertEqual(dict(empty.handlers), {})
+        self.assertEqual(routes.handlers["topic"], (handler, ))
+        self.assertEqual(routes.wildcard_topics, ("queues/+/tickets", ))
+        self.assertIs(routes.with_handler("topic", handler), routes)
+
+        without_wildcard = routes.without_topic("queues/+/tickets")
+        self.assertEqual(list(without_wildcard.handlers), ["topic"])
+        self.assertEqual(without_wildcard.wildcard_topics, ())
+        self.assertIn("queues/+/tickets", routes.handlers)
+        self.assertIs(without_wildcard.without_topic("queues/+/tickets"), without_wildcard)
+
+        other_handler = Mock()
+        routes = routes.with_handler("topic", other_handler)
+        without_handler = routes.without_handler("topic", handler)
+        self.assertEqual(without_handler.handlers["topic"], (other_handler, ))
+        self.assertNotIn("topic", without_handler.without_handler("topic", other_handler).handlers)
+        self.assertIs(routes.without_handler("topic", Mock()), routes)
+
+    def test_matching_handlers(self):
+        """Test that a message topic matches the handlers of the exact topic and of matching wildcard topics"""
+        exact_handler, wildcard_handler = Mock(), Mock()
+        routes = RoutingTable({"queues/1/tickets": [exact_handler], "queues/+/tickets": [wildcard_handler]})
+
+        self.assertEqual(
+            sorted(routes.matching("queues/1/tickets")),
+            [("queues/+/tickets", (wildcard_handler, )), ("queues/1/tickets", (exact_handler, ))],
+        )
+        self.assertEqual(list(routes.matching("queues/2/tickets")), [("queues/+/tickets", (wildcard_handler, ))])
+        self.assertEqual(list(routes.matching("counters/1/tickets")), [])
+
+    def test_wildcard_topics_match_in_registration_order(self):
+        """Test that the handlers of matching wildcard topics are called in the order their topics were registered"""
+        topics = ["queues/+/tickets/+", "queues/+/tickets/#", "#", "queues/#", "+/+/tickets/+", "queues/1/#"]
+        routes = RoutingTable()
+        for topic in topics:
+            routes = routes.with_handler(topic, Mock())
+
+        self.assertEqual([topic for topic, _ in routes.matching("queues/1/tickets/called")], topics)
+        routes = routes.without_topic("#").with_handler("#", Mock())
+        reregistered = [topic for topic in topics if topic != "#"] + ["#"]
+        self.assertEqual([topic for topic, _ in routes.matching("queues/1/tickets/called")], reregistered)
+
+    def test_handlers_are_read_only(self):
+        """Test that the handlers of a table can't be modified in place"""
+        routes = RoutingTable({"topic": [Mock()]})
+
+        with self.assertRaises(TypeError):
+            routes.handlers["other/topic"] = (Mock(), )
+        self.assertIsInstance(routes.handlers["topic"], tuple)
+
+
+class TestMQTTClientConcurrentRegistration(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('paho.mqtt.client.Client')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client_class.return_value = MagicMock()
+        self.client = MQTTClient(api_key='testapikey', location_id=1)
+
+    def test_message_handlers_snapshot(self):
+        """Test that message_handlers is a read-only snapshot replaced by registrations"""
+        handler = Mock()
+        snapshot = self.client.message_handlers
+
+        self.client.subscribe_to_topic("test/topic", handler)
+
+        self.assertEqual(dict(snapshot), {})
+        self.assertEqual(self.client.message_handlers["test/topic"], (handler, ))
+        with self.assertRaises(TypeError):
+            self.client.message_handlers["test/topic"] = ()
+
+    def test_dispatch_while_handlers_change(self):
+        """Test that messages flow to the stable handlers while other handlers are added and removed in other threads"""
+        stable_handler, wildcard_handler = Mock(), Mock()
+        self.client.subscribe_to_topic("locations/1/queues/1/tickets/called", stable_handler)
+        self.client.subscribe_to_topic("locations/1/queues/+/tickets/called", wildcard_handler)
+        errors = []
+        running = threading.Event()
+        running.set()
+
+        def register(worker: int):
+            try:
+                iteration = 0
+                while running.is_set():
+                    topics = [f"locations/1/queues/{worker}{index}/tickets/called" for index in range(10)]
+                    topics.append(f"locations/1/counters/+/tickets/called/{worker}/{iteration % 3}")
+                    for topic in topics:
+                        self.client.subscribe_to_topic(topic, Mock())
+                    for topic in topics:
+                        self.client.unsubscribe_from_topic(topic)
+                    iteration += 1
+            except Exception as e:
+                errors.append(e)
+
+        registrars = [threading.Thread(target=register, args=(worker, )) for worker in range(2, 5)]
+        for registrar in registrars:
+            registrar.start()
+        try:
+            for _ in range(2000):
+                self.client._on_message(
+                    self.client.client, None, Mock(topic="locations/1/queues/1/tickets/called", payload=b"{}")
+                )
+                self.client._on_message(
+                    self.client.client, None, Mock(topic="locations/1/queues/2/tickets/called", payload=b"{}")
+                )
+        finally:
+            running.clear()
+            for registrar in registrars:
+                registrar.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(stable_handler.call_count, 2000)
+        self.assertEqual(wildcard_handler.call_count, 4000)
+        self.assertEqual(
+            set(self.client.message_handlers),
+            {"locations/1/queues/1/tickets/called", "locations/1/queues/+/tickets/called"},
+        )
+
+    def test_reconnect_while_handlers_change(self):
+        """Test that reconnections resubscribe consistently while handlers are added and removed in other threads"""
+        errors = []
+        running = threading.Event()
+        running.set()
+
+        def register(worker: int):
+            try:
+                while running.is_set():
+                    topics = [f"locations/1/queues/{worker}{index}/tickets/called" for index in range(10)]
+                    for topic in topics:
+                        self.client.subscribe_to_topic(topic, Mock())
+                    self.client.unsubscribe_from_topics(topics)
+            except Exception as e:
+                errors.append(e)
+
+        registrars = [threading.Thread(target=register, args=(worker, )) for worker in range(2, 5)]
+        for registrar in registrars:
+            registrar.start()
+        try:
+            for _ in range(500):
+                self.client._on_disconnect(self.client.client, None, 1)
+                self.client._on_connect(self.client.client, None, {}, 0)
+        finally:
+            running.clear()
+            for registrar in registrars:
+                registrar.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.client.connection_stats.reconnections, 500)
+        self.assertEqual(self.client.list_subscribed_topics(), [])
+
+    def test_concurrent_registrations_subscribe_once(self):
+        """Test that handlers registered concurrently for the same topic send a single SUBSCRIBE"""
+        barrier = threading.Barrier(8)
+
+        def subscribe(*args, **kwargs):
+            time.sleep(0.001)  # Widens the window in which another registration could send its own SUBSCRIBE
+            return mqtt.MQTT_ERR_SUCCESS, 1
+
+        self.client.client.subscribe.side_effect = subscribe
+
+        def register():
+            barrier.wait()
+            self.client.subscribe_to_topic("locations/1/tickets/generated", Mock())
+
+        registrars = [threading.Thread(target=register) for _ in range(8)]
+        for registrar in registrars:
+            registrar.start()
+        for registrar in registrars:
+            registrar.join()
+
+        self.client.client.subscribe.assert_called_once_with("locations/1/tickets/generated")
+        self.assertEqual(len(self.client.message_handlers["locations/1/tickets/generated"]), 8)
@@ -0,0 +1,117 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import paho.mqtt.client as mqtt
+
+from pyqube.events.clients import MQTTClient
+from pyqube.testing.mqtt_broker import FakeMQTTBroker
+
+
+def called_ticket_payload(ticket_id: int, queue_id: int) -> str:
+    return json.dumps(
+        {
+            "id": ticket_id,
+            "answering": ticket_id,
+            "priority": False,
+            "printed_tag": "A",
+            "printed_number": f"{ticket_id:03d}",
+            "number": ticket_id,
+            "queue": queue_id,
+            "counter": 1,
+            "queue_tag": f"Q{queue_id}",
+            "counter_tag": "C1",
+            "created_at": "2024-01-01T10:00:00Z",
+        }
+    )
+
+
+class TestSharedSubscriptions(unittest.TestCase):
+
+    def setUp(self):
+        self.broker = FakeMQTTBroker()
+        patcher = patch('paho.mqtt.client.Client', self.broker.create_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_replica(self, share_group: str = "consumers", **options) -> MQTTClient:
+        return MQTTClient(api_key='testapikey', location_id=1, protocol=mqtt.MQTTv5, share_group=share_group, **options)
+
+    def test_topics_are_subscribed_as_shared_subscriptions(self):
+        """Test that the topics of the on_* decorators are subscribed in the share group"""
+        client = self.create_replica()
+
+        client.on_ticket_generated()(lambda ticket: None)
+
+        self.assertEqual(client.list_subscribed_topics(), ["$share/consumers/locations/1/tickets/generated"])
+        self.assertIn("$share/consumers/locations/1/tickets/generated", client.client.subscriptions)
+
+    def test_messages_are_balanced_between_replicas(self):
+        """Test that each message is handled by exactly one replica of the group, and every replica handles some"""
+        handled = {}
+        for replica in range(3):
+            client = self.create_replica()
+            client.on_ticket_called(queue_id=1)(
+                lambda answering_ticket, replica=replica: handled.setdefault(replica, []).append(answering_ticket.id)
+            )
+
+        for ticket_id in range(30):
+            self.broker.publish("locations/1/queues/1/tickets/called", called_ticket_payload(ticket_id, 1))
+
+        handled_ids = sorted(ticket_id for ticket_ids in handled.values() for ticket_id in ticket_ids)
+        self.assertEqual(handled_ids, list(range(30)))
+        self.assertEqual([len(ticket_ids) for ticket_ids in handled.values()], [10, 10, 10])
+
+    def test_clients_outside_group_receive_every_message(self):
+        """Test that clients without a share group, or in another group, still receive every message"""
+        for _ in range(2):
+            self.create_replica().on_ticket_called(queue_id=1)(lambda answering_ticket: None)
+        other_group = self.create_replica(share_group="auditors")
+        other_group.on_ticket_called(queue_id=1)(lambda answering_ticket: None)
+        client = MQTTClient(api_key='testapikey', location_id=1)
+        client.on_ticket_called(queue_id=1)(lambda answering_ticket: None)
+
+        for ticket_id in range(4):
+            self.assertEqual(
+                self.broker.publish("locations/1/queues/1/tickets/called", called_ticket_payload(ticket_id, 1)), 3
+            )
+
+        self.assertEqual(len(client.client.received), 4)
+        self.assertEqual(len(other_group.client.received), 4)
+
+    def test_wildcard_subscriptions_dispatch_to_handlers_of_the_topic(self):
+        """Test that a shared wildcard subscription dispatches each message to the handlers of its queue"""
+        client = self.create_replica(wildcard_subscriptions=True)
+        handled = []
+        for queue_id in (1, 2):
+            client.on_ticket_called(queue_id=queue_id)(
+                lambda answering_ticket, queue_id=queue_id: handled.append((queue_id, answering_ticket.queue))
+            )
+
+        self.broker.publish("locations/1/queues/2/tickets/called", called_ticket_payload(1, 2))
+
+        self.assertEqual(client.list_subscribed_topics(), ["$share/consumers/locations/1/queues/+/tickets/called"])
+        self.assertEqual(handled, [(2, 2)])
+
+    def test_unsubscribe_from_shared_topic(self):
+        """Test that removing the handlers of a topic removes its shared subscription"""
+        client = self.create_replica()
+        client.on_ticket_generated()(lambda ticket: None)
+
+        client.unsubscribe_from_topic("locations/1/tickets/generated")
+
+        self.assertEqual(client.list_subscribed_topics(), [])
+        self.assertEqual(client.client.subscriptions, {})
+
+    def test_invalid_share_groups(self):
+        """Test that share groups need MQTT v5, a valid name and, for persistent sessions, a client id"""
+        with self.assertRaises(ValueError):
+            MQTTClient(api_key='testapikey', location_id=1, share_group="consumers")
+        for share_group in ("", "consumers/1", "consumers+", "#"):
+            with self.subTest(share_group=share_group), self.assertRaises(ValueError):
+                self.create_replica(share_group=share_group)
+        with self.assertRaises(ValueError):
+            self.create_replica(clean_session=False)
+
+        client = self.create_replica(clean_session=False, client_id="consumer-1")
+        self.assertEqual(client.client_id, "consumer-1")
@@ -0,0 +1,227 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from pyqube.decoders import decode
+from pyqube.events.handlers import TicketHandler
+from pyqube.events.sinks import SQLiteSink
+from pyqube.testing.rest_server import MockQubeServer
+from pyqube.types import Answering, Ticket
+
+
+class ConcreteHandler(TicketHandler):
+
+    def __init__(self):
+        super().__init__()
+        self.location_id = 1
+        self.message_handlers = {}
+
+    def subscribe_to_topic(self, topic: str, handler: Mock):
+        self.message_handlers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic: str, payload: dict):
+        for handler in self.message_handlers[topic]:
+            handler(json.dumps(payload).encode('utf-8'))
+
+
+class TestSQLiteSink(unittest.TestCase):
+
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.path = os.path.join(temporary_directory.name, "events.sqlite3")
+        self.server = MockQubeServer()
+
+    def open_sink(self, **options) -> SQLiteSink:
+        options.setdefault("flush_interval", 60)
+        sink = SQLiteSink(self.path, **options)
+        self.addCleanup(sink.close)
+        return sink
+
+    def query(self, sql: str) -> list:
+        with sqlite3.connect(self.path) as connection:
+            return connection.execute(sql).fetchall()
+
+    def test_records_are_buffered_until_flush(self):
+        """Test that writes only buffer records, which are written by flush in one transaction"""
+        sink = self.open_sink()
+        for _ in range(3):
+            sink.write_ticket(decode(Ticket, self.server.build_ticket(1, 1, False)))
+
+        self.assertEqual(sink.backlog, 3)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM tickets"), [(0, )])
+
+        self.assertTrue(sink.flush(timeout=5))
+        self.assertEqual(sink.backlog, 0)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM tickets"), [(3, )])
+        self.assertEqual(sink.stats.written, 3)
+        self.assertEqual(sink.stats.flushes, 1)
+        self.assertIsNotNone(sink.stats.last_flushed_at)
+
+    def test_database_uses_wal_mode(self):
+        """Test that the database is in WAL mode"""
+        self.open_sink()
+
+        self.assertEqual(self.query("PRAGMA journal_mode"), [("wal", )])
+
+    def test_batch_size_triggers_flush(self):
+        """Test that the writer flushes when a batch is buffered, without waiting for the interval"""
+        sink = self.open_sink(batch_size=2)
+        ticket = decode(Ticket, self.server.build_ticket(1, 1, False))
+        sink.write_ticket(ticket)
+        sink.write_ticket(decode(Ticket, self.server.build_ticket(1, 1, False)))
+
+        with sink._condition:
+            self.assertTrue(sink._condition.wait_for(lambda: sink.stats.written == 2, timeout=5))
+
+    def test_flush_interval_triggers_flush(self):
+        """Test that buffered records are written after the flush interval"""
+        sink = self.open_sink(flush_interval=0.01)
+        sink.write_ticket(decode(Ticket, self.server.build_ticket(1, 1, False)))
+
+        with sink._condition:
+            self.assertTrue(sink._condition.wait_for(lambda: sink.stats.written == 1, timeout=5))
+
+    def test_full_backlog_drops_records(self):
+        """Test that records are dropped instead of blocking when the backlog is full"""
+        sink = self.open_sink(max_backlog=1)
+        ticket = decode(Ticket, self.server.build_ticket(1, 1, False))
+
+        self.assertTrue(sink.write_ticket(ticket))
+        self.assertFalse(sink.write_ticket(ticket))
+        self.assertEqual(sink.stats.dropped, 1)
+
+    def test_concurrent_producers_respect_max_backlog(self):
+        """Test that concurrent writers never buffer more records than the maximum backlog"""
+        sink = self.open_sink(max_backlog=100, batch_size=1000)
+        ticket = decode(Ticket, self.server.build_ticket(1, 1, False))
+        barrier = threading.Barrier(8)
+
+        def write():
+            barrier.wait()
+            for _ in range(200):
+                sink.write_ticket(ticket)
+
+        writers = [threading.Thread(target=write) for _ in range(8)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+
+        self.assertEqual(sink.backlog, 100)
+        self.assertEqual(sink.stats.enqueued, 100)
+        self.assertEqual(sink.stats.dropped, 1500)
+
+    def test_answerings_are_replaced_when_written_again(self):
+        """Test that writing an Answering again updates its row"""
+        sink = self.open_sink()
+        data = self.server.build_answering(1, 1)
+        sink.write_answering(decode(Answering, data))
+        data.update(service_time=120, finished_at="2024-01-01T10:00:00Z")
+        sink.write_answering(decode(Answering, data))
+        sink.flush(timeout=5)
+
+        self.assertEqual(
+            self.query("SELECT id, ticket, service_time, finished_at FROM answerings"),
+            [(data["id"], data["ticket"]["id"], 120, "2024-01-01T10:00:00Z")],
+        )
+
+    def test_attach_writes_generated_and_called_tickets(self):
+        """Test that the sink subscribes to generated tickets and tickets called in any queue"""
+        handler = ConcreteHandler()
+        sink = self.open_sink().attach(handler)
+        ticket = self.server.build_ticket(1, 1, False)
+
+        handler.publish("locations/1/tickets/generated", ticket)
+        handler.publish(
+            "locations/1/queues/+/tickets/called", {
+                "id": ticket["id"],
+                "answering": 7,
+                "priority": False,
+                "printed_tag": ticket["printed_tag"],
+                "printed_number": ticket["printed_number"],
+                "number": ticket["number"],
+                "queue": 1,
+                "counter": 2,
+                "queue_tag": "Q1",
+                "counter_tag": "C2",
+                "created_at": "2024-01-01T10:00:00Z",
+            }
+        )
+        sink.flush(timeout=5)
+
+        self.assertEqual(self.query("SELECT id, queue FROM tickets"), [(ticket["id"], 1)])
+        self.assertEqual(
+            self.query("SELECT ticket, answering, counter FROM called_tickets"), [(ticket["id"], 7, 2)]
+        )
+
+    def test_close_writes_buffered_records(self):
+        """Test that closing the sink writes the records still buffered"""
+        sink = self.open_sink()
+        sink.write_ticket(decode(Ticket, self.server.build_ticket(1, 1, False)))
+        sink.close()
+
+        self.assertEqual(self.query("SELECT COUNT(*) FROM tickets"), [(1, )])
+        self.assertFalse(sink.write_ticket(decode(Ticket, self.server.build_ticket(1, 1, False))))
+
+    def test_records_accepted_while_closing_are_written(self):
+        """Test that every record accepted while the sink is closed is written before the writer stops"""
+        sink = self.open_sink()
+        tickets = [decode(Ticket, self.server.build_ticket(1, 1, False)) for _ in range(2000)]
+        accepted = []
+
+        def write():
+            accepted.extend(ticket for ticket in tickets if sink.write_ticket(ticket))
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        sink.close()
+        writer.join()
+
+        self.assertEqual(self.query("SELECT COUNT(*) FROM tickets"), [(len(accepted), )])
+
+    def test_flush_after_close_returns_at_once(self):
+        """Test that flushing a closed sink doesn't wait for a writer that has stopped"""
+        sink = self.open_sink()
+        sink.write_ticket(decode(Ticket, self.server.build_ticket(1, 1, False)))
+        sink.close()
+
+        start = time.monotonic()
+        self.assertTrue(sink.flush())
+        self.assertTrue(sink.flush(timeout=2))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_flush_while_closing(self):
+        """Test that flushes requested while the sink is closed are released once the buffered records are written"""
+        sink = self.open_sink()
+        ticket = decode(Ticket, self.server.build_ticket(1, 1, False))
+        results = []
+
+        def flush():
+            for _ in range(50):
+                sink.write_ticket(ticket)
+                results.append(sink.flush(timeout=5))
+
+        flusher = threading.Thread(target=flush)
+        flusher.start()
+        sink.close()
+        flusher.join(timeout=10)
+
+        self.assertFalse(flusher.is_alive())
+        self.assertTrue(all(results))
+
+    def test_failed_transaction_is_counted(self):
+        """Test that records of a failed transaction are counted and logged"""
+        sink = self.open_sink()
+        with sqlite3.connect(self.path) as connection:
+            connection.execute("DROP TABLE tickets")
+        sink.write_ticket(decode(Ticket, self.server.build_ticket(1, 1, False)))
+
+        with self.assertLogs("pyqube.events.sinks", level="ERROR"):
+            sink.flush(timeout=5)
+        self.assertEqual(sink.stats.failed, 1)
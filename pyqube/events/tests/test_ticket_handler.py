@@ -40,3 +40,21 @@ class TestTicketHandler:
         """Test the behavior when both queue_id and counter_id are provided."""
         with pytest.raises(InvalidTicketHandlerArgumentsError):
             ticket_handler.on_ticket_called(queue_id=90, counter_id=124)
+
+    def test_on_ticket_called_in_all_queues(self, ticket_handler):
+        """Test that on_ticket_called with all_queues registers the handler for the wildcard topic of every queue."""
+        ticket_handler.message_handlers = {}
+        ticket_handler.subscribe_to_topic = Mock()
+
+        ticket_handler.on_ticket_called(all_queues=True, qos=1)(Mock())
+
+        topic, _ = ticket_handler.subscribe_to_topic.call_args.args
+        assert topic == "locations/1/queues/+/tickets/called"
+        assert ticket_handler.subscribe_to_topic.call_args.kwargs == {"qos": 1}
+
+    def test_all_queues_with_queue_or_counter_id(self, ticket_handler):
+        """Test that all_queues can't be combined with queue_id or counter_id."""
+        with pytest.raises(InvalidTicketHandlerArgumentsError):
+            ticket_handler.on_ticket_called(queue_id=90, all_queues=True)
+        with pytest.raises(InvalidTicketHandlerArgumentsError):
+            ticket_handler.on_ticket_called(counter_id=124, all_queues=True)
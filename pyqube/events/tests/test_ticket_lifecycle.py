@@ -0,0 +1,144 @@
+import json
+import unittest
+from unittest.mock import MagicMock, Mock
+
+from pyqube.events.handlers import QueuingSystemResetHandler, TicketHandler
+from pyqube.events.lifecycle import TicketLifecycleTracker
+from pyqube.testing.rest_server import MockQubeServer
+from pyqube.types import AnsweringTicket, Ticket
+
+
+class ConcreteHandler(TicketHandler, QueuingSystemResetHandler):
+
+    def __init__(self):
+        super().__init__()
+        self.location_id = 1
+        self.message_handlers = {}
+
+    def subscribe_to_topic(self, topic: str, handler: Mock):
+        self.message_handlers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic: str, payload: dict):
+        for handler in self.message_handlers[topic]:
+            handler(json.dumps(payload).encode('utf-8'))
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTicketLifecycleTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockQubeServer()
+        self.clock = FakeClock()
+        self.tracker = TicketLifecycleTracker(ttl=60, max_open_tickets=3, clock=self.clock)
+
+    def build_ticket(self, created_at: str = "2024-01-01T10:00:00.000000Z") -> Ticket:
+        ticket_data = self.server.build_ticket(1, 2, False)
+        ticket_data["created_at"] = created_at
+        return Ticket(**ticket_data)
+
+    @staticmethod
+    def build_answering_ticket(ticket: Ticket, created_at: str = "2024-01-01T10:05:30.000000Z") -> dict:
+        return {
+            "id": ticket.id,
+            "answering": 10,
+            "priority": False,
+            "printed_tag": ticket.printed_tag,
+            "printed_number": ticket.printed_number,
+            "number": ticket.number,
+            "queue": ticket.queue,
+            "counter": 4,
+            "queue_tag": "Q2",
+            "counter_tag": "C4",
+            "created_at": created_at,
+        }
+
+    def test_lifecycle_of_called_ticket(self):
+        """Test that calling an open ticket emits its lifecycle with the waiting time"""
+        handler = MagicMock()
+        self.tracker.on_lifecycle_completed()(handler)
+        ticket = self.build_ticket()
+
+        self.tracker.track_generated(ticket)
+        lifecycle = self.tracker.track_called(AnsweringTicket(**self.build_answering_ticket(ticket)))
+
+        handler.assert_called_once_with(lifecycle)
+        self.assertEqual(lifecycle.ticket, ticket)
+        self.assertEqual(lifecycle.waiting_time, 330)
+        self.assertEqual(len(self.tracker), 0)
+        self.assertEqual(self.tracker.stats.completed, 1)
+
+    def test_waiting_time_with_timezone_offsets(self):
+        """Test that datetimes with and without offsets are compared in UTC"""
+        ticket = self.build_ticket("2024-01-01T10:00:00.000000Z")
+        self.tracker.track_generated(ticket)
+
+        lifecycle = self.tracker.track_called(
+            AnsweringTicket(**self.build_answering_ticket(ticket, "2024-01-01T11:01:00.000000+01:00"))
+        )
+
+        self.assertEqual(lifecycle.waiting_time, 60)
+
+    def test_call_of_unknown_ticket(self):
+        """Test that calls of tickets that are not open are counted and ignored"""
+        ticket = self.build_ticket()
+
+        self.assertIsNone(self.tracker.track_called(AnsweringTicket(**self.build_answering_ticket(ticket))))
+        self.assertEqual(self.tracker.stats.unmatched_calls, 1)
+
+    def test_tickets_expire_after_ttl(self):
+        """Test that open tickets are dropped once their TTL elapsed"""
+        first_ticket = self.build_ticket()
+        self.tracker.track_generated(first_ticket)
+        self.clock.now = 30
+        second_ticket = self.build_ticket()
+        self.tracker.track_generated(second_ticket)
+
+        self.clock.now = 61
+        self.assertEqual(self.tracker.expire(), 1)
+
+        self.assertNotIn(first_ticket.id, self.tracker)
+        self.assertIn(second_ticket.id, self.tracker)
+        self.assertEqual(self.tracker.stats.expired, 1)
+
+    def test_open_tickets_are_capped(self):
+        """Test that the oldest open tickets are evicted when there are too many"""
+        tickets = [self.build_ticket() for _ in range(5)]
+        for ticket in tickets:
+            self.tracker.track_generated(ticket)
+
+        self.assertEqual(len(self.tracker), 3)
+        self.assertEqual(self.tracker.stats.evicted, 2)
+        self.assertNotIn(tickets[1].id, self.tracker)
+        self.assertIn(tickets[2].id, self.tracker)
+
+    def test_attach_to_events(self):
+        """Test that the tracker follows the events of a location, and resets drop open tickets"""
+        events = ConcreteHandler()
+        handler = MagicMock()
+        self.tracker.attach(events).on_lifecycle_completed()(handler)
+        self.assertIn("locations/1/queues/+/tickets/called", events.message_handlers)
+
+        first_ticket_data = self.server.build_ticket(1, 2, False)
+        second_ticket_data = self.server.build_ticket(1, 2, False)
+        events.publish("locations/1/tickets/generated", first_ticket_data)
+        events.publish("locations/1/queues/+/tickets/called", self.build_answering_ticket(Ticket(**first_ticket_data)))
+        handler.assert_called_once()
+
+        events.publish("locations/1/tickets/generated", second_ticket_data)
+        events.publish(
+            "locations/1/queuing-system-resets/created", {
+                "id": 1,
+                "location": 1,
+                "created_at": "2024-01-01T12:00:00.000000Z"
+            }
+        )
+        self.assertEqual(len(self.tracker), 0)
+        self.assertEqual(self.tracker.stats.reset, 1)
@@ -0,0 +1,86 @@
+import json
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+from pyqube.events.clients import MQTTClient
+from pyqube.types import AnsweringTicket
+
+
+class TestWildcardSubscriptions(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('paho.mqtt.client.Client')
+        self.mock_client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client = self.mock_client_class.return_value
+        self.mock_client.subscribe = MagicMock()
+        self.client = MQTTClient(api_key='testapikey', location_id=1, wildcard_subscriptions=True)
+
+        self.payload = {
+            "id": 1,
+            "answering": 2,
+            "priority": False,
+            "printed_tag": "A",
+            "printed_number": "001",
+            "number": 1,
+            "queue": 5,
+            "counter": 7,
+            "queue_tag": "A",
+            "counter_tag": "C1",
+            "created_at": "2024-01-01T00:00:00.000000Z",
+        }
+
+    def _publish(self, topic):
+        self.client._on_message(self.mock_client, None, Mock(topic=topic, payload=json.dumps(self.payload).encode()))
+
+    def test_queue_handlers_share_one_wildcard_subscription(self):
+        """Test that handlers of many queues subscribe once to the queues wildcard topic"""
+        for queue_id in range(1, 4):
+            self.client.on_ticket_called(queue_id=queue_id)(Mock(__name__=f"handler_{queue_id}"))
+
+        self.mock_client.subscribe.assert_called_once_with("locations/1/queues/+/tickets/called")
+        self.assertEqual(self.client.list_subscribed_topics(), ["locations/1/queues/+/tickets/called"])
+
+    def test_messages_are_dispatched_to_handlers_of_their_queue(self):
+        """Test that a message is only delivered to the handlers of the queue in its topic"""
+        handler_5 = Mock(__name__="handler_5")
+        handler_6 = Mock(__name__="handler_6")
+        self.client.on_ticket_called(queue_id=5)(handler_5)
+        self.client.on_ticket_called(queue_id=6)(handler_6)
+
+        self._publish("locations/1/queues/5/tickets/called")
+
+        handler_5.assert_called_once_with(AnsweringTicket(**self.payload))
+        handler_6.assert_not_called()
+
+    def test_counter_handlers_use_counters_wildcard(self):
+        """Test that counter handlers subscribe to the counters wildcard topic"""
+        handler = Mock(__name__="handler")
+        self.client.on_ticket_called(counter_id=7)(handler)
+
+        self.mock_client.subscribe.assert_called_once_with("locations/1/counters/+/tickets/called")
+        self._publish("locations/1/counters/7/tickets/called")
+        self._publish("locations/1/counters/8/tickets/called")
+        handler.assert_called_once()
+
+    def test_wildcard_is_unsubscribed_with_its_last_handler_topic(self):
+        """Test that the shared subscription is only removed when no queue uses it"""
+        self.client.on_ticket_called(queue_id=1)(Mock(__name__="handler_1"))
+        self.client.on_ticket_called(queue_id=2)(Mock(__name__="handler_2"))
+
+        self.client.unsubscribe_from_topic("locations/1/queues/1/tickets/called")
+        self.mock_client.unsubscribe.assert_not_called()
+        self.assertNotIn("locations/1/queues/1/tickets/called", self.client.message_handlers)
+
+        self.client.unsubscribe_from_topic("locations/1/queues/2/tickets/called")
+        self.mock_client.unsubscribe.assert_called_once_with("locations/1/queues/+/tickets/called")
+        self.assertEqual(self.client.list_subscribed_topics(), [])
+
+    def test_handlers_registered_with_wildcard_topics_still_match(self):
+        """Test that handlers registered directly on wildcard topics receive matching messages"""
+        handler = Mock()
+        self.client.subscribe_to_topic("locations/1/#", handler)
+
+        self._publish("locations/1/queues/5/tickets/called")
+
+        handler.assert_called_once()
@@ -1,9 +1,38 @@
 import requests
 from requests import Response
+from requests.exceptions import JSONDecodeError
 
 from typing import Union
 
 from pyqube.rest.queue_management_manager import QueueManagementManager
+from pyqube.serialization import loads
+
+
+class JSONResponse(Response):
+    """
+    Response whose `json` parses the body's bytes with pyqube's JSON backend (see pyqube.serialization), instead of
+    decoding them into a `str` and parsing it with the standard library.
+    """
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super().json(**kwargs)
+        try:
+            return loads(self.content)
+        except ValueError as e:
+            raise JSONDecodeError(getattr(e, "msg", str(e)), getattr(e, "doc", ""), getattr(e, "pos", 0)) from e
+
+    @classmethod
+    def wrap(cls, response: Response) -> Response:
+        """
+        Returns a JSONResponse with the state (status, headers, body or its unread stream) of a Response returned by
+        requests, which is left as it is. Other objects (e.g. mocks) are returned as they are.
+        """
+        if type(response) is not Response:
+            return response
+        json_response = cls()
+        json_response.__dict__.update(vars(response))
+        return json_response
 
 
 class RestClient:
@@ -14,7 +43,14 @@ class RestClient:
 
     API_BASE_URL = "https://api.qube.q-better.com/en/api/v1"
 
-    def __init__(self, api_key: str, location_id: int, queue_management_manager: object = None, base_url: str = None):
+    def __init__(
+        self,
+        api_key: str,
+        location_id: int,
+        queue_management_manager: object = None,
+        base_url: str = None,
+        session: requests.Session = None
+    ):
         """
         Initializes the Rest Client.
         Args:
@@ -22,6 +58,8 @@ class RestClient:
             location_id (int): Location's id that will be used in requests.
             queue_management_manager (object, optional): Manager used on API Server interactions. Defaults to None.
             base_url (str, optional): Base url used on API interactions . Defaults to API_BASE_URL.
+            session (requests.Session, optional): Session used to make requests, which keeps connections open and can
+                be shared by many clients. Defaults to None, which opens a new connection on each request.
         """
         self.base_url = base_url or self.API_BASE_URL
         self.api_key = api_key
@@ -30,6 +68,12 @@ class RestClient:
         }
         self.location_id = location_id
         self.queue_management_manager = queue_management_manager
+        self.session = session
+
+    @property
+    def http(self):
+        """Object used to make HTTP requests: the client's session or the `requests` module."""
+        return self.session or requests
 
     def get_queue_management_manager(self) -> Union[QueueManagementManager, object]:
         """
@@ -52,8 +96,8 @@ class RestClient:
         Returns:
             Response: Response returned from request.
         """
-        response = requests.get(self.base_url + path, headers=self.headers, params=params, timeout=10)
-        return response
+        response = self.http.get(self.base_url + path, headers=self.headers, params=params, timeout=10)
+        return JSONResponse.wrap(response)
 
     def post_request(self, path: str, params: dict = None, data: dict = None) -> Response:
         """
@@ -65,8 +109,8 @@ class RestClient:
         Returns:
             Response: Response returned from request.
         """
-        response = requests.post(self.base_url + path, headers=self.headers, params=params, data=data, timeout=10)
-        return response
+        response = self.http.post(self.base_url + path, headers=self.headers, params=params, data=data, timeout=10)
+        return JSONResponse.wrap(response)
 
     def put_request(self, path: str, params: dict = None, data: dict = None) -> Response:
         """
@@ -78,20 +122,24 @@ class RestClient:
         Returns:
             Response: Response returned from request.
         """
-        response = requests.put(self.base_url + path, headers=self.headers, params=params, data=data, timeout=10)
-        return response
+        response = self.http.put(self.base_url + path, headers=self.headers, params=params, data=data, timeout=10)
+        return JSONResponse.wrap(response)
 
-    def make_graphql_request(self, data: str = None) -> Response:
+    def make_graphql_request(self, data: str = None, variables: dict = None) -> Response:
         """
         Mas a POST request to GraphQL endpoint. This method can be useful for Managers.
         Args:
             data (dict): Data that will be sent in the body of the request that defines the Response returned from
             GraphQL endpoint.
+            variables (dict, optional): Values of the variables used by the query.
         Returns:
             Response: Response returned from request.
         """
         path = f"/graphql/"
-        response = requests.post(self.base_url + path, headers=self.headers, json={
+        body = {
             "query": data
-        }, timeout=10)
-        return response
+        }
+        if variables is not None:
+            body["variables"] = variables
+        response = self.http.post(self.base_url + path, headers=self.headers, json=body, timeout=10)
+        return JSONResponse.wrap(response)
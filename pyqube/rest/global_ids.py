@@ -0,0 +1,93 @@
+import base64
+import binascii
+from functools import lru_cache
+from typing import (
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+
+QUEUE_RELATIONS = ("location", "schedule")  # Related nodes of a Queue node that are replaced by their ids
+
+
+def encode_global_id(type_name: str, id: int) -> str:
+    """
+    Encodes an id as a relay global id, like the API Server does on its GraphQL endpoint.
+    Args:
+        type_name (str): GraphQL node type name (e.g. "QueueNode").
+        id (int): Database id of the object.
+    Returns:
+        str: Base64 encoded global id.
+    """
+    return base64.b64encode(f"{type_name}:{id}".encode('utf-8')).decode('utf-8')
+
+
+@lru_cache(maxsize=4096)
+def parse_global_id(global_id: str) -> Tuple[str, int]:
+    """
+    Decodes a relay global id into its node type name and database id.
+    Results are memoized, since ids of related nodes (e.g. location and schedule) repeat on almost every node.
+    Args:
+        global_id (str): Base64 encoded global id.
+    Returns:
+        Tuple[str, int]: Node type name and database id.
+    Raises:
+        ValueError: If it is not a valid global id.
+    """
+    try:
+        type_name, _, id = binascii.a2b_base64(global_id).decode('utf-8').rpartition(":")
+        return type_name, int(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid global id: {global_id!r}") from None
+
+
+def decode_global_id(global_id: str) -> int:
+    """
+    Decodes a relay global id into its database id.
+    Args:
+        global_id (str): Base64 encoded global id.
+    Returns:
+        int: Database id.
+    Raises:
+        ValueError: If it is not a valid global id.
+    """
+    return parse_global_id(global_id)[1]
+
+
+def decode_node(node: dict, relations: Iterable[str] = ()) -> dict:
+    """
+    Replaces the global id of a node by its database id, and each related node (e.g. `{"id": "TG9jYXRpb25Ob2RlOjE="}`)
+    by the database id of that node. Fields that were not selected or are null are left as they are.
+    Args:
+        node (dict): Node returned by GraphQL endpoint. It is changed in place.
+        relations (Iterable[str]): Fields of the node with related nodes.
+    Returns:
+        dict: The node with decoded ids.
+    """
+    if "id" in node:
+        node["id"] = decode_global_id(node["id"])
+    for relation in relations:
+        related_node = node.get(relation)
+        if related_node:
+            node[relation] = decode_global_id(related_node["id"])
+    return node
+
+
+def decode_edges(edges: Sequence[dict], field: Optional[str] = None, relations: Iterable[str] = ()) -> List[dict]:
+    """
+    Decodes the ids of the nodes of a page of edges.
+    Args:
+        edges (Sequence[dict]): Edges of a connection returned by GraphQL endpoint. Nodes are changed in place.
+        field (str, optional): Field of each node with the object to decode (e.g. "queue" on `queues_lists_queues`).
+            Defaults to the node itself.
+        relations (Iterable[str]): Fields of the object with related nodes.
+    Returns:
+        List[dict]: Decoded objects, in the order of the edges.
+    """
+    relations = tuple(relations)
+    if field is None:
+        return [decode_node(edge["node"], relations) for edge in edges]
+    return [decode_node(edge["node"][field], relations) for edge in edges]
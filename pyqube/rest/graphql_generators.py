@@ -1,3 +1,14 @@
+import re
+from functools import lru_cache
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+
 class BaseGraphQLGenerator:
     lookup_field = None
     query_structure = """
@@ -58,3 +69,189 @@ class QueuesListGraphQLGenerator(BaseGraphQLGenerator):
     def generate_query_body(cls, **kwargs):
         query_filter = cls.generate_query_filters(**kwargs) if kwargs else ""
         return cls.query_structure % (cls.lookup_field, query_filter, cls.queue_structure)
+
+
+QUEUE_FIELDS = (
+    "id",
+    "tag",
+    "name",
+    "is_active",
+    "created_at",
+    "updated_at",
+    "deleted_at",
+    "allow_priority",
+    "ticket_range_enabled",
+    "min_ticket_number",
+    "max_ticket_number",
+    "ticket_tolerance_enabled",
+    "ticket_tolerance_number",
+    "kpi_wait_count",
+    "kpi_wait_time",
+    "kpi_service_time",
+    "location.id",
+    "schedule.id",
+)
+
+NAME_PATTERN = re.compile(r"^[_A-Za-z][_0-9A-Za-z]*$")
+
+PYTHON_TYPE_TO_GRAPHQL_TYPE = {
+    bool: "Boolean",
+    int: "Int",
+    float: "Float",
+    str: "String",
+}
+
+
+def _validate_name(name: str) -> str:
+    """Raises ValueError if name is not a valid GraphQL name, so that it can't change the structure of a query."""
+    if not NAME_PATTERN.match(name):
+        raise ValueError(f"Invalid GraphQL name: {name!r}")
+    return name
+
+
+def generate_selection_set(fields: Iterable[str]) -> str:
+    """
+    Generates the selection set of given fields, where nested fields are separated by dots (e.g. "queue.location.id").
+    """
+    tree = {}
+    for field in fields:
+        node = tree
+        for name in field.split("."):
+            node = node.setdefault(_validate_name(name), {})
+    return _render_selection_set(tree)
+
+
+def _render_selection_set(tree: dict) -> str:
+    return " ".join(
+        f"{name} {{ {_render_selection_set(children)} }}" if children else name for name, children in tree.items()
+    )
+
+
+@lru_cache(maxsize=256)
+def compile_connection_query(
+    lookup_field: str, variable_definitions: Tuple[Tuple[str, str], ...], fields: Tuple[str, ...]
+) -> str:
+    """
+    Compiles the text of a query that gets one page of a connection, passing every argument as a variable.
+    Text is cached per shape (i.e. connection, variables and fields), so paging doesn't build it again.
+    Args:
+        lookup_field (str): Connection's field.
+        variable_definitions (Tuple[Tuple[str, str]]): Pairs of argument's name and GraphQL type.
+        fields (Tuple[str]): Fields selected from each node.
+    Returns:
+        str: Query text.
+    """
+    definitions = ", ".join(f"${_validate_name(name)}: {type_}" for name, type_ in variable_definitions)
+    arguments = ", ".join(f"{name}: ${name}" for name, _ in variable_definitions)
+    return (
+        f"query{f'({definitions})' if definitions else ''} {{ "
+        f"{_validate_name(lookup_field)}{f'({arguments})' if arguments else ''} {{ "
+        f"pageInfo {{ endCursor hasNextPage }} "
+        f"edges {{ node {{ {generate_selection_set(fields)} }} }} "
+        f"}} }}"
+    )
+
+
+@lru_cache(maxsize=256)
+def compile_batched_connection_query(
+    lookup_field: str, aliases: Tuple[Tuple[str, Tuple[Tuple[str, str], ...]], ...], fields: Tuple[str, ...]
+) -> str:
+    """
+    Compiles the text of a query that gets one page of many lookups of a connection, each under its own alias, so
+    that they are fetched with a single request. Variables of each alias are prefixed by it (e.g. `$alias_first`).
+    Text is cached per shape, like `compile_connection_query`.
+    Args:
+        lookup_field (str): Connection's field.
+        aliases (Tuple[Tuple[str, Tuple[Tuple[str, str]]]]): Pairs of alias and its variable definitions, i.e. pairs
+            of argument's name and GraphQL type.
+        fields (Tuple[str]): Fields selected from each node.
+    Returns:
+        str: Query text.
+    """
+    selection_set = generate_selection_set(fields)
+    definitions = []
+    lookups = []
+    for alias, variable_definitions in aliases:
+        _validate_name(alias)
+        definitions.extend(f"${alias}_{_validate_name(name)}: {type_}" for name, type_ in variable_definitions)
+        arguments = ", ".join(f"{name}: ${alias}_{name}" for name, _ in variable_definitions)
+        lookups.append(
+            f"{alias}: {_validate_name(lookup_field)}{f'({arguments})' if arguments else ''} {{ "
+            f"pageInfo {{ endCursor hasNextPage }} "
+            f"edges {{ node {{ {selection_set} }} }} "
+            f"}}"
+        )
+    definitions = ", ".join(definitions)
+    return f"query{f'({definitions})' if definitions else ''} {{ {' '.join(lookups)} }}"
+
+
+class GraphQLQueryBuilder:
+    """
+    Builds queries that get one page of a connection, selecting only the requested fields of its nodes and sending
+    arguments as GraphQL variables instead of formatting them into the query text.
+    """
+    lookup_field = None
+    argument_types: Dict[str, str] = {}
+    default_fields: Tuple[str, ...] = ()
+
+    @classmethod
+    def get_argument_type(cls, name: str, value) -> str:
+        """
+        Gets the GraphQL type of an argument, from `argument_types` or else from the type of its value.
+        Raises:
+            ValueError: If the type is unknown.
+        """
+        if name in cls.argument_types:
+            return cls.argument_types[name]
+        if type(value) in PYTHON_TYPE_TO_GRAPHQL_TYPE:
+            return PYTHON_TYPE_TO_GRAPHQL_TYPE[type(value)]
+        raise ValueError(f"Unknown GraphQL type of argument {name!r}")
+
+    @classmethod
+    def build(cls, fields: Optional[Sequence[str]] = None, **arguments) -> Tuple[str, dict]:
+        """
+        Builds the query of one page.
+        Args:
+            fields (Sequence[str], optional): Fields selected from each node, where nested fields are separated by dots.
+                Defaults to `default_fields`.
+            **arguments: Arguments of the connection (e.g. `first` and `after`).
+        Returns:
+            Tuple[str, dict]: Query text and its variables.
+        """
+        variable_definitions = tuple((name, cls.get_argument_type(name, value)) for name, value in arguments.items())
+        query = compile_connection_query(cls.lookup_field, variable_definitions, tuple(fields or cls.default_fields))
+        return query, arguments
+
+    @classmethod
+    def build_batch(cls,
+                    arguments_by_alias: Dict[str, dict],
+                    fields: Optional[Sequence[str]] = None) -> Tuple[str, dict]:
+        """
+        Builds the query of one page of many lookups, each under its own alias.
+        Args:
+            arguments_by_alias (Dict[str, dict]): Arguments of the connection (e.g. `first` and `after`) of each alias.
+            fields (Sequence[str], optional): Fields selected from each node, where nested fields are separated by dots.
+                Defaults to `default_fields`.
+        Returns:
+            Tuple[str, dict]: Query text and its variables.
+        """
+        aliases = tuple(
+            (alias, tuple((name, cls.get_argument_type(name, value)) for name, value in arguments.items()))
+            for alias, arguments in arguments_by_alias.items()
+        )
+        variables = {
+            f"{alias}_{name}": value
+            for alias, arguments in arguments_by_alias.items() for name, value in arguments.items()
+        }
+        query = compile_batched_connection_query(cls.lookup_field, aliases, tuple(fields or cls.default_fields))
+        return query, variables
+
+
+class QueuesListQueuesQueryBuilder(GraphQLQueryBuilder):
+    lookup_field = "queues_lists_queues"
+    argument_types = {
+        "queues_list": "ID!",
+        "first": "Int",
+        "after": "String",
+    }
+    default_fields = tuple(f"queue.{field}" for field in QUEUE_FIELDS)
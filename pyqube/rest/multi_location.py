@@ -0,0 +1,307 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from pyqube.rest.clients import RestClient
+from pyqube.rest.queue_management_manager import QueueManagementManager
+from pyqube.rest.sync import QueuesDelta
+from pyqube.types import (
+    Answering,
+    LocationAccessWithCurrentCounter,
+    Queue,
+    Ticket,
+)
+
+
+T = TypeVar("T")
+
+
+class MultiLocationRestClient:
+    """
+    Client class for making requests to many Locations with a single pool of connections to API Server.
+    Per-location RestClients are created on demand and share the same session.
+    """
+
+    API_BASE_URL = RestClient.API_BASE_URL
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = None,
+        pool_maxsize: int = 32,
+        max_workers: int = 8,
+        session: requests.Session = None
+    ):
+        """
+        Initializes the Multi Location Rest Client.
+        Args:
+            api_key (str): API key for client authentication.
+            base_url (str, optional): Base url used on API interactions. Defaults to API_BASE_URL.
+            pool_maxsize (int, optional): Maximum number of connections kept open to API Server. Defaults to 32.
+            max_workers (int, optional): Number of threads used by fan-out operations. Defaults to 8.
+            session (requests.Session, optional): Session shared by every Location. Defaults to a new session with a
+                connection pool of `pool_maxsize` connections.
+        """
+        self.api_key = api_key
+        self.base_url = base_url or self.API_BASE_URL
+        self.max_workers = max_workers
+        self.session = session or self.create_session(pool_maxsize)
+        self._clients: Dict[int, RestClient] = {}
+        self._clients_lock = threading.Lock()
+        self._queue_management_manager = None
+
+    @staticmethod
+    def create_session(pool_maxsize: int) -> requests.Session:
+        """
+        Creates a session whose connection pool keeps up to `pool_maxsize` connections open.
+        Args:
+            pool_maxsize (int): Maximum number of connections kept open per host.
+        Returns:
+            requests.Session: The session.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def for_location(self, location_id: int) -> RestClient:
+        """
+        Returns the RestClient of a Location, which makes its requests through the shared session.
+        Args:
+            location_id (int): Location's id.
+        Returns:
+            RestClient: Client of the Location.
+        """
+        with self._clients_lock:
+            if location_id not in self._clients:
+                self._clients[location_id] = RestClient(
+                    self.api_key, location_id, base_url=self.base_url, session=self.session
+                )
+            return self._clients[location_id]
+
+    def get_queue_management_manager(self) -> "MultiLocationQueueManagementManager":
+        """
+        Returns the Multi Location Queue Management Manager of this client.
+        Returns:
+            MultiLocationQueueManagementManager: Manager that receives the Location's id in every call.
+        """
+        if self._queue_management_manager is None:
+            self._queue_management_manager = MultiLocationQueueManagementManager(self, self.max_workers)
+        return self._queue_management_manager
+
+    def close(self) -> None:
+        """Shuts down fan-out threads and closes the connections of the shared session."""
+        if self._queue_management_manager is not None:
+            self._queue_management_manager.close()
+        self.session.close()
+
+
+class MultiLocationQueueManagementManager:
+    """
+    Manager class that offers the Queue Management methods with the Location's id as an argument of each call, and
+    helpers to run operations across many Locations concurrently.
+    """
+
+    STREAM_BUFFER_SIZE = 16  # Pages buffered by `list_queues_of_locations` before workers wait for the consumer
+
+    def __init__(self, client: MultiLocationRestClient, max_workers: int = 8):
+        """
+        Initializes the Multi Location Queue Management Manager.
+        Args:
+            client (MultiLocationRestClient): Client that gives the RestClient of each Location.
+            max_workers (int, optional): Number of threads used by fan-out operations. Defaults to 8.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool used by fan-out operations, created on first use."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pyqube-rest")
+            return self._executor
+
+    def close(self) -> None:
+        """Shuts down the threads used by fan-out operations."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def for_location(self, location_id: int) -> QueueManagementManager:
+        """
+        Returns the Queue Management Manager of a Location.
+        Args:
+            location_id (int): Location's id.
+        Returns:
+            QueueManagementManager: Manager of the Location.
+        """
+        return self.client.for_location(location_id).get_queue_management_manager()
+
+    def generate_ticket(self, location_id: int, queue: int, priority: bool) -> Ticket:
+        """See QueueManagementManager.generate_ticket."""
+        return self.for_location(location_id).generate_ticket(queue, priority)
+
+    def call_next_ticket_ending_current(self, location_id: int, profile_id: int) -> Answering:
+        """See QueueManagementManager.call_next_ticket_ending_current."""
+        return self.for_location(location_id).call_next_ticket_ending_current(profile_id)
+
+    def set_current_counter(
+        self, location_id: int, location_access_id: int, counter_id: int
+    ) -> LocationAccessWithCurrentCounter:
+        """See QueueManagementManager.set_current_counter."""
+        return self.for_location(location_id).set_current_counter(location_access_id, counter_id)
+
+    def end_answering(self, location_id: int, profile_id: int, answering_id: int) -> Answering:
+        """See QueueManagementManager.end_answering."""
+        return self.for_location(location_id).end_answering(profile_id, answering_id)
+
+    def get_current_answering(self, location_id: int, profile_id: int) -> Optional[Answering]:
+        """See QueueManagementManager.get_current_answering."""
+        return self.for_location(location_id).get_current_answering(profile_id)
+
+    def set_queue_status(self, location_id: int, queue_id: int, is_active: bool) -> Queue:
+        """See QueueManagementManager.set_queue_status."""
+        return self.for_location(location_id).set_queue_status(queue_id, is_active)
+
+    def list_queues(self, location_id: int, page_size: int = 10, **filters) -> Generator[List[Queue], None, None]:
+        """See QueueManagementManager.list_queues."""
+        return self.for_location(location_id).list_queues(page_size, **filters)
+
+    def iter_queues(self, location_id: int, page_size: int = 50, **filters) -> Generator[Queue, None, None]:
+        """See QueueManagementManager.iter_queues."""
+        return self.for_location(location_id).iter_queues(page_size, **filters)
+
+    def list_queues_of_queues_list(self,
+                                   location_id: int,
+                                   queues_list_id: int,
+                                   page_size: int = 10,
+                                   **filters) -> Generator[List[Queue], None, None]:
+        """See QueueManagementManager.list_queues_of_queues_list."""
+        return self.for_location(location_id).list_queues_of_queues_list(queues_list_id, page_size, **filters)
+
+    def iter_queues_of_queues_list(self,
+                                   location_id: int,
+                                   queues_list_id: int,
+                                   page_size: int = 50,
+                                   **filters) -> Generator[Queue, None, None]:
+        """See QueueManagementManager.iter_queues_of_queues_list."""
+        return self.for_location(location_id).iter_queues_of_queues_list(queues_list_id, page_size, **filters)
+
+    def sync_queues(self, location_id: int, page_size: int = 100, full: bool = False) -> QueuesDelta:
+        """See QueueManagementManager.sync_queues."""
+        return self.for_location(location_id).sync_queues(page_size, full)
+
+    def fan_out(
+        self,
+        location_ids: Iterable[int],
+        operation: Callable[[QueueManagementManager], T],
+        return_exceptions: bool = False
+    ) -> Iterator[Tuple[int, T]]:
+        """
+        Runs an operation for many Locations concurrently and yields the results as they complete.
+        Args:
+            location_ids (Iterable[int]): Locations' ids.
+            operation (Callable[[QueueManagementManager], T]): Function that receives the manager of a Location,
+                e.g. `lambda manager: manager.get_current_answering(profile_id)`.
+            return_exceptions (bool, optional): If True, exceptions raised by the operation are yielded as results
+                instead of being raised. Defaults to False.
+        Returns:
+            Iterator[Tuple[int, T]]: Pairs of Location's id and result, in completion order.
+        """
+        futures = {
+            self.executor.submit(operation, self.for_location(location_id)): location_id
+            for location_id in location_ids
+        }
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    yield futures[future], e
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def list_queues_of_locations(self,
+                                 location_ids: Iterable[int],
+                                 page_size: int = 10) -> Generator[Tuple[int, List[Queue]], None, None]:
+        """
+        Lists the queues of many Locations concurrently, streaming each page as soon as it is fetched.
+        Pages of different Locations are interleaved; pages of the same Location keep their order. Fetching stops
+        when the consumer stops iterating.
+        Args:
+            location_ids (Iterable[int]): Locations' ids.
+            page_size (int): Number of Queues per page.
+        Returns:
+            Generator[Tuple[int, List[Queue]]]: Pairs of Location's id and page of Queues.
+        """
+        return self._stream_pages(location_ids, lambda manager: manager.list_queues(page_size))
+
+    def _stream_pages(
+        self,
+        location_ids: Iterable[int],
+        pages: Callable[[QueueManagementManager], Iterable[T]],
+    ) -> Generator[Tuple[int, T], None, None]:
+        """
+        Iterates the pages of many Locations from worker threads and merges them into one stream through a bounded
+        buffer, so that workers wait while the consumer is behind.
+        """
+        buffer = queue.Queue(maxsize=self.STREAM_BUFFER_SIZE)
+        stopped = threading.Event()
+        done = object()
+
+        def put(item) -> bool:
+            while not stopped.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def worker(location_id: int):
+            try:
+                for page in pages(self.for_location(location_id)):
+                    if not put((location_id, page, None)):
+                        return
+            except Exception as e:
+                put((location_id, done, e))
+                return
+            put((location_id, done, None))
+
+        futures = [self.executor.submit(worker, location_id) for location_id in location_ids]
+        pending = len(futures)
+        try:
+            while pending:
+                location_id, page, error = buffer.get()
+                if error is not None:
+                    raise error
+                if page is done:
+                    pending -= 1
+                    continue
+                yield location_id, page
+        finally:
+            stopped.set()
+            for future in futures:
+                future.cancel()
@@ -1,8 +1,16 @@
 from requests import Response
 
-import base64
-from typing import Generator, List, Optional
+import json
+from typing import (
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
 
+from pyqube.decoders import decode, decode_list
 from pyqube.rest.exceptions import (
     AlreadyAnsweringException,
     AnsweringAlreadyProcessedException,
@@ -21,7 +29,12 @@ from pyqube.rest.exceptions import (
     PaymentRequired,
     TicketsLimitReachedException,
 )
-from pyqube.rest.graphql_generators import QueuesListGraphQLGenerator
+from pyqube.rest.global_ids import QUEUE_RELATIONS, decode_edges
+from pyqube.rest.graphql_generators import (
+    QueuesListGraphQLGenerator,
+    QueuesListQueuesQueryBuilder,
+)
+from pyqube.rest.sync import QueuesDelta, QueuesSnapshot
 from pyqube.types import (
     Answering,
     LocationAccessWithCurrentCounter,
@@ -58,6 +71,9 @@ class QueueManagementManager:
     Manager class that offers some methods about Queue management to make requests to API Server through Rest Client.
     """
 
+    MAX_STREAM_PAGE_SIZE = 100  # Upper bound of page size used by streaming iterators
+    MAX_BATCHED_QUEUES_LISTS = 25  # QueuesLists fetched by each GraphQL request of list_queues_of_queues_lists
+
     def __init__(self, client: object):
         """
         Initializes and connects the Queue Management Manager.
@@ -65,6 +81,7 @@ class QueueManagementManager:
             client (RestClient): Client that will expose methods to make requests directly to API Server.
         """
         self.client = client
+        self.queues_snapshot = QueuesSnapshot()
 
     @classmethod
     def _validate_response(cls, response: Response):
@@ -120,7 +137,7 @@ class QueueManagementManager:
 
         self._validate_response(response)
 
-        return Ticket(**response.json())
+        return decode(Ticket, response.json())
 
     def call_next_ticket_ending_current(self, profile_id: int) -> Answering:
         """
@@ -139,7 +156,7 @@ class QueueManagementManager:
         )
         self._validate_response(response)
 
-        return Answering(**response.json())
+        return decode(Answering, response.json())
 
     def set_current_counter(self, location_access_id: int, counter_id: int) -> LocationAccessWithCurrentCounter:
         """
@@ -159,7 +176,7 @@ class QueueManagementManager:
         )
         self._validate_response(response)
 
-        return LocationAccessWithCurrentCounter(**response.json())
+        return decode(LocationAccessWithCurrentCounter, response.json())
 
     def end_answering(self, profile_id: int, answering_id: int) -> Answering:
         """
@@ -175,7 +192,7 @@ class QueueManagementManager:
         )
         self._validate_response(response)
 
-        return Answering(**response.json())
+        return decode(Answering, response.json())
 
     def get_current_answering(self, profile_id: int) -> Optional[Answering]:
         """
@@ -191,7 +208,7 @@ class QueueManagementManager:
         self._validate_response(response)
 
         if response.content.strip():
-            return Answering(**response.json())
+            return decode(Answering, response.json())
         else:
             return None
 
@@ -210,25 +227,24 @@ class QueueManagementManager:
         response = self.client.put_request(f"/locations/{self.client.location_id}/queues/{queue_id}/status/", data=data)
         self._validate_response(response)
 
-        return Queue(**response.json())
+        return decode(Queue, response.json())
 
-    def list_queues(self, page_size: int = 10) -> Generator[List[Queue], None, None]:
+    def _list_queues_data(self, page_size: int, filters: dict) -> Generator[List[dict], None, None]:
         """
-        Lazily fetches queues from the API.
-        List queues using `yield` for efficient processing of paginated API responses.
-        This method retrieves and yields items one at a time, reducing memory usage and
-        improving performance for large datasets.
+        Internal method that lazily fetches pages of Queues from the API, yielding the raw results of each page.
         Args:
             page_size (int): Number of Queues per page.
+            filters (dict): Query parameters used by API Server to filter Queues.
         Returns:
-            Generator[List[Queue]]: Generator that will iterate over pages of Queues.
+            Generator[List[dict]]: Generator that will iterate over pages of Queues' data.
         """
         has_next_page = True
         page = 1
         while has_next_page:
             params = {
                 "page": page,
-                "page_size": page_size
+                "page_size": page_size,
+                **filters
             }
             response = self.client.get_request(f"/locations/{self.client.location_id}/queues/", params=params)
             self._validate_response(response)
@@ -240,25 +256,77 @@ class QueueManagementManager:
             else:
                 has_next_page = False
 
-            yield [Queue(**item) for item in response_data["results"]]
+            yield response_data["results"]
 
-    def list_queues_of_queues_list(self, queues_list_id: int, page_size: int = 10) -> List[Queue]:
+    def list_queues(self, page_size: int = 10, **filters) -> Generator[List[Queue], None, None]:
         """
-        Gets one list of queues that are associated with given QueuesList
+        Lazily fetches queues from the API.
+        List queues using `yield` for efficient processing of paginated API responses.
+        This method retrieves and yields items one at a time, reducing memory usage and
+        improving performance for large datasets.
+        Args:
+            page_size (int): Number of Queues per page.
+            **filters: Query parameters used by API Server to filter Queues (e.g. `is_active=True`).
+        Returns:
+            Generator[List[Queue]]: Generator that will iterate over pages of Queues.
+        """
+        for results in self._list_queues_data(page_size, filters):
+            yield decode_list(Queue, results)
+
+    def iter_queues(self, page_size: int = 50, **filters) -> Generator[Queue, None, None]:
+        """
+        Lazily fetches queues from the API, yielding one Queue at a time.
+        A page is only requested when the previous one was consumed, so no more pages are fetched once the consumer
+        stops (e.g. on `break` or with `itertools.islice`). Page size is capped at MAX_STREAM_PAGE_SIZE, so at most one
+        page of that size is held in memory regardless of the requested page size.
+        Args:
+            page_size (int): Number of Queues per page.
+            **filters: Query parameters used by API Server to filter Queues (e.g. `is_active=True`).
+        Returns:
+            Generator[Queue]: Generator that will iterate over Queues.
+        """
+        for results in self._list_queues_data(min(page_size, self.MAX_STREAM_PAGE_SIZE), filters):
+            for item in results:
+                yield decode(Queue, item)
+
+    def sync_queues(self, page_size: int = 100, full: bool = False) -> QueuesDelta:
+        """
+        Synchronizes the local snapshot of Queues (`queues_snapshot`) with API Server, fetching only the Queues updated
+        since the last synchronization. The first call fetches every Queue.
+        Every page is fetched before the snapshot is updated, so if a request fails, the snapshot is left unchanged
+        and the next synchronization fetches the same Queues again.
+        Args:
+            page_size (int): Number of Queues per page.
+            full (bool): If True, every Queue is fetched and Queues missing from the listing are reported as deleted,
+                which detects deletions even if API Server doesn't list soft deleted Queues.
+        Returns:
+            QueuesDelta: Queues added, changed and deleted since the last synchronization.
+        """
+        if full:
+            queues = self.iter_queues(page_size, ordering="updated_at")
+        else:
+            queues = self.iter_queues(page_size, **self.queues_snapshot.get_filters())
+        return self.queues_snapshot.apply(queues, complete=full)
+
+    def _list_queues_of_queues_list_data(self, queues_list_id: int, page_size: int,
+                                         filters: dict) -> Generator[List[dict], None, None]:
+        """
+        Internal method that lazily fetches pages of Queues associated with given QueuesList through GraphQL
+        endpoint, yielding the Queue nodes of each page with decoded ids.
         Args:
             queues_list_id (int): QueuesList's id that have queues associated.
             page_size (int): Number of Queues per page.
+            filters (dict): Arguments used by GraphQL endpoint to filter Queues.
         Returns:
-            List[Queue]: List of Queues associated with given QueuesList.
+            Generator[List[dict]]: Generator that will iterate over pages of Queues' nodes.
         """
         has_next_page = True
         after = "\"\""
+        filters = {key: json.dumps(value) for key, value in filters.items()}
 
         while has_next_page:
-            list_of_queues_objects = list()
-
             query = QueuesListGraphQLGenerator.generate_query_body(
-                queues_list=queues_list_id, first=page_size, after=after
+                queues_list=queues_list_id, first=page_size, after=after, **filters
             )
 
             response = self.client.make_graphql_request(query)
@@ -266,18 +334,124 @@ class QueueManagementManager:
 
             response_data = response.json()
 
-            list_of_queues = [edge["node"]["queue"] for edge in response_data["data"]["queues_lists_queues"]["edges"]]
-
-            for queue in list_of_queues:
-                queue["id"] = int(base64.b64decode(queue["id"]).decode('utf-8').split(":")[1])
-                queue["location"] = int(base64.b64decode(queue["location"]["id"]).decode('utf-8').split(":")[1])
-                if queue.get("schedule"):
-                    queue["schedule"] = int(base64.b64decode(queue["schedule"]["id"]).decode('utf-8').split(":")[1])
-                list_of_queues_objects.append(Queue(**queue))
+            yield decode_edges(response_data["data"]["queues_lists_queues"]["edges"], "queue", QUEUE_RELATIONS)
 
             if response_data['data']['queues_lists_queues']['pageInfo']['hasNextPage']:
                 after = f"\"{response_data['data']['queues_lists_queues']['pageInfo']['endCursor']}\""
             else:
                 has_next_page = False
 
-            yield list_of_queues_objects
+    def list_queues_of_queues_list(self, queues_list_id: int, page_size: int = 10, **filters) -> List[Queue]:
+        """
+        Gets one list of queues that are associated with given QueuesList
+        Args:
+            queues_list_id (int): QueuesList's id that have queues associated.
+            page_size (int): Number of Queues per page.
+            **filters: Arguments used by GraphQL endpoint to filter Queues.
+        Returns:
+            List[Queue]: List of Queues associated with given QueuesList.
+        """
+        for list_of_queues in self._list_queues_of_queues_list_data(queues_list_id, page_size, filters):
+            yield decode_list(Queue, list_of_queues)
+
+    def list_queues_of_queues_list_fields(self,
+                                          queues_list_id: int,
+                                          fields: Sequence[str],
+                                          page_size: int = 10,
+                                          **filters) -> Generator[List[dict], None, None]:
+        """
+        Gets pages of Queues associated with given QueuesList with only the given fields, so that nothing else is
+        transferred. Arguments are sent as GraphQL variables and the query text is built once per set of fields.
+        Args:
+            queues_list_id (int): QueuesList's id that have queues associated.
+            fields (Sequence[str]): Queue's fields, where nested fields are separated by dots (e.g. "location.id").
+            page_size (int): Number of Queues per page.
+            **filters: Arguments used by GraphQL endpoint to filter Queues.
+        Returns:
+            Generator[List[dict]]: Generator that will iterate over pages of Queues with the given fields, where ids
+            of Queue, location and schedule are database ids.
+        """
+        queue_fields = [f"queue.{field}" for field in fields]
+        after = None
+
+        while True:
+            query, variables = QueuesListQueuesQueryBuilder.build(
+                queue_fields, queues_list=queues_list_id, first=page_size, after=after, **filters
+            )
+
+            response = self.client.make_graphql_request(query, variables)
+            self._validate_response(response)
+
+            connection = response.json()["data"]["queues_lists_queues"]
+
+            yield decode_edges(connection["edges"], "queue", QUEUE_RELATIONS)
+
+            if not connection["pageInfo"]["hasNextPage"]:
+                break
+            after = connection["pageInfo"]["endCursor"]
+
+    def list_queues_of_queues_lists(self,
+                                    queues_lists_ids: Iterable[int],
+                                    page_size: int = 10,
+                                    **filters) -> Generator[Dict[int, List[Queue]], None, None]:
+        """
+        Gets the queues associated with many QueuesLists, paging through all of them together. Each round fetches the
+        next page of every QueuesList that still has pages in a single GraphQL request (or one request per
+        MAX_BATCHED_QUEUES_LISTS QueuesLists), instead of one request per QueuesList and page.
+        Args:
+            queues_lists_ids (Iterable[int]): QueuesLists' ids that have queues associated.
+            page_size (int): Number of Queues per page.
+            **filters: Arguments used by GraphQL endpoint to filter Queues.
+        Returns:
+            Generator[Dict[int, List[Queue]]]: Generator that will iterate over rounds, each with the next page of
+            Queues of every QueuesList that still had pages.
+        """
+        cursors = {queues_list_id: None for queues_list_id in queues_lists_ids}
+
+        while cursors:
+            page = {}
+            pending = list(cursors)
+            for start in range(0, len(pending), self.MAX_BATCHED_QUEUES_LISTS):
+                aliases = {
+                    f"queues_list_{index}": queues_list_id
+                    for index, queues_list_id in enumerate(pending[start:start + self.MAX_BATCHED_QUEUES_LISTS])
+                }
+                query, variables = QueuesListQueuesQueryBuilder.build_batch({
+                    alias: dict(queues_list=queues_list_id, first=page_size, after=cursors[queues_list_id], **filters)
+                    for alias, queues_list_id in aliases.items()
+                })
+
+                response = self.client.make_graphql_request(query, variables)
+                self._validate_response(response)
+
+                response_data = response.json()["data"]
+                for alias, queues_list_id in aliases.items():
+                    connection = response_data[alias]
+                    page[queues_list_id] = decode_list(
+                        Queue, decode_edges(connection["edges"], "queue", QUEUE_RELATIONS)
+                    )
+                    if connection["pageInfo"]["hasNextPage"]:
+                        cursors[queues_list_id] = connection["pageInfo"]["endCursor"]
+                    else:
+                        del cursors[queues_list_id]
+
+            yield page
+
+    def iter_queues_of_queues_list(self, queues_list_id: int, page_size: int = 50,
+                                   **filters) -> Generator[Queue, None, None]:
+        """
+        Lazily fetches queues associated with given QueuesList, yielding one Queue at a time.
+        A page is only requested when the previous one was consumed, so no more pages are fetched once the consumer
+        stops. Page size is capped at MAX_STREAM_PAGE_SIZE, so at most one page of that size is held in memory.
+        Args:
+            queues_list_id (int): QueuesList's id that have queues associated.
+            page_size (int): Number of Queues per page.
+            **filters: Arguments used by GraphQL endpoint to filter Queues.
+        Returns:
+            Generator[Queue]: Generator that will iterate over Queues associated with given QueuesList.
+        """
+        for list_of_queues in self._list_queues_of_queues_list_data(
+            queues_list_id, min(page_size, self.MAX_STREAM_PAGE_SIZE), filters
+        ):
+            for queue in list_of_queues:
+                yield decode(Queue, queue)
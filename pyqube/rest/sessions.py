@@ -0,0 +1,207 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from pyqube.types import Answering, AnsweringTicket
+
+
+@dataclass
+class CounterSessionStats:
+    """
+    Counters of a CounterSession.
+    """
+    cache_hits: int = 0  # Reads served without HTTP requests
+    refreshes: int = 0  # Requests of the current answering made because the cache was stale
+    invalidations: int = 0  # Times the cache was marked stale by events or reconnections
+
+
+class CounterSession:
+    """
+    Session of a profile working at a counter, which keeps its current Answering in a local cache, so that reading it
+    (e.g. to show the ticket currently being served) doesn't need HTTP requests.
+    The cache is updated with the responses of the calls made through the session and, once attached to a client,
+    with the tickets called at the counter: calls made elsewhere (e.g. on another device) mark the cache stale, and so
+    do reconnections to the broker, since events may have been lost. Only then is the current answering requested
+    again, on the next read.
+    """
+
+    def __init__(
+        self,
+        manager,
+        profile_id: int,
+        counter_id: int,
+        location_access_id: Optional[int] = None,
+        max_age: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initializes the Counter Session. The cache starts stale, so the first read requests the current answering.
+
+        Args:
+            manager (QueueManagementManager): Manager used to make the requests.
+            profile_id (int): Profile's id.
+            counter_id (int): Counter's id.
+            location_access_id (int, optional): Profile's LocationAccess id, needed to set the current counter.
+            max_age (float, optional): Seconds after which a cached answering is requested again, as a safety net.
+                Defaults to never.
+            clock (Callable[[], float], optional): Monotonic clock used for `max_age`, in seconds.
+        """
+        self.manager = manager
+        self.profile_id = profile_id
+        self.counter_id = counter_id
+        self.location_access_id = location_access_id
+        self.max_age = max_age
+        self.stats = CounterSessionStats()
+        self.last_called_ticket: Optional[AnsweringTicket] = None  # Last ticket called at the counter, from events
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._answering: Optional[Answering] = None
+        self._stale = True
+        self._cached_at: Optional[float] = None
+        self._invalidations = 0  # Detects invalidations made while a request was in flight
+        self._events = None
+        self._ticket_called_handler = None  # Handler of the tickets called at the counter, as registered
+
+    @property
+    def is_stale(self) -> bool:
+        """True if the next read of the current answering will request it."""
+        with self._lock:
+            if self._stale:
+                return True
+            return self.max_age is not None and self._clock() - self._cached_at >= self.max_age
+
+    def invalidate(self) -> None:
+        """Marks the cache stale, so that the current answering is requested on the next read."""
+        with self._lock:
+            self._stale = True
+            self._invalidations += 1
+            self.stats.invalidations += 1
+
+    def _cache(self, answering: Optional[Answering], invalidations: Optional[int] = None) -> None:
+        """Caches an answering, unless the cache was invalidated since `invalidations` was read."""
+        with self._lock:
+            self._answering = answering
+            if invalidations is None or invalidations == self._invalidations:
+                self._stale = False
+                self._cached_at = self._clock()
+
+    @property
+    def current_answering(self) -> Optional[Answering]:
+        """
+        The current Answering of the profile, or None if it isn't answering. It is served from the cache, unless the
+        cache is stale.
+        """
+        with self._lock:
+            if not self.is_stale:
+                self.stats.cache_hits += 1
+                return self._answering
+        return self.refresh()
+
+    def refresh(self) -> Optional[Answering]:
+        """
+        Requests the current answering of the profile and caches it. The lock isn't held during the request, so event
+        handlers are never blocked by it.
+
+        Returns:
+            Optional[Answering]: The current Answering, or None if the profile isn't answering.
+        """
+        with self._lock:
+            invalidations = self._invalidations
+            self.stats.refreshes += 1
+        answering = self.manager.get_current_answering(self.profile_id)
+        self._cache(answering, invalidations)
+        return answering
+
+    def set_counter(self, counter_id: int):
+        """
+        Sets the counter of the session as the current counter of the profile's LocationAccess. If the session is
+        attached to a client, its handler of the previous counter is removed (other handlers of that counter are
+        kept) and tickets called at the new counter are handled instead.
+
+        Args:
+            counter_id (int): Counter's id.
+
+        Returns:
+            LocationAccessWithCurrentCounter: The updated LocationAccess object.
+
+        Raises:
+            ValueError: If the session has no LocationAccess id.
+        """
+        if self.location_access_id is None:
+            raise ValueError("A LocationAccess id is needed to set the current counter.")
+        location_access = self.manager.set_current_counter(self.location_access_id, counter_id)
+        with self._lock:
+            if counter_id != self.counter_id:
+                if self._events is not None:
+                    self._events.remove_handler(
+                        f"locations/{self._events.location_id}/counters/{self.counter_id}/tickets/called",
+                        self._ticket_called_handler,
+                    )
+                    self._ticket_called_handler = self._events.on_ticket_called(counter_id=counter_id)(
+                        self._on_ticket_called
+                    )
+                self.counter_id = counter_id
+                self.last_called_ticket = None
+        return location_access
+
+    def call_next_ticket(self) -> Answering:
+        """
+        Calls the next ticket, ending the current answering, and caches the new Answering.
+
+        Returns:
+            Answering: The created Answering object.
+        """
+        answering = self.manager.call_next_ticket_ending_current(self.profile_id)
+        self._cache(answering)
+        return answering
+
+    def end_answering(self) -> Optional[Answering]:
+        """
+        Ends the current answering, if any. The profile is no longer answering afterwards.
+
+        Returns:
+            Optional[Answering]: The ended Answering object, or None if the profile wasn't answering.
+        """
+        current_answering = self.current_answering
+        if current_answering is None:
+            return None
+        answering = self.manager.end_answering(self.profile_id, current_answering.id)
+        self._cache(None)
+        return answering
+
+    def attach(self, events) -> "CounterSession":
+        """
+        Registers the handlers that keep the cache up to date: tickets called at the counter and connection gaps,
+        through `events` or, for the events of a shared connection (LocationEvents), through its connection.
+
+        Args:
+            events (TicketHandler): Client (e.g. MQTTClient or LocationEvents) that receives the events of a location.
+
+        Returns:
+            CounterSession: The session.
+
+        Raises:
+            ValueError: If connection gaps can't be handled through `events`, since the cache would never be marked
+                stale after events are lost.
+        """
+        gap_source = events if hasattr(events, "on_connection_gap") else getattr(events, "connection", None)
+        if not hasattr(gap_source, "on_connection_gap"):
+            raise ValueError("The session needs a client that notifies connection gaps.")
+        self._events = events
+        self._ticket_called_handler = events.on_ticket_called(counter_id=self.counter_id)(self._on_ticket_called)
+        gap_source.on_connection_gap()(self._on_connection_gap)
+        return self
+
+    def _on_ticket_called(self, answering_ticket: AnsweringTicket) -> None:
+        """Marks the cache stale when a ticket is called at the counter by another Answering than the cached one."""
+        with self._lock:
+            if answering_ticket.counter != self.counter_id:
+                return
+            self.last_called_ticket = answering_ticket
+            if not self._stale and (self._answering is None or self._answering.id != answering_ticket.answering):
+                self.invalidate()
+
+    def _on_connection_gap(self, gap) -> None:
+        """Marks the cache stale, since calls may have been missed while disconnected."""
+        self.invalidate()
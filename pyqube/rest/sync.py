@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Dict, Iterable, List, Optional
+
+from pyqube.types import Queue
+
+
+def _as_utc(dt: datetime) -> datetime:
+    """Returns a timezone-aware datetime, considering naive datetimes to be in UTC."""
+    return dt.replace(tzinfo=UTC) if dt.tzinfo is None else dt
+
+
+@dataclass
+class QueuesDelta:
+    """
+    Changes of Queues found by one synchronization.
+    """
+    added: List[Queue] = field(default_factory=list)
+    changed: List[Queue] = field(default_factory=list)
+    deleted: List[Queue] = field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        """True if nothing changed."""
+        return not (self.added or self.changed or self.deleted)
+
+
+class QueuesSnapshot:
+    """
+    Local copy of the Queues of a Location, updated incrementally with the Queues changed since its watermark (the
+    most recent `updated_at` seen).
+    Incremental synchronizations only detect deleted Queues if API Server lists soft deleted Queues (with `deleted_at`
+    set) among the updated ones. Otherwise, a complete listing (see `apply`) detects them from the missing ids.
+    """
+
+    def __init__(self):
+        self.queues: Dict[int, Queue] = {}
+        self.watermark: Optional[datetime] = None
+
+    def get_filters(self) -> dict:
+        """
+        Returns the query parameters that make API Server return only Queues updated since the watermark, oldest
+        first. Queues updated at the watermark itself are requested again, since others may share that timestamp.
+        Ordering by `updated_at` keeps the watermark correct even if a synchronization stops halfway.
+        Returns:
+            dict: Query parameters.
+        """
+        filters = {
+            "ordering": "updated_at",
+        }
+        if self.watermark is not None:
+            filters["updated_at__gte"] = self.watermark.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        return filters
+
+    def apply(self, queues: Iterable[Queue], complete: bool = False) -> QueuesDelta:
+        """
+        Applies fetched Queues to the snapshot. Every Queue is fetched (e.g. every page) before the snapshot and its
+        watermark are replaced, at once, so a synchronization that fails halfway leaves them unchanged.
+        Args:
+            queues (Iterable[Queue]): Queues updated since the watermark.
+            complete (bool): If True, `queues` is a listing of every Queue of the Location, and Queues of the
+                snapshot missing from it are reported as deleted.
+        Returns:
+            QueuesDelta: Queues added, changed and deleted (i.e. with `deleted_at` set, or missing from a complete
+                listing) since the last synchronization.
+        """
+        queues = list(queues)
+        snapshot = dict(self.queues)
+        watermark = self.watermark
+        delta = QueuesDelta()
+        for queue in queues:
+            updated_at = _as_utc(queue.updated_at)
+            if watermark is None or updated_at > watermark:
+                watermark = updated_at
+
+            previous = snapshot.get(queue.id)
+            if queue.deleted_at:
+                if previous is not None:
+                    del snapshot[queue.id]
+                    delta.deleted.append(queue)
+            elif previous is None:
+                snapshot[queue.id] = queue
+                delta.added.append(queue)
+            elif previous != queue:
+                snapshot[queue.id] = queue
+                delta.changed.append(queue)
+
+        if complete:
+            listed_ids = {queue.id for queue in queues}
+            for queue_id in [queue_id for queue_id in snapshot if queue_id not in listed_ids]:
+                delta.deleted.append(snapshot.pop(queue_id))
+
+        self.queues, self.watermark = snapshot, watermark
+        return delta
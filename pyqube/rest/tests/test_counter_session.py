@@ -0,0 +1,211 @@
+import json
+import unittest
+from unittest.mock import Mock, patch
+
+from pyqube.events.clients import MQTTClient
+from pyqube.events.handlers import TicketHandler
+from pyqube.events.multiplexing import LocationEvents
+from pyqube.rest.clients import RestClient
+from pyqube.rest.sessions import CounterSession
+from pyqube.testing.mqtt_broker import FakeMQTTBroker
+from pyqube.testing.rest_server import MockQubeServer
+
+
+class ConcreteHandler(TicketHandler):
+
+    def __init__(self):
+        super().__init__()
+        self.location_id = 1
+        self.message_handlers = {}
+        self.connection_gap_handlers = []
+
+    def subscribe_to_topic(self, topic: str, handler: Mock):
+        self.message_handlers.setdefault(topic, []).append(handler)
+
+    def remove_handler(self, topic: str, handler: Mock):
+        self.message_handlers[topic].remove(handler)
+        if not self.message_handlers[topic]:
+            del self.message_handlers[topic]
+
+    def on_connection_gap(self):
+
+        def decorator(func):
+            self.connection_gap_handlers.append(func)
+            return func
+
+        return decorator
+
+    def publish(self, topic: str, payload: dict):
+        for handler in self.message_handlers.get(topic, []):
+            handler(json.dumps(payload).encode('utf-8'))
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCounterSession(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockQubeServer().start()
+        self.addCleanup(self.server.stop)
+        self.manager = RestClient("api_key", 1, base_url=self.server.base_url).get_queue_management_manager()
+        self.events = ConcreteHandler()
+        self.clock = FakeClock()
+        self.session = CounterSession(self.manager, profile_id=1, counter_id=1, location_access_id=1, clock=self.clock)
+
+    def publish_called_ticket(self, counter_id: int, answering_id: int):
+        self.events.publish(
+            f"locations/1/counters/{counter_id}/tickets/called", {
+                "id": 1,
+                "answering": answering_id,
+                "priority": False,
+                "printed_tag": "A",
+                "printed_number": "001",
+                "number": 1,
+                "queue": 1,
+                "counter": counter_id,
+                "queue_tag": "Q1",
+                "counter_tag": f"C{counter_id}",
+                "created_at": "2024-01-01T10:00:00Z",
+            }
+        )
+
+    def test_first_read_requests_current_answering(self):
+        """Test that the cache starts stale and the first read fills it"""
+        self.assertTrue(self.session.is_stale)
+        self.assertIsNone(self.session.current_answering)
+        self.assertEqual(self.server.request_count, 1)
+
+        self.assertIsNone(self.session.current_answering)
+        self.assertEqual(self.server.request_count, 1)
+        self.assertEqual(self.session.stats.cache_hits, 1)
+
+    def test_reads_after_call_are_served_from_cache(self):
+        """Test that the Answering returned by calling the next ticket is served without requests"""
+        answering = self.session.call_next_ticket()
+        request_count = self.server.request_count
+
+        for _ in range(10):
+            self.assertEqual(self.session.current_answering, answering)
+        self.assertEqual(self.server.request_count, request_count)
+
+    def test_end_answering_clears_cache(self):
+        """Test that ending the current answering leaves the session without one"""
+        answering = self.session.call_next_ticket()
+
+        ended_answering = self.session.end_answering()
+
+        self.assertEqual(ended_answering.id, answering.id)
+        self.assertIsNotNone(ended_answering.finished_at)
+        self.assertIsNone(self.session.current_answering)
+        self.assertIsNone(self.session.end_answering())
+
+    def test_own_call_event_keeps_cache(self):
+        """Test that the event of the cached Answering doesn't invalidate the cache"""
+        self.session.attach(self.events)
+        answering = self.session.call_next_ticket()
+
+        self.publish_called_ticket(1, answering.id)
+
+        self.assertFalse(self.session.is_stale)
+        self.assertEqual(self.session.last_called_ticket.answering, answering.id)
+
+    def test_call_made_elsewhere_invalidates_cache(self):
+        """Test that a ticket called at the counter by another Answering makes the next read request it"""
+        self.session.attach(self.events)
+        self.session.call_next_ticket()
+        other_answering = self.server.build_answering(1, 1)
+
+        self.publish_called_ticket(1, other_answering["id"])
+
+        self.assertTrue(self.session.is_stale)
+        self.assertEqual(self.session.current_answering.id, other_answering["id"])
+        self.assertEqual(self.session.stats.refreshes, 1)
+
+    def test_connection_gap_invalidates_cache(self):
+        """Test that reconnections make the next read request the current answering"""
+        self.session.attach(self.events)
+        self.session.call_next_ticket()
+
+        for handler in self.events.connection_gap_handlers:
+            handler(Mock())
+
+        self.assertTrue(self.session.is_stale)
+
+    def test_max_age(self):
+        """Test that the cached answering is requested again after its maximum age"""
+        session = CounterSession(self.manager, profile_id=1, counter_id=1, max_age=30, clock=self.clock)
+        session.call_next_ticket()
+
+        self.clock.now = 29
+        self.assertFalse(session.is_stale)
+        self.clock.now = 30
+        self.assertTrue(session.is_stale)
+
+    def test_set_counter_handles_events_of_new_counter(self):
+        """Test that the session follows the events of the new counter"""
+        self.session.attach(self.events)
+        location_access = self.session.set_counter(2)
+        self.session.call_next_ticket()
+
+        self.assertEqual(location_access.current_counter.id, 2)
+        self.assertEqual(self.session.counter_id, 2)
+        self.assertEqual(list(self.events.message_handlers), ["locations/1/counters/2/tickets/called"])
+        self.publish_called_ticket(1, 999)
+        self.assertFalse(self.session.is_stale)
+        self.publish_called_ticket(2, 999)
+        self.assertTrue(self.session.is_stale)
+
+    def test_set_counter_keeps_other_handlers_of_previous_counter(self):
+        """Test that changing the counter only removes the session's handler of the previous counter"""
+        broker = FakeMQTTBroker()
+        with patch('paho.mqtt.client.Client', broker.create_client):
+            client = MQTTClient(api_key='testapikey', location_id=1)
+        application_handler = Mock(__name__="application_handler")
+        client.on_ticket_called(counter_id=1)(application_handler)
+        self.session.attach(client)
+
+        self.session.set_counter(2)
+
+        topic = "locations/1/counters/1/tickets/called"
+        self.assertEqual(len(client.message_handlers[topic]), 1)
+        self.assertIn(topic, client.client.subscriptions)
+        self.assertIn("locations/1/counters/2/tickets/called", client.client.subscriptions)
+
+        self.session.set_counter(1)
+        self.session.set_counter(3)
+        self.assertEqual(len(client.message_handlers[topic]), 1)
+        self.assertNotIn("locations/1/counters/2/tickets/called", client.client.subscriptions)
+
+    def test_set_counter_without_location_access(self):
+        """Test that setting the counter needs the LocationAccess id"""
+        session = CounterSession(self.manager, profile_id=1, counter_id=1)
+
+        with self.assertRaises(ValueError):
+            session.set_counter(2)
+
+    def test_attach_to_location_events(self):
+        """Test that a session attached to the events of a shared connection handles the gaps of the connection"""
+        connection = ConcreteHandler()
+        connection.wildcard_subscriptions = False
+        self.session.attach(LocationEvents(connection, 1))
+        self.session.call_next_ticket()
+
+        self.assertIn("locations/1/counters/1/tickets/called", connection.message_handlers)
+        for handler in connection.connection_gap_handlers:
+            handler(Mock())
+        self.assertTrue(self.session.is_stale)
+
+    def test_attach_without_connection_gaps(self):
+        """Test that a session can't be attached to a client that doesn't notify connection gaps"""
+        events = Mock(spec=TicketHandler)
+
+        with self.assertRaises(ValueError):
+            self.session.attach(events)
+        events.on_ticket_called.assert_not_called()
@@ -0,0 +1,82 @@
+import unittest
+
+from pyqube.rest.global_ids import (
+    QUEUE_RELATIONS,
+    decode_edges,
+    decode_global_id,
+    decode_node,
+    encode_global_id,
+    parse_global_id,
+)
+
+
+class TestGlobalIds(unittest.TestCase):
+
+    def test_encode_and_decode_global_id(self):
+        """Test that decoding an encoded global id gives back its type name and id"""
+        global_id = encode_global_id("QueueNode", 42)
+
+        self.assertEqual(global_id, "UXVldWVOb2RlOjQy")
+        self.assertEqual(parse_global_id(global_id), ("QueueNode", 42))
+        self.assertEqual(decode_global_id(global_id), 42)
+
+    def test_decode_global_id_is_memoized(self):
+        """Test that repeated global ids are only decoded once"""
+        parse_global_id.cache_clear()
+        global_id = encode_global_id("LocationNode", 1)
+
+        for _ in range(10):
+            decode_global_id(global_id)
+
+        self.assertEqual(parse_global_id.cache_info().misses, 1)
+        self.assertEqual(parse_global_id.cache_info().hits, 9)
+
+    def test_decode_invalid_global_id(self):
+        """Test that invalid global ids raise ValueError"""
+        for global_id in ("not base64!", encode_global_id("QueueNode", "abc"), "gA=="):
+            with self.assertRaises(ValueError):
+                decode_global_id(global_id)
+
+    def test_decode_node_with_relations(self):
+        """Test that ids of the node and its related nodes are decoded in place, skipping missing and null ones"""
+        node = {
+            "id": encode_global_id("QueueNode", 3),
+            "location": {
+                "id": encode_global_id("LocationNode", 1)
+            },
+            "schedule": None,
+        }
+
+        decoded_node = decode_node(node, QUEUE_RELATIONS)
+
+        self.assertIs(decoded_node, node)
+        self.assertEqual(node, {
+            "id": 3,
+            "location": 1,
+            "schedule": None,
+        })
+        self.assertEqual(decode_node({"tag": "A"}, QUEUE_RELATIONS), {"tag": "A"})
+
+    def test_decode_edges(self):
+        """Test that the objects of a page of edges are decoded in order"""
+        edges = [{
+            "node": {
+                "queue": {
+                    "id": encode_global_id("QueueNode", queue_id),
+                    "location": {
+                        "id": encode_global_id("LocationNode", 1)
+                    },
+                }
+            }
+        } for queue_id in (5, 6)]
+
+        queues = decode_edges(edges, "queue", QUEUE_RELATIONS)
+
+        self.assertEqual(queues, [{
+            "id": 5,
+            "location": 1
+        }, {
+            "id": 6,
+            "location": 1
+        }])
+        self.assertEqual(decode_edges([{"node": {"id": encode_global_id("QueueNode", 7)}}]), [{"id": 7}])
@@ -0,0 +1,61 @@
+import unittest
+
+from pyqube.rest.graphql_generators import (
+    QueuesListQueuesQueryBuilder,
+    compile_connection_query,
+    generate_selection_set,
+)
+
+
+class TestGraphQLQueryBuilder(unittest.TestCase):
+
+    def test_generate_selection_set_with_nested_fields(self):
+        """Test that dotted fields are grouped into nested selection sets"""
+        selection_set = generate_selection_set(["queue.id", "queue.tag", "queue.location.id"])
+
+        self.assertEqual(selection_set, "queue { id tag location { id } }")
+
+    def test_build_sends_arguments_as_variables(self):
+        """Test that arguments are declared as variables instead of being formatted into the query"""
+        query, variables = QueuesListQueuesQueryBuilder.build(
+            ["queue.id"], queues_list=1, first=10, after=None, is_active=True
+        )
+
+        self.assertEqual(
+            query, "query($queues_list: ID!, $first: Int, $after: String, $is_active: Boolean) { "
+            "queues_lists_queues(queues_list: $queues_list, first: $first, after: $after, is_active: $is_active) { "
+            "pageInfo { endCursor hasNextPage } edges { node { queue { id } } } } }"
+        )
+        self.assertEqual(variables, {
+            "queues_list": 1,
+            "first": 10,
+            "after": None,
+            "is_active": True,
+        })
+
+    def test_build_with_default_fields(self):
+        """Test that every Queue field is selected when fields are not given"""
+        query, _ = QueuesListQueuesQueryBuilder.build(queues_list=1)
+
+        self.assertIn("queue { id tag name is_active", query)
+        self.assertIn("location { id } schedule { id } }", query)
+
+    def test_build_caches_query_per_shape(self):
+        """Test that query text is compiled once for pages with the same shape"""
+        compile_connection_query.cache_clear()
+
+        first_query, _ = QueuesListQueuesQueryBuilder.build(["queue.id"], queues_list=1, first=10, after=None)
+        second_query, _ = QueuesListQueuesQueryBuilder.build(["queue.id"], queues_list=1, first=10, after="cursor")
+
+        self.assertIs(first_query, second_query)
+        self.assertEqual(compile_connection_query.cache_info().misses, 1)
+
+    def test_build_with_invalid_field(self):
+        """Test that fields can't change the structure of the query"""
+        with self.assertRaises(ValueError):
+            QueuesListQueuesQueryBuilder.build(["queue.id } }"], queues_list=1)
+
+    def test_build_with_argument_of_unknown_type(self):
+        """Test that arguments whose GraphQL type can't be known are refused"""
+        with self.assertRaises(ValueError):
+            QueuesListQueuesQueryBuilder.build(queues_list=1, tag=None)
@@ -0,0 +1,60 @@
+import unittest
+from itertools import islice
+from unittest.mock import patch
+
+from pyqube.rest.clients import RestClient
+from pyqube.testing.rest_server import MockQubeServer
+from pyqube.types import Queue
+
+
+class TestIterQueues(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockQubeServer(queues_count=45).start()
+        self.addCleanup(self.server.stop)
+        self.qube_rest_client = RestClient("api_key", 1, base_url=self.server.base_url)
+        self.manager = self.qube_rest_client.get_queue_management_manager()
+
+    def test_iter_queues_yields_every_queue(self):
+        """Test that iter_queues yields Queues one at a time across pages"""
+        queues = list(self.manager.iter_queues(page_size=10))
+
+        self.assertTrue(all(isinstance(queue, Queue) for queue in queues))
+        self.assertEqual([queue.id for queue in queues], list(range(1, 46)))
+        self.assertEqual(self.server.request_count, 5)
+
+    def test_iter_queues_stops_fetching_when_consumer_stops(self):
+        """Test that no more pages are fetched after the consumer stops"""
+        queues = list(islice(self.manager.iter_queues(page_size=10), 12))
+
+        self.assertEqual(len(queues), 12)
+        self.assertEqual(self.server.request_count, 2)
+
+        for queue in self.manager.iter_queues(page_size=10):
+            if queue.id == 3:
+                break
+        self.assertEqual(self.server.request_count, 3)
+
+    def test_iter_queues_sends_filters(self):
+        """Test that filters are sent as query parameters"""
+        self.server.queues_count = 5
+        self.manager.set_queue_status(2, False)
+
+        inactive_queues = list(self.manager.iter_queues(is_active=False))
+
+        self.assertEqual([queue.id for queue in inactive_queues], [2])
+
+    def test_iter_queues_caps_page_size(self):
+        """Test that page size is capped so that memory is bounded"""
+        with patch.object(RestClient, "get_request", wraps=self.qube_rest_client.get_request) as mock_get_request:
+            next(self.manager.iter_queues(page_size=10000))
+
+        self.assertEqual(mock_get_request.call_args.kwargs["params"]["page_size"], self.manager.MAX_STREAM_PAGE_SIZE)
+
+    def test_iter_queues_of_queues_list(self):
+        """Test that iter_queues_of_queues_list yields Queues one at a time and stops with the consumer"""
+        queues = list(islice(self.manager.iter_queues_of_queues_list(1, page_size=10), 15))
+
+        self.assertEqual([queue.id for queue in queues], list(range(1, 16)))
+        self.assertEqual(queues[0].location, 1)
+        self.assertEqual(self.server.request_count, 2)
@@ -0,0 +1,70 @@
+import base64
+import unittest
+from unittest.mock import patch
+
+from pyqube.rest.clients import RestClient
+from pyqube.rest.exceptions import NotFound
+from pyqube.rest.graphql_generators import QueuesListQueuesQueryBuilder
+from pyqube.testing.rest_server import MockQubeServer
+
+
+class TestListQueuesOfQueuesListFields(unittest.TestCase):
+
+    def setUp(self):
+        self.qube_rest_client = RestClient("api_key", 1, base_url="https://api-url-qube.com")
+
+    @patch.object(RestClient, "make_graphql_request")
+    def test_list_queues_of_queues_list_fields_with_success(self, mock_make_graphql_request):
+        """Test that only the given fields are requested and ids are decoded"""
+        mock_make_graphql_request.return_value.status_code = 200
+        mock_make_graphql_request.return_value.json.return_value = {
+            "data": {
+                "queues_lists_queues": {
+                    "pageInfo": {
+                        "endCursor": "cursor_1",
+                        "hasNextPage": False
+                    },
+                    "edges": [{
+                        "node": {
+                            "queue": {
+                                "id": base64.b64encode(b"QueueNode:7").decode("utf-8"),
+                                "tag": "A"
+                            }
+                        }
+                    }]
+                }
+            }
+        }
+        manager = self.qube_rest_client.get_queue_management_manager()
+
+        pages = list(manager.list_queues_of_queues_list_fields(3, ["id", "tag"], page_size=5, is_active=True))
+
+        self.assertEqual(pages, [[{
+            "id": 7,
+            "tag": "A"
+        }]])
+        expected_query, expected_variables = QueuesListQueuesQueryBuilder.build(
+            ["queue.id", "queue.tag"], queues_list=3, first=5, after=None, is_active=True
+        )
+        mock_make_graphql_request.assert_called_once_with(expected_query, expected_variables)
+
+    @patch.object(RestClient, "make_graphql_request")
+    def test_list_queues_of_queues_list_fields_with_error(self, mock_make_graphql_request):
+        """Test that errors of API Server are raised"""
+        mock_make_graphql_request.return_value.status_code = 404
+        manager = self.qube_rest_client.get_queue_management_manager()
+
+        with self.assertRaises(NotFound):
+            next(manager.list_queues_of_queues_list_fields(3, ["id"]))
+
+    def test_list_queues_of_queues_list_fields_through_pages(self):
+        """Test that pages are followed with the cursor sent as a variable"""
+        with MockQubeServer(queues_count=25) as server:
+            qube_rest_client = RestClient("api_key", 1, base_url=server.base_url)
+            manager = qube_rest_client.get_queue_management_manager()
+
+            pages = list(manager.list_queues_of_queues_list_fields(1, ["id", "location.id"], page_size=10))
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([queue["id"] for page in pages for queue in page], list(range(1, 26)))
+        self.assertEqual(pages[0][0]["location"], 1)
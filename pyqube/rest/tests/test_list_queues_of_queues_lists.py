@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import patch
+
+from pyqube.rest.clients import RestClient
+from pyqube.rest.graphql_generators import QueuesListQueuesQueryBuilder
+from pyqube.testing.rest_server import MockQubeServer
+from pyqube.types import Queue
+
+
+class TestListQueuesOfQueuesLists(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockQubeServer(queues_count=25).start()
+        self.addCleanup(self.server.stop)
+        self.qube_rest_client = RestClient("api_key", 1, base_url=self.server.base_url)
+        self.manager = self.qube_rest_client.get_queue_management_manager()
+
+    def test_list_queues_of_queues_lists_with_one_request_per_round(self):
+        """Test that the pages of every QueuesList are fetched together, one request per round"""
+        self.server.queues_lists_sizes = {
+            2: 5,
+            3: 0,
+        }
+
+        rounds = list(self.manager.list_queues_of_queues_lists([1, 2, 3], page_size=10))
+
+        self.assertEqual([sorted(page) for page in rounds], [[1, 2, 3], [1], [1]])
+        self.assertEqual([len(page[1]) for page in rounds], [10, 10, 5])
+        self.assertEqual([queue.id for queue in rounds[0][2]], [1, 2, 3, 4, 5])
+        self.assertEqual(rounds[0][3], [])
+        self.assertTrue(all(isinstance(queue, Queue) for queue in rounds[0][1]))
+        self.assertEqual(self.server.request_count, 3)
+
+    def test_list_queues_of_queues_lists_splits_big_batches(self):
+        """Test that QueuesLists are split across requests when there are too many for one request"""
+        self.manager.MAX_BATCHED_QUEUES_LISTS = 2
+
+        rounds = list(self.manager.list_queues_of_queues_lists([1, 2, 3], page_size=25))
+
+        self.assertEqual(len(rounds), 1)
+        self.assertEqual(sorted(rounds[0]), [1, 2, 3])
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_list_queues_of_queues_lists_uses_aliases(self):
+        """Test that each QueuesList is looked up under its own alias with its own variables"""
+        with patch.object(RestClient, "make_graphql_request", wraps=self.qube_rest_client.make_graphql_request) as \
+                mock_make_graphql_request:
+            next(self.manager.list_queues_of_queues_lists([7, 8], page_size=5, is_active=True))
+
+        expected_query, expected_variables = QueuesListQueuesQueryBuilder.build_batch({
+            "queues_list_0": dict(queues_list=7, first=5, after=None, is_active=True),
+            "queues_list_1": dict(queues_list=8, first=5, after=None, is_active=True),
+        })
+        mock_make_graphql_request.assert_called_once_with(expected_query, expected_variables)
+        self.assertIn("queues_list_1: queues_lists_queues(queues_list: $queues_list_1_queues_list", expected_query)
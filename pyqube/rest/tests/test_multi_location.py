@@ -0,0 +1,99 @@
+import unittest
+from itertools import islice
+from unittest.mock import Mock
+
+from pyqube.rest.clients import RestClient
+from pyqube.rest.exceptions import InternalServerError, NotFound
+from pyqube.rest.multi_location import MultiLocationRestClient
+from pyqube.testing.rest_server import MockQubeServer
+
+
+class TestMultiLocationRestClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockQubeServer(queues_count=25).start()
+        self.addCleanup(self.server.stop)
+        self.qube_rest_client = MultiLocationRestClient("api_key", base_url=self.server.base_url, max_workers=4)
+        self.addCleanup(self.qube_rest_client.close)
+        self.manager = self.qube_rest_client.get_queue_management_manager()
+
+    def test_location_clients_share_session(self):
+        """Test that the clients of every Location use the same session"""
+        client_1 = self.qube_rest_client.for_location(1)
+        client_2 = self.qube_rest_client.for_location(2)
+
+        self.assertIsInstance(client_1, RestClient)
+        self.assertEqual(client_2.location_id, 2)
+        self.assertIs(client_1.session, self.qube_rest_client.session)
+        self.assertIs(client_2.session, self.qube_rest_client.session)
+        self.assertIs(self.qube_rest_client.for_location(1), client_1)
+
+    def test_location_id_is_a_call_argument(self):
+        """Test that per-call location ids are used in request paths"""
+        queue = self.manager.set_queue_status(7, 3, False)
+
+        self.assertEqual(queue.location, 7)
+        self.assertFalse(queue.is_active)
+        self.assertEqual(self.manager.generate_ticket(7, 3, True).queue, 3)
+        pages = list(self.manager.list_queues(8, page_size=10))
+        self.assertEqual({queue.location for page in pages for queue in page}, {8})
+
+    def test_queue_listings_forward_filters(self):
+        """Test that Queue listings of a Location forward their filters, like the single-location manager"""
+        self.manager.set_queue_status(8, 3, False)
+
+        pages = list(self.manager.list_queues(8, page_size=10, is_active=False))
+        self.assertEqual([(queue.location, queue.id) for page in pages for queue in page], [(8, 3)])
+        self.assertEqual([queue.id for queue in self.manager.iter_queues(8, is_active=False)], [3])
+        self.assertEqual(len(list(self.manager.iter_queues(8, page_size=10))), 25)
+
+    def test_full_sync_of_location(self):
+        """Test that a full synchronization of a Location reports the Queues that are no longer listed"""
+        self.assertEqual(len(self.manager.sync_queues(8).added), 25)
+        self.server.queues_count = 24
+
+        delta = self.manager.sync_queues(8, full=True)
+
+        self.assertEqual([queue.id for queue in delta.deleted], [25])
+        self.assertNotIn(25, self.manager.for_location(8).queues_snapshot.queues)
+
+    def test_fan_out_runs_operation_for_every_location(self):
+        """Test that fan_out yields one result per Location"""
+        results = dict(self.manager.fan_out([1, 2, 3], lambda manager: manager.set_queue_status(1, True)))
+
+        self.assertEqual({location_id: queue.location for location_id, queue in results.items()}, {1: 1, 2: 2, 3: 3})
+
+    def test_fan_out_exceptions(self):
+        """Test that fan_out raises or yields errors of operations"""
+        operation = Mock(side_effect=NotFound)
+
+        with self.assertRaises(NotFound):
+            list(self.manager.fan_out([1, 2], operation))
+
+        results = dict(self.manager.fan_out([1, 2], operation, return_exceptions=True))
+        self.assertIsInstance(results[1], NotFound)
+        self.assertIsInstance(results[2], NotFound)
+
+    def test_list_queues_of_locations_merges_pages(self):
+        """Test that pages of many Locations are streamed into one iterator keeping per-Location order"""
+        queues_by_location = {}
+        for location_id, page in self.manager.list_queues_of_locations([1, 2, 3], page_size=10):
+            queues_by_location.setdefault(location_id, []).extend(queue.id for queue in page)
+            self.assertTrue(all(queue.location == location_id for queue in page))
+
+        self.assertEqual(queues_by_location, {location_id: list(range(1, 26)) for location_id in [1, 2, 3]})
+
+    def test_list_queues_of_locations_stops_with_consumer(self):
+        """Test that stopping the consumer stops fetching further pages"""
+        self.manager.STREAM_BUFFER_SIZE = 1
+        pages = list(islice(self.manager.list_queues_of_locations([1, 2, 3, 4], page_size=1), 2))
+        self.manager.close()
+
+        self.assertEqual(len(pages), 2)
+        self.assertLess(self.server.request_count, 4 * 25)
+
+    def test_list_queues_of_locations_raises_worker_errors(self):
+        """Test that errors of a Location are raised by the stream"""
+        self.server.error_rate = 1.0
+        with self.assertRaises(InternalServerError):
+            list(self.manager.list_queues_of_locations([1, 2]))
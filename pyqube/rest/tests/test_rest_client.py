@@ -1,9 +1,10 @@
 import requests
+from requests import Response
 
 import unittest
 from unittest.mock import Mock, patch
 
-from pyqube.rest.clients import RestClient
+from pyqube.rest.clients import JSONResponse, RestClient
 from pyqube.rest.queue_management_manager import QueueManagementManager
 
 
@@ -87,3 +88,38 @@ class TestRestClient(unittest.TestCase):
         mock_requests_get.assert_called_once_with(
             self.base_url + path, headers=self.qube_rest_client.headers, params=params, data=data, timeout=10
         )
+
+    def test_get_request_with_session(self):
+        """Test that requests are made through the session when the client has one"""
+        session = Mock()
+        qube_rest_client = RestClient(self.api_key, self.location_id, base_url=self.base_url, session=session)
+        path = "/path/to/request"
+        qube_rest_client.get_request(path)
+        session.get.assert_called_once_with(
+            self.base_url + path, headers=qube_rest_client.headers, params=None, timeout=10
+        )
+
+    def test_response_json_uses_json_backend(self):
+        """Test that responses of requests are parsed from their bytes by the JSON backend"""
+        response = Response()
+        response._content = '{"name": "Fila é"}'.encode('utf-8')
+        session = Mock()
+        session.get.return_value = response
+        qube_rest_client = RestClient(self.api_key, self.location_id, base_url=self.base_url, session=session)
+
+        returned_response = qube_rest_client.get_request("/path/to/request")
+
+        self.assertIsInstance(returned_response, JSONResponse)
+        self.assertIs(type(response), Response)
+        self.assertEqual(returned_response.json(), {
+            "name": "Fila é"
+        })
+
+    def test_response_json_with_invalid_json(self):
+        """Test that invalid bodies raise the same exception as requests"""
+        response = Response()
+        response._content = b"<html></html>"
+
+        with self.assertRaises(requests.JSONDecodeError) as context:
+            JSONResponse.wrap(response).json()
+        self.assertIsInstance(context.exception.__cause__, ValueError)
@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from pyqube.rest.clients import RestClient
+from pyqube.rest.sync import QueuesSnapshot
+from pyqube.testing.rest_server import MockQubeServer
+
+
+class TestSyncQueues(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockQubeServer(queues_count=30).start()
+        self.addCleanup(self.server.stop)
+        self.qube_rest_client = RestClient("api_key", 1, base_url=self.server.base_url)
+        self.manager = self.qube_rest_client.get_queue_management_manager()
+
+    def test_first_sync_adds_every_queue(self):
+        """Test that the first synchronization fetches every Queue"""
+        delta = self.manager.sync_queues(page_size=10)
+
+        self.assertEqual([queue.id for queue in delta.added], list(range(1, 31)))
+        self.assertEqual(delta.changed, [])
+        self.assertEqual(delta.deleted, [])
+        self.assertEqual(len(self.manager.queues_snapshot.queues), 30)
+        self.assertEqual(self.server.request_count, 3)
+
+    def test_sync_without_changes_is_empty(self):
+        """Test that Queues fetched again at the watermark are not reported as changed"""
+        self.manager.sync_queues()
+
+        delta = self.manager.sync_queues()
+
+        self.assertTrue(delta.is_empty)
+
+    def test_sync_fetches_only_changed_queues(self):
+        """Test that a synchronization only fetches the Queues updated since the previous one"""
+        self.manager.sync_queues(page_size=10)
+        self.server.set_queue_status(1, 4, False)
+        self.manager.sync_queues(page_size=10)
+        self.server.set_queue_status(1, 9, False)
+        self.server.set_queue_status(1, 12, False)
+        requests_before = self.server.request_count
+
+        delta = self.manager.sync_queues(page_size=10)
+
+        self.assertEqual([queue.id for queue in delta.changed], [9, 12])
+        self.assertEqual(delta.added, [])
+        self.assertFalse(self.manager.queues_snapshot.queues[9].is_active)
+        self.assertEqual(self.server.request_count - requests_before, 1)
+
+    def test_sync_reports_added_and_deleted_queues(self):
+        """Test that new and soft deleted Queues are reported and the snapshot is updated"""
+        self.manager.sync_queues()
+        self.server.delete_queue(1, 2)
+        self.server.queues_count = 31
+        self.server.set_queue_status(1, 31, True)
+
+        delta = self.manager.sync_queues()
+
+        self.assertEqual([queue.id for queue in delta.deleted], [2])
+        self.assertEqual([queue.id for queue in delta.added], [31])
+        self.assertNotIn(2, self.manager.queues_snapshot.queues)
+        self.assertIn(31, self.manager.queues_snapshot.queues)
+
+    def test_failed_sync_leaves_snapshot_unchanged(self):
+        """Test that a synchronization failing after its first page doesn't lose the changes of that page"""
+        self.manager.sync_queues(page_size=10)
+        self.server.set_queue_status(1, 4, False)
+        self.server.set_queue_status(1, 12, False)
+        watermark = self.manager.queues_snapshot.watermark
+        iter_queues = self.manager.iter_queues
+
+        def fail_after_first_queue(page_size, **filters):
+            queues = iter_queues(page_size, **filters)
+            yield next(queues)
+            raise requests.exceptions.Timeout("Timed out fetching the next page")
+
+        with patch.object(self.manager, "iter_queues", fail_after_first_queue):
+            with self.assertRaises(requests.exceptions.Timeout):
+                self.manager.sync_queues(page_size=1)
+
+        self.assertEqual(self.manager.queues_snapshot.watermark, watermark)
+        self.assertTrue(self.manager.queues_snapshot.queues[4].is_active)
+        delta = self.manager.sync_queues(page_size=1)
+        self.assertEqual([queue.id for queue in delta.changed], [4, 12])
+
+    def test_full_sync_reports_missing_queues_as_deleted(self):
+        """Test that a full synchronization detects Queues that are no longer listed"""
+        self.manager.sync_queues()
+        self.server.queues_count = 29
+        self.server.set_queue_status(1, 5, False)
+
+        delta = self.manager.sync_queues(full=True)
+
+        self.assertEqual([queue.id for queue in delta.deleted], [30])
+        self.assertEqual([queue.id for queue in delta.changed], [5])
+        self.assertEqual(delta.added, [])
+        self.assertNotIn(30, self.manager.queues_snapshot.queues)
+
+
+class TestQueuesSnapshot(unittest.TestCase):
+
+    def test_get_filters_before_first_sync(self):
+        """Test that no watermark is sent before the first synchronization"""
+        self.assertEqual(QueuesSnapshot().get_filters(), {
+            "ordering": "updated_at",
+        })
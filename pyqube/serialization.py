@@ -0,0 +1,72 @@
+import json
+from typing import Any, Callable, Dict, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+JSONInput = Union[bytes, bytearray, memoryview, str]
+
+
+def _stdlib_loads(data: JSONInput) -> Any:
+    """
+    Parses JSON with the standard library, which only parses a `str`. Buffers are decoded straight into one, without
+    an intermediate copy of their bytes, which is faster than letting `json.loads` detect the encoding of `bytes`.
+    """
+    try:
+        return json.loads(data if isinstance(data, str) else str(data, 'utf-8'))
+    except UnicodeDecodeError as e:
+        raise json.JSONDecodeError(f"Invalid UTF-8: {e.reason}", "", 0) from e
+
+
+JSON_BACKENDS: Dict[str, Callable[[JSONInput], Any]] = {
+    "json": _stdlib_loads,
+}
+if orjson is not None:
+    # orjson parses bytes, bytearray and memoryview without copying them, and its errors subclass json.JSONDecodeError
+    JSON_BACKENDS["orjson"] = orjson.loads
+
+_backend = "orjson" if "orjson" in JSON_BACKENDS else "json"
+_loads = JSON_BACKENDS[_backend]
+
+
+def get_json_backend() -> str:
+    """
+    Returns the name of the JSON backend in use, which is "orjson" when it is installed and "json" otherwise.
+    """
+    return _backend
+
+
+def set_json_backend(name: str) -> None:
+    """
+    Selects the JSON backend used to parse MQTT payloads and REST responses.
+
+    Args:
+        name (str): Name of a backend of JSON_BACKENDS (e.g. "json" or "orjson").
+
+    Raises:
+        ValueError: If the backend is unknown or not installed.
+    """
+    global _backend, _loads
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}'. Available backends: {', '.join(JSON_BACKENDS)}.")
+    _backend, _loads = name, JSON_BACKENDS[name]
+
+
+def loads(data: JSONInput) -> Any:
+    """
+    Parses a JSON document from `bytes`, `bytearray`, `memoryview` or `str` with the selected backend, without
+    decoding bytes into a `str` first.
+
+    Args:
+        data (JSONInput): JSON document, encoded in UTF-8 when it is not a `str`.
+
+    Returns:
+        Any: The parsed document.
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON.
+    """
+    return _loads(data)
@@ -0,0 +1,284 @@
+import argparse
+import base64
+import copy
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from pyqube.decoders import decode_list, get_decoder
+from pyqube.events.sinks import INSERT_STATEMENTS, SCHEMA, SQLiteSink
+from pyqube.events.spool import EventSpool, SpoolReader
+from pyqube.rest.global_ids import QUEUE_RELATIONS, decode_edges, encode_global_id, parse_global_id
+from pyqube.serialization import JSON_BACKENDS
+from pyqube.testing.rest_server import MockQubeServer
+from pyqube.types import Answering, Queue, QueuesWaitingTicketsBatch, QueueWithWaitingTickets, Ticket
+
+
+def measure(function: Callable[[], object], repeat: int = 5) -> float:
+    """
+    Measures the best time of a function over some runs, which is the least affected by other processes.
+    Args:
+        function (Callable[[], object]): Function to measure.
+        repeat (int, optional): Number of runs. Defaults to 5.
+    Returns:
+        float: Best time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_global_ids(page_size: int = 10000, repeat: int = 5) -> Dict[str, float]:
+    """
+    Compares decoding the global ids of a page of `queues_lists_queues` edges one base64 decode per id against the
+    memoized bulk decoder.
+    Args:
+        page_size (int, optional): Number of edges of the page. Defaults to 10000.
+        repeat (int, optional): Number of runs. Defaults to 5.
+    Returns:
+        Dict[str, float]: Best time in seconds of each decoder.
+    """
+    edges = MockQubeServer(queues_count=page_size).queues_lists_queues(1, page_size, "")["edges"]
+    for edge in edges:
+        edge["node"]["queue"]["schedule"] = {
+            "id": encode_global_id("ScheduleNode", 1)
+        }
+    pages = [copy.deepcopy(edges) for _ in range(2 * repeat)]
+
+    def decode_with_base64(edges: List[dict]):
+        for edge in edges:
+            queue = edge["node"]["queue"]
+            queue["id"] = int(base64.b64decode(queue["id"]).decode('utf-8').split(":")[1])
+            queue["location"] = int(base64.b64decode(queue["location"]["id"]).decode('utf-8').split(":")[1])
+            if queue.get("schedule"):
+                queue["schedule"] = int(base64.b64decode(queue["schedule"]["id"]).decode('utf-8').split(":")[1])
+
+    parse_global_id.cache_clear()
+    return {
+        "base64": measure(lambda: decode_with_base64(pages.pop()), repeat),
+        "decode_edges": measure(lambda: decode_edges(pages.pop(), "queue", QUEUE_RELATIONS), repeat),
+    }
+
+
+def benchmark_json(messages: int = 10000, repeat: int = 5) -> Dict[str, float]:
+    """
+    Compares parsing typical payloads (Ticket MQTT messages and pages of Queues) by decoding them into a `str` first,
+    as the SDK used to, against each JSON backend parsing the bytes directly.
+    Args:
+        messages (int, optional): Number of Ticket payloads, and of Queues in the pages. Defaults to 10000.
+        repeat (int, optional): Number of runs. Defaults to 5.
+    Returns:
+        Dict[str, float]: Best time in seconds of each backend, by payload.
+    """
+    server = MockQubeServer(queues_count=messages)
+    ticket_payloads = [json.dumps(server.build_ticket(1, 1, False)).encode('utf-8') for _ in range(messages)]
+    queues_payloads = [
+        json.dumps(server.list_queues(1, page, 100)).encode('utf-8') for page in range(1, messages // 100 + 1)
+    ]
+    variants = {
+        "decode+json": lambda payload: json.loads(payload.decode('utf-8')),
+        **JSON_BACKENDS,
+    }
+
+    results = {}
+    for payload_name, payloads in (("ticket", ticket_payloads), ("queues_page", queues_payloads)):
+        for variant, loads in variants.items():
+            results[f"{payload_name} {variant}"] = measure(
+                lambda loads=loads, payloads=payloads: [loads(payload) for payload in payloads], repeat
+            )
+    return results
+
+
+def benchmark_decoders(messages: int = 10000, repeat: int = 5) -> Dict[str, float]:
+    """
+    Compares initializing models with `Model(**data)` against their compiled decoders.
+    Args:
+        messages (int, optional): Number of models of each type. Defaults to 10000.
+        repeat (int, optional): Number of runs. Defaults to 5.
+    Returns:
+        Dict[str, float]: Best time in seconds of each variant, by model.
+    """
+    server = MockQubeServer()
+    payloads = {
+        Ticket: [server.build_ticket(1, 1, False) for _ in range(messages)],
+        Queue: [server.build_queue(1, queue_id) for queue_id in range(1, messages + 1)],
+        Answering: [server.build_answering(1, 1) for _ in range(messages)],
+    }
+
+    results = {}
+    for model, items in payloads.items():
+        decoder = get_decoder(model)
+        results[f"{model.__name__} kwargs"] = measure(
+            lambda model=model, items=items: [model(**item) for item in items], repeat
+        )
+        results[f"{model.__name__} decoder"] = measure(
+            lambda decoder=decoder, items=items: [decoder(item) for item in items], repeat
+        )
+    return results
+
+
+def benchmark_queue_metrics(queues: int = 500, messages: int = 200, repeat: int = 5) -> Dict[str, float]:
+    """
+    Compares decoding 'changed waiting number' payloads into one object pair per queue against columnar batches.
+    Args:
+        queues (int, optional): Number of queues in each payload. Defaults to 500.
+        messages (int, optional): Number of payloads. Defaults to 200.
+        repeat (int, optional): Number of runs. Defaults to 5.
+    Returns:
+        Dict[str, float]: Best time in seconds of each variant.
+    """
+    payload = [{
+        "queue": {
+            "id": queue_id,
+            "tag": f"Q{queue_id}",
+            "name": f"Queue {queue_id}",
+            "kpi_wait_count": 10,
+            "kpi_wait_time": 600,
+            "kpi_service_time": 300,
+        },
+        "waiting_tickets": queue_id % 17,
+    } for queue_id in range(1, queues + 1)]
+
+    return {
+        "objects": measure(lambda: [decode_list(QueueWithWaitingTickets, payload) for _ in range(messages)], repeat),
+        "batch": measure(lambda: [QueuesWaitingTicketsBatch.decode(payload) for _ in range(messages)], repeat),
+    }
+
+
+def benchmark_spool(messages: int = 1000, repeat: int = 5) -> Dict[str, float]:
+    """
+    Compares spooling Ticket messages with one fsync per message against group commits, and measures reading them
+    back through memory-mapped segments.
+    Args:
+        messages (int, optional): Number of messages. Defaults to 1000.
+        repeat (int, optional): Number of runs. Defaults to 5.
+    Returns:
+        Dict[str, float]: Best time in seconds of each variant.
+    """
+    payload = json.dumps(MockQubeServer().build_ticket(1, 1, False)).encode('utf-8')
+    topic = "locations/1/tickets/generated"
+
+    def append(**options):
+        with tempfile.TemporaryDirectory() as directory, EventSpool(directory, **options) as spool:
+            for _ in range(messages):
+                spool.append(topic, payload)
+
+    with tempfile.TemporaryDirectory() as directory:
+        with EventSpool(directory) as spool:
+            for _ in range(messages):
+                spool.append(topic, payload)
+        reader = SpoolReader(directory)
+        return {
+            "fsync_each": measure(lambda: append(fsync_interval=0), repeat),
+            "group_commit": measure(lambda: append(fsync_max_records=100), repeat),
+            "mmap_read": measure(lambda: sum(1 for _ in reader.read(0)), repeat),
+        }
+
+
+def benchmark_sqlite_sink(messages: int = 1000, repeat: int = 5) -> Dict[str, float]:
+    """
+    Compares inserting Tickets into SQLite row by row, with one transaction each as handlers usually do, against the
+    batched SQLiteSink.
+    Args:
+        messages (int, optional): Number of Tickets. Defaults to 1000.
+        repeat (int, optional): Number of runs. Defaults to 5.
+    Returns:
+        Dict[str, float]: Best time in seconds of each variant.
+    """
+    server = MockQubeServer()
+    tickets = [get_decoder(Ticket)(server.build_ticket(1, 1, False)) for _ in range(messages)]
+
+    def insert_row_by_row():
+        with tempfile.TemporaryDirectory() as directory:
+            connection = sqlite3.connect(os.path.join(directory, "events.sqlite3"))
+            for statement in SCHEMA:
+                connection.execute(statement)
+            for ticket in tickets:
+                with connection:
+                    connection.execute(
+                        INSERT_STATEMENTS["tickets"], (
+                            ticket.id, ticket.queue, ticket.number, ticket.printed_tag, ticket.printed_number,
+                            ticket.priority, ticket.state, ticket.created_at.isoformat(),
+                            ticket.updated_at.isoformat()
+                        )
+                    )
+            connection.close()
+
+    def insert_with_sink():
+        with tempfile.TemporaryDirectory() as directory:
+            with SQLiteSink(os.path.join(directory, "events.sqlite3")) as sink:
+                for ticket in tickets:
+                    sink.write_ticket(ticket)
+
+    return {
+        "row_by_row": measure(insert_row_by_row, repeat),
+        "sink": measure(insert_with_sink, repeat),
+    }
+
+
+def benchmark_import_time(repeat: int = 5) -> Dict[str, float]:
+    """
+    Measures the time to import parts of the SDK in a fresh interpreter, where only the transports that are used
+    (paho-mqtt for events, requests for REST) should be imported. The time of the bare interpreter is subtracted.
+    Args:
+        repeat (int, optional): Number of runs. Defaults to 5.
+    Returns:
+        Dict[str, float]: Best time in seconds of each import.
+    """
+    statements = {
+        "pyqube": "import pyqube",
+        "pyqube.types": "import pyqube.types",
+        "QubeClient": "from pyqube import QubeClient",
+    }
+
+    def run(statement: str):
+        subprocess.run([sys.executable, "-c", statement], check=True)
+
+    interpreter = measure(lambda: run("pass"), repeat)
+    return {
+        name: max(measure(lambda statement=statement: run(statement), repeat) - interpreter, 0.0)
+        for name, statement in statements.items()
+    }
+
+
+BENCHMARKS = {
+    "global_ids": benchmark_global_ids,
+    "json": benchmark_json,
+    "decoders": benchmark_decoders,
+    "queue_metrics": benchmark_queue_metrics,
+    "spool": benchmark_spool,
+    "sqlite_sink": benchmark_sqlite_sink,
+    "import_time": benchmark_import_time,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Command line entry point: runs micro benchmarks of the SDK's hot paths and prints the best time of each variant.
+    """
+    parser = argparse.ArgumentParser(description="Run micro benchmarks of the Qube SDK.")
+    parser.add_argument("benchmarks", nargs="*", metavar="benchmark", help=f"One of {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    results = {}
+    for name in args.benchmarks or BENCHMARKS:
+        results[name] = BENCHMARKS[name](repeat=args.repeat)
+        for variant, seconds in results[name].items():
+            print(f"{name} {variant}: {seconds * 1000:.2f}ms")
+    return results
+
+
+if __name__ == "__main__":
+    main()
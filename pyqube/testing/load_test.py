@@ -0,0 +1,163 @@
+import argparse
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from pyqube.rest.clients import RestClient
+from pyqube.rest.multi_location import MultiLocationRestClient
+from pyqube.testing.rest_server import MockQubeServer
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Computes a percentile with the nearest-rank method.
+    Args:
+        sorted_values (List[float]): Values sorted in ascending order.
+        q (float): Percentile between 0 and 100.
+    Returns:
+        float: The percentile value, or 0.0 if there are no values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class LoadTestReport:
+    """
+    Results of a load test run.
+    """
+    operations: int
+    errors: int
+    duration: float
+    latencies: List[float] = field(default_factory=list, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        """Successful and failed operations per second."""
+        return self.operations / self.duration if self.duration else 0.0
+
+    @property
+    def p50(self) -> float:
+        """Median latency in seconds."""
+        return percentile(self.latencies, 50)
+
+    @property
+    def p99(self) -> float:
+        """99th percentile latency in seconds."""
+        return percentile(self.latencies, 99)
+
+    def summary(self) -> str:
+        """Returns a human-readable summary of the report."""
+        return (
+            f"operations={self.operations} errors={self.errors} duration={self.duration:.3f}s "
+            f"throughput={self.throughput:.1f}/s p50={self.p50 * 1000:.2f}ms p99={self.p99 * 1000:.2f}ms"
+        )
+
+
+def run_load_test(operation: Callable[[], object], operations: int = 1000, concurrency: int = 10) -> LoadTestReport:
+    """
+    Runs an operation many times from concurrent threads and measures its latency.
+    Args:
+        operation (Callable[[], object]): Function that performs one operation (e.g. one call to a client method).
+            Any exception raised by it is counted as an error.
+        operations (int, optional): Total number of operations to run. Defaults to 1000.
+        concurrency (int, optional): Number of threads running operations. Defaults to 10.
+    Returns:
+        LoadTestReport: Throughput, error count and latencies of the run.
+    """
+
+    def timed_operation(_):
+        started_at = time.perf_counter()
+        try:
+            operation()
+            failed = False
+        except Exception:
+            failed = True
+        return time.perf_counter() - started_at, failed
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed_operation, range(operations)))
+    duration = time.perf_counter() - started_at
+
+    return LoadTestReport(
+        operations=operations,
+        errors=sum(1 for _, failed in results if failed),
+        duration=duration,
+        latencies=sorted(latency for latency, _ in results),
+    )
+
+
+def build_operation(client: RestClient, name: str, page_size: int) -> Callable[[], object]:
+    """
+    Builds a load test operation that uses the Queue Management Manager of given client.
+    Args:
+        client (RestClient): Client used to make the requests.
+        name (str): One of "list_queues", "list_queues_of_queues_list" or "generate_ticket".
+        page_size (int): Page size of paginated operations. All pages are fetched in one operation.
+    Returns:
+        Callable[[], object]: The operation.
+    """
+    manager = client.get_queue_management_manager()
+    operations = {
+        "list_queues": lambda: [queue for page in manager.list_queues(page_size) for queue in page],
+        "list_queues_of_queues_list":
+            lambda: [queue for page in manager.list_queues_of_queues_list(1, page_size) for queue in page],
+        "generate_ticket": lambda: manager.generate_ticket(1, False),
+    }
+    return operations[name]
+
+
+def main(argv: Optional[List[str]] = None) -> LoadTestReport:
+    """
+    Command line entry point: starts a MockQubeServer and runs a load test of RestClient against it. With
+    `--pool-size`, the client shares a session that keeps that many connections open, instead of opening a connection
+    for each request, so both can be compared.
+    """
+    parser = argparse.ArgumentParser(description="Load test the Qube REST client against a local mock server.")
+    parser.add_argument(
+        "--operation",
+        default="list_queues",
+        choices=["list_queues", "list_queues_of_queues_list", "generate_ticket"]
+    )
+    parser.add_argument("--operations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--queues", type=int, default=50, help="Queues served by the mock server.")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="Server latency in seconds.")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=0,
+        help="Connections kept open by a shared session. Defaults to no session (a new connection per request)."
+    )
+    args = parser.parse_args(argv)
+    session = MultiLocationRestClient.create_session(args.pool_size) if args.pool_size > 0 else None
+
+    with MockQubeServer(
+        queues_count=args.queues,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+    ) as server:
+        client = RestClient("load-test-api-key", 1, base_url=server.base_url, session=session)
+        try:
+            report = run_load_test(
+                build_operation(client, args.operation, args.page_size), args.operations, args.concurrency
+            )
+        finally:
+            if session is not None:
+                session.close()
+        print(report.summary())
+        print(f"http_requests={server.request_count} injected_errors={server.error_count}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
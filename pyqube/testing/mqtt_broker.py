@@ -0,0 +1,176 @@
+import itertools
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+import paho.mqtt.client as mqtt
+
+
+class FakeMQTTClient:
+    """
+    Stand-in for paho's Client connected to a FakeMQTTBroker. It implements the methods used by MQTTClient; connecting
+    and (un)subscribing take effect immediately and messages are delivered synchronously by `FakeMQTTBroker.publish`.
+    Connections refused by the broker are retried at once, as the network loop does after its reconnect delay.
+    SUBACKs are not sent.
+    """
+
+    def __init__(self, broker: "FakeMQTTBroker", client_id: str = "", protocol: int = mqtt.MQTTv311):
+        self.broker = broker
+        self.client_id = client_id
+        self.protocol = protocol
+        self.connected = False
+        self.subscriptions: Dict[str, int] = {}  # Maps topic filters (including shared ones) to their QoS
+        self.received: List[mqtt.MQTTMessage] = []
+        self.reconnect_delays: List[float] = []  # Delays set with reconnect_delay_set
+        self.on_message = None
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_connect_fail = None
+        self.on_subscribe = None
+        self._message_ids = itertools.count(1)
+
+    def username_pw_set(self, username: str, password: Optional[str] = None) -> None:
+        pass
+
+    def ws_set_options(self, path: str = "/mqtt", headers=None) -> None:
+        pass
+
+    def tls_set_context(self, context=None) -> None:
+        pass
+
+    def tls_insecure_set(self, value: bool) -> None:
+        pass
+
+    def reconnect_delay_set(self, min_delay: int = 1, max_delay: int = 120) -> None:
+        self.reconnect_delays.append(min_delay)
+
+    def loop_start(self) -> int:
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def loop_stop(self) -> int:
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def connect(self, host: str, port: int = 1883, keepalive: int = 60, **options) -> int:
+        while self.broker.refuse_connection():
+            self._notify_connect(self.broker.REFUSED_RETURN_CODE)
+        self.connected = True
+        self._notify_connect(0)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def _notify_connect(self, rc: int) -> None:
+        if self.on_connect is None:
+            return
+        if self.protocol == mqtt.MQTTv5:
+            self.on_connect(self, None, {"session present": 0}, rc, None)
+        else:
+            self.on_connect(self, None, {"session present": 0}, rc)
+
+    connect_async = connect
+
+    def disconnect(self) -> int:
+        self.connected = False
+        self.subscriptions.clear()
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def subscribe(self, topic: Union[str, List[Tuple[str, int]]], qos: int = 0) -> Tuple[int, Optional[int]]:
+        if not self.connected:
+            return mqtt.MQTT_ERR_NO_CONN, None
+        topics = [(topic, qos)] if isinstance(topic, str) else topic
+        for topic_filter, topic_qos in topics:
+            self.subscriptions[topic_filter] = topic_qos
+        return mqtt.MQTT_ERR_SUCCESS, next(self._message_ids)
+
+    def unsubscribe(self, topic: Union[str, List[str]]) -> Tuple[int, Optional[int]]:
+        if not self.connected:
+            return mqtt.MQTT_ERR_NO_CONN, None
+        for topic_filter in [topic] if isinstance(topic, str) else topic:
+            self.subscriptions.pop(topic_filter, None)
+        return mqtt.MQTT_ERR_SUCCESS, next(self._message_ids)
+
+    def deliver(self, topic: str, payload: bytes) -> None:
+        message = mqtt.MQTTMessage(topic=topic.encode('utf-8'))
+        message.payload = payload
+        self.received.append(message)
+        if self.on_message is not None:
+            self.on_message(self, None, message)
+
+
+class FakeMQTTBroker:
+    """
+    In-memory stand-in for an MQTT broker, meant for tests of handlers and of horizontally scaled consumers.
+    Its clients replace paho's Client, e.g. with `unittest.mock.patch('paho.mqtt.client.Client', broker.create_client)`.
+    Like real brokers, it delivers a message once to every client with a matching subscription and, for shared
+    subscriptions (`$share/{group}/{topic}`), to only one client of each group, chosen in turn.
+    """
+
+    REFUSED_RETURN_CODE = 5  # Not authorized
+
+    def __init__(self):
+        self.clients: List[FakeMQTTClient] = []
+        self.published_count = 0
+        self.refused_connections = 0  # Number of next connections refused in the CONNACK
+        self._group_deliveries: Dict[Tuple[str, str], int] = {}  # Messages delivered to each shared subscription
+        self._lock = threading.Lock()
+
+    def create_client(self, client_id: str = "", protocol: int = mqtt.MQTTv311, **options) -> FakeMQTTClient:
+        """Creates a client of the broker, with the arguments of paho's Client."""
+        client = FakeMQTTClient(self, client_id, protocol)
+        self.clients.append(client)
+        return client
+
+    def refuse_connection(self) -> bool:
+        """Returns True if the next connection must be refused."""
+        with self._lock:
+            if self.refused_connections <= 0:
+                return False
+            self.refused_connections -= 1
+            return True
+
+    @staticmethod
+    def parse_shared_subscription(topic_filter: str) -> Tuple[Optional[str], str]:
+        """Returns the group (or None) and the topic filter of a subscription."""
+        if topic_filter.startswith("$share/"):
+            _, group, topic_filter = topic_filter.split("/", 2)
+            return group, topic_filter
+        return None, topic_filter
+
+    def publish(self, topic: str, payload: Union[bytes, str]) -> int:
+        """
+        Publishes a message to the connected clients.
+
+        Args:
+            topic (str): Topic of the message.
+            payload (bytes or str): Payload of the message.
+
+        Returns:
+            int: Number of clients the message was delivered to.
+        """
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        recipients = []
+        with self._lock:
+            self.published_count += 1
+            group_members: Dict[Tuple[str, str], List[FakeMQTTClient]] = {}
+            for client in self.clients:
+                if not client.connected:
+                    continue
+                subscribed = False
+                for subscription in client.subscriptions:
+                    group, topic_filter = self.parse_shared_subscription(subscription)
+                    if not mqtt.topic_matches_sub(topic_filter, topic):
+                        continue
+                    if group is None:
+                        subscribed = True
+                    else:
+                        group_members.setdefault((group, topic_filter), []).append(client)
+                if subscribed:
+                    recipients.append(client)
+            for shared_subscription, members in group_members.items():
+                deliveries = self._group_deliveries.get(shared_subscription, 0)
+                self._group_deliveries[shared_subscription] = deliveries + 1
+                member = members[deliveries % len(members)]
+                if member not in recipients:
+                    recipients.append(member)
+
+        for client in recipients:
+            client.deliver(topic, payload)
+        return len(recipients)
@@ -0,0 +1,461 @@
+import base64
+import json
+import random
+import re
+import threading
+import time
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from pyqube.rest.global_ids import encode_global_id
+
+
+def _now() -> str:
+    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class MockQubeServer:
+    """
+    Local stand-in for Qube's API Server, serving the endpoints used by QueueManagementManager over real HTTP.
+    It is meant for load and latency testing of the REST client (connection pooling, retries and pagination), so it
+    supports configurable latency, injected errors and number of queues (and therefore number of pages).
+    """
+
+    GRAPHQL_ARGUMENTS_PATTERN = re.compile(r'(\w+)\s*:\s*("[^"]*"|[^,)\s]+)')
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        queues_count: int = 50,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initializes the Mock Qube Server. The server only starts listening after `start` is called.
+        Args:
+            host (str, optional): Host to bind. Defaults to localhost.
+            port (int, optional): Port to bind. Defaults to 0, which picks a free port.
+            queues_count (int, optional): Number of Queues in each Location and QueuesList. With a given page size,
+                this defines the number of pages returned by paginated endpoints.
+            latency (float, optional): Seconds added to every response.
+            latency_jitter (float, optional): Upper bound of random seconds added on top of `latency`.
+            error_rate (float, optional): Fraction (0 to 1) of requests answered with `error_status`.
+            error_status (int, optional): HTTP status code of injected errors. Defaults to 500.
+            seed (int, optional): Seed of the random generator used for jitter and injected errors.
+        """
+        self.queues_count = queues_count
+        self.queues_lists_sizes: Dict[int, int] = {}  # Number of Queues of QueuesLists that differ from queues_count
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self.request_count = 0
+        self.error_count = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_ticket_id = 1
+        self._next_answering_id = 1
+        self._current_answerings: Dict[int, dict] = {}
+        self._queues_status: Dict[Tuple[int, int], bool] = {}
+        self._queues_updated_at: Dict[Tuple[int, int], str] = {}
+        self._queues_deleted_at: Dict[Tuple[int, int], str] = {}
+        self._thread = None
+
+        self._httpd = _MockQubeHTTPServer((host, port), _MockQubeRequestHandler)
+        self._httpd.mock = self
+
+    @property
+    def base_url(self) -> str:
+        """Base url to give to RestClient."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockQubeServer":
+        """Starts serving requests in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops serving requests and closes the listening socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "MockQubeServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def _before_response(self) -> Optional[int]:
+        """
+        Applies configured latency and decides if the current request must fail.
+        Returns:
+            Optional[int]: Status code of the injected error or None if the request should succeed.
+        """
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency + (self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0)
+            fail = self.error_rate and self._random.random() < self.error_rate
+            if fail:
+                self.error_count += 1
+        if delay:
+            time.sleep(delay)
+        return self.error_status if fail else None
+
+    def build_queue(self, location_id: int, queue_id: int) -> dict:
+        """Builds the REST representation of a Queue."""
+        created_at = "2024-01-01T00:00:00.000000Z"
+        return {
+            "id": queue_id,
+            "is_active": self._queues_status.get((location_id, queue_id), True),
+            "created_at": created_at,
+            "updated_at": self._queues_updated_at.get((location_id, queue_id), created_at),
+            "deleted_at": self._queues_deleted_at.get((location_id, queue_id)),
+            "tag": f"Q{queue_id}",
+            "name": f"Queue {queue_id}",
+            "allow_priority": True,
+            "ticket_range_enabled": False,
+            "min_ticket_number": 1,
+            "max_ticket_number": 999,
+            "ticket_tolerance_enabled": False,
+            "ticket_tolerance_number": 0,
+            "kpi_wait_count": 10,
+            "kpi_wait_time": 600,
+            "kpi_service_time": 300,
+            "location": location_id,
+            "schedule": None,
+        }
+
+    def set_queue_status(self, location_id: int, queue_id: int, is_active: bool) -> dict:
+        """Changes the status of a Queue, updating its `updated_at`, and returns its REST representation."""
+        self._queues_status[(location_id, queue_id)] = is_active
+        self._queues_updated_at[(location_id, queue_id)] = _now()
+        return self.build_queue(location_id, queue_id)
+
+    def delete_queue(self, location_id: int, queue_id: int) -> None:
+        """Soft deletes a Queue, setting its `deleted_at` and `updated_at`."""
+        self._queues_deleted_at[(location_id, queue_id)] = self._queues_updated_at[(location_id, queue_id)] = _now()
+
+    def build_ticket(self, location_id: int, queue_id: int, priority: bool) -> dict:
+        """Builds the REST representation of a newly generated Ticket."""
+        with self._lock:
+            ticket_id = self._next_ticket_id
+            self._next_ticket_id += 1
+        now = _now()
+        return {
+            "id": ticket_id,
+            "signature": f"signature-{ticket_id}",
+            "updated_at": now,
+            "number": ticket_id,
+            "printed_tag": f"Q{queue_id}",
+            "printed_number": f"{ticket_id:03d}",
+            "note": None,
+            "priority": priority,
+            "priority_level": 1 if priority else 3,
+            "created_at": now,
+            "state": 1,
+            "invalidated_by_system": None,
+            "ticket_local_runner": None,
+            "queue": queue_id,
+            "queue_dest": queue_id,
+            "counter_dest": None,
+            "profile_dest": None,
+            "generated_by_ticket_kiosk": None,
+            "generated_by_profile": None,
+            "generated_by_totem": None,
+            "is_generated_by_api_key": True,
+            "generated_by_api_key": 1,
+            "local_runner": None,
+            "tags": [],
+        }
+
+    def build_answering(self, location_id: int, profile_id: int) -> dict:
+        """Builds the REST representation of a new Answering and stores it as current answering of the Profile."""
+        ticket = self.build_ticket(location_id, 1, False)
+        ticket["state"] = 2
+        with self._lock:
+            answering_id = self._next_answering_id
+            self._next_answering_id += 1
+        now = _now()
+        answering = {
+            "id": answering_id,
+            "created_at": now,
+            "updated_at": now,
+            "finish_reason": None,
+            "started_at": now,
+            "finished_at": None,
+            "invalidated_by_system": None,
+            "waiting_time": 0,
+            "service_time": None,
+            "answering_local_runner": None,
+            "ticket": ticket,
+            "profile": profile_id,
+            "counter": 1,
+            "queue": 1,
+            "local_runner": None,
+            "transferred_from_answering": None,
+        }
+        with self._lock:
+            self._current_answerings[profile_id] = answering
+        return answering
+
+    def get_current_answering(self, profile_id: int) -> Optional[dict]:
+        """Returns a copy of the current Answering of a Profile, or None if it isn't answering."""
+        with self._lock:
+            answering = self._current_answerings.get(profile_id)
+            return None if answering is None else dict(answering)
+
+    def end_answering(self, profile_id: int, answering_id: int) -> Optional[dict]:
+        """Ends the current Answering of a Profile and returns it, or None if it isn't the current one."""
+        with self._lock:
+            answering = self._current_answerings.get(profile_id)
+            if answering is None or answering["id"] != answering_id:
+                return None
+            del self._current_answerings[profile_id]
+        answering.update(finish_reason=6, finished_at=_now(), service_time=1)
+        return answering
+
+    def build_location_access(self, location_id: int, location_access_id: int, counter_id: int) -> dict:
+        """Builds the REST representation of a LocationAccess with its current Counter."""
+        created_at = "2024-01-01T00:00:00.000000Z"
+        return {
+            "id": location_access_id,
+            "location": location_id,
+            "profile": 1,
+            "current_counter": {
+                "id": counter_id,
+                "is_active": True,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "deleted_at": None,
+                "tag": f"C{counter_id}",
+                "name": f"Counter {counter_id}",
+                "location": location_id,
+            },
+            "groups": [3],
+            "invitation_email": "staff@example.com",
+            "status": 2,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "deleted_at": None,
+        }
+
+    def list_queues(self, location_id: int, page: int, page_size: int, filters: Optional[dict] = None) -> dict:
+        """
+        Builds a page of Queues like the API Server's paginated list endpoint.
+        Supported filters are `is_active`, `tag`, `updated_at__gte` and `ordering=updated_at`.
+        """
+        filters = filters or {}
+        queues = [self.build_queue(location_id, queue_id) for queue_id in range(1, self.queues_count + 1)]
+        if "is_active" in filters:
+            queues = [queue for queue in queues if str(queue["is_active"]) == filters["is_active"]]
+        if "tag" in filters:
+            queues = [queue for queue in queues if queue["tag"] == filters["tag"]]
+        if "updated_at__gte" in filters:
+            queues = [queue for queue in queues if queue["updated_at"] >= filters["updated_at__gte"]]
+        if filters.get("ordering") == "updated_at":
+            queues.sort(key=lambda queue: (queue["updated_at"], queue["id"]))
+
+        start = (page - 1) * page_size
+        end = min(start + page_size, len(queues))
+        return {
+            "count": len(queues),
+            "next": f"?page={page + 1}&page_size={page_size}" if end < len(queues) else None,
+            "previous": f"?page={page - 1}&page_size={page_size}" if page > 1 else None,
+            "results": queues[start:end],
+        }
+
+    def queues_lists_queues(self, queues_list_id: int, first: int, after: str) -> dict:
+        """Builds a relay connection of Queues that belong to a QueuesList."""
+        queues_count = self.queues_lists_sizes.get(queues_list_id, self.queues_count)
+        start = int(base64.b64decode(after).decode('utf-8').split(":")[1]) + 1 if after else 0
+        end = min(start + first, queues_count)
+        location_id = 1
+        edges = []
+        for index in range(start, end):
+            queue = self.build_queue(location_id, index + 1)
+            queue["id"] = encode_global_id("QueueNode", queue["id"])
+            queue["location"] = {
+                "id": encode_global_id("LocationNode", location_id)
+            }
+            edges.append({
+                "cursor": encode_global_id("arrayconnection", index),
+                "node": {
+                    "id": encode_global_id("QueuesListQueueNode", queues_list_id * 100000 + index),
+                    "queue": queue,
+                },
+            })
+        return {
+            "pageInfo": {
+                "startCursor": edges[0]["cursor"] if edges else None,
+                "endCursor": edges[-1]["cursor"] if edges else None,
+                "hasNextPage": end < queues_count,
+                "hasPreviousPage": start > 0,
+            },
+            "edges": edges,
+        }
+
+    def execute_graphql(self, query: str, variables: Optional[dict] = None) -> dict:
+        """
+        Executes the subset of GraphQL queries used by QueueManagementManager, including aliased `queues_lists_queues`
+        fields in the same query. Nodes always have every field.
+        """
+        matches = list(re.finditer(r'(?:(\w+)\s*:\s*)?queues_lists_queues\s*\(([^)]*)\)', query))
+        if not matches:
+            return {
+                "errors": [{
+                    "message": "Unsupported query."
+                }]
+            }
+        variables = variables or {}
+        data = {}
+        for match in matches:
+            arguments = {}
+            for key, value in self.GRAPHQL_ARGUMENTS_PATTERN.findall(match.group(2)):
+                if value.startswith("$"):
+                    value = variables.get(value[1:])
+                    value = "" if value is None else str(value)
+                arguments[key] = value.strip('"')
+            data[match.group(1) or "queues_lists_queues"] = self.queues_lists_queues(
+                int(arguments["queues_list"]), int(arguments.get("first", 10)), arguments.get("after", "")
+            )
+        return {
+            "data": data
+        }
+
+
+class _MockQubeHTTPServer(ThreadingHTTPServer):
+    """HTTP server with a listen backlog big enough for concurrent load tests."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class _MockQubeRequestHandler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to MockQubeServer."""
+
+    protocol_version = "HTTP/1.1"
+
+    ROUTES = [
+        ("POST", re.compile(r"/locations/(\d+)/queue-management/tickets/generate/$"), "_generate_ticket"),
+        (
+            "POST", re.compile(r"/locations/(\d+)/queue-management/profiles/(\d+)/tickets/call-next/$"),
+            "_call_next_ticket"
+        ),
+        (
+            "PUT", re.compile(r"/locations/(\d+)/location-accesses/(\d+)/associate-counter/$"),
+            "_set_current_counter"
+        ),
+        (
+            "PUT", re.compile(r"/locations/(\d+)/queue-management/profiles/(\d+)/answerings/(\d+)/end/$"),
+            "_end_answering"
+        ),
+        (
+            "GET", re.compile(r"/locations/(\d+)/queue-management/profiles/(\d+)/answerings/current/$"),
+            "_get_current_answering"
+        ),
+        ("PUT", re.compile(r"/locations/(\d+)/queues/(\d+)/status/$"), "_set_queue_status"),
+        ("GET", re.compile(r"/locations/(\d+)/queues/$"), "_list_queues"),
+        ("POST", re.compile(r"/graphql/$"), "_graphql"),
+    ]
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def _dispatch(self, method: str) -> None:
+        mock = self.server.mock
+        url = urlparse(self.path)
+        self.query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+
+        if not self.headers.get("Authorization", "").startswith("Api-Key "):
+            return self._send(401, {
+                "detail": "Authentication credentials were not provided."
+            })
+
+        error_status = mock._before_response()
+        if error_status:
+            return self._send(error_status, {
+                "detail": "Injected error."
+            })
+
+        for route_method, pattern, handler_name in self.ROUTES:
+            match = pattern.search(url.path)
+            if match and route_method == method:
+                return getattr(self, handler_name)(mock, *[int(group) for group in match.groups()])
+        self._send(404, {
+            "detail": "Not found."
+        })
+
+    def _form_data(self) -> dict:
+        return {key: values[0] for key, values in parse_qs(self.body.decode('utf-8')).items()}
+
+    def _send(self, status: int, data: Optional[object]) -> None:
+        body = json.dumps(data).encode('utf-8') if data is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _generate_ticket(self, mock: MockQubeServer, location_id: int) -> None:
+        data = self._form_data()
+        queue_id = int(data.get("queue", 0))
+        if not 1 <= queue_id <= mock.queues_count:
+            return self._send(400, {
+                "detail": "Invalid queue."
+            })
+        self._send(201, mock.build_ticket(location_id, queue_id, data.get("priority") == "True"))
+
+    def _call_next_ticket(self, mock: MockQubeServer, location_id: int, profile_id: int) -> None:
+        self._send(201, mock.build_answering(location_id, profile_id))
+
+    def _set_current_counter(self, mock: MockQubeServer, location_id: int, location_access_id: int) -> None:
+        counter_id = int(self._form_data().get("counter", 1))
+        self._send(200, mock.build_location_access(location_id, location_access_id, counter_id))
+
+    def _end_answering(self, mock: MockQubeServer, location_id: int, profile_id: int, answering_id: int) -> None:
+        answering = mock.end_answering(profile_id, answering_id)
+        if answering is None:
+            return self._send(400, {
+                "sub_type": "already_processed"
+            })
+        self._send(200, answering)
+
+    def _get_current_answering(self, mock: MockQubeServer, location_id: int, profile_id: int) -> None:
+        self._send(200, mock.get_current_answering(profile_id))
+
+    def _set_queue_status(self, mock: MockQubeServer, location_id: int, queue_id: int) -> None:
+        self._send(200, mock.set_queue_status(location_id, queue_id, self._form_data().get("is_active") == "True"))
+
+    def _list_queues(self, mock: MockQubeServer, location_id: int) -> None:
+        filters = dict(self.query)
+        page = int(filters.pop("page", 1))
+        page_size = int(filters.pop("page_size", 10))
+        self._send(200, mock.list_queues(location_id, page, page_size, filters))
+
+    def _graphql(self, mock: MockQubeServer) -> None:
+        body = json.loads(self.body)
+        self._send(200, mock.execute_graphql(body.get("query", ""), body.get("variables")))
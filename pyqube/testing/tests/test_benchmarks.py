@@ -0,0 +1,55 @@
+import unittest
+
+from pyqube.testing.benchmarks import BENCHMARKS, main
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_global_ids_benchmark(self):
+        """Test that the benchmark measures every decoder"""
+        results = BENCHMARKS["global_ids"](page_size=100, repeat=1)
+
+        self.assertEqual(set(results), {"base64", "decode_edges"})
+        self.assertTrue(all(seconds > 0 for seconds in results.values()))
+
+    def test_main_with_unknown_benchmark(self):
+        """Test that unknown benchmarks are refused"""
+        with self.assertRaises(SystemExit):
+            main(["unknown"])
+
+    def test_json_benchmark(self):
+        """Test that the benchmark measures every JSON backend on every payload"""
+        results = BENCHMARKS["json"](messages=200, repeat=1)
+
+        self.assertIn("ticket decode+json", results)
+        self.assertIn("queues_page json", results)
+
+    def test_decoders_benchmark(self):
+        """Test that the benchmark measures both variants of every model"""
+        results = BENCHMARKS["decoders"](messages=50, repeat=1)
+
+        self.assertEqual(len(results), 6)
+
+    def test_queue_metrics_benchmark(self):
+        """Test that the benchmark measures objects and batches"""
+        results = BENCHMARKS["queue_metrics"](queues=10, messages=2, repeat=1)
+
+        self.assertEqual(set(results), {"objects", "batch"})
+
+    def test_spool_benchmark(self):
+        """Test that the benchmark measures both commit strategies and reads"""
+        results = BENCHMARKS["spool"](messages=10, repeat=1)
+
+        self.assertEqual(set(results), {"fsync_each", "group_commit", "mmap_read"})
+
+    def test_sqlite_sink_benchmark(self):
+        """Test that the benchmark measures row by row inserts and the sink"""
+        results = BENCHMARKS["sqlite_sink"](messages=10, repeat=1)
+
+        self.assertEqual(set(results), {"row_by_row", "sink"})
+
+    def test_import_time_benchmark(self):
+        """Test that the benchmark measures every import"""
+        results = BENCHMARKS["import_time"](repeat=1)
+
+        self.assertEqual(set(results), {"pyqube", "pyqube.types", "QubeClient"})
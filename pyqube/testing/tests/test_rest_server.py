@@ -0,0 +1,98 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from pyqube.rest.clients import RestClient
+from pyqube.rest.exceptions import InternalServerError
+from pyqube.testing.load_test import (
+    build_operation,
+    main,
+    percentile,
+    run_load_test,
+)
+from pyqube.testing.rest_server import MockQubeServer
+from pyqube.types import Answering, Queue, Ticket
+
+
+class TestMockQubeServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockQubeServer(queues_count=25).start()
+        self.addCleanup(self.server.stop)
+        self.qube_rest_client = RestClient("api_key", 1, base_url=self.server.base_url)
+        self.manager = self.qube_rest_client.get_queue_management_manager()
+
+    def test_list_queues_pages(self):
+        """Test that list queues is paginated according to the configured number of queues"""
+        pages = list(self.manager.list_queues(page_size=10))
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertIsInstance(pages[0][0], Queue)
+        self.assertEqual([queue.id for page in pages for queue in page], list(range(1, 26)))
+
+    def test_list_queues_of_queues_list_follows_cursors(self):
+        """Test that GraphQL cursor pagination returns every Queue of the QueuesList once"""
+        pages = list(self.manager.list_queues_of_queues_list(1, page_size=10))
+
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([queue.id for page in pages for queue in page], list(range(1, 26)))
+        self.assertEqual(pages[0][0].location, 1)
+
+    def test_queue_management_flow(self):
+        """Test the ticket and answering endpoints"""
+        ticket = self.manager.generate_ticket(1, False)
+        self.assertIsInstance(ticket, Ticket)
+
+        self.assertIsNone(self.manager.get_current_answering(1))
+        answering = self.manager.call_next_ticket_ending_current(1)
+        self.assertIsInstance(answering, Answering)
+        self.assertEqual(self.manager.get_current_answering(1).id, answering.id)
+
+        ended_answering = self.manager.end_answering(1, answering.id)
+        self.assertEqual(ended_answering.finish_reason, 6)
+        self.assertIsNone(self.manager.get_current_answering(1))
+
+        location_access = self.manager.set_current_counter(1, 7)
+        self.assertEqual(location_access.current_counter.id, 7)
+
+        self.assertFalse(self.manager.set_queue_status(3, False).is_active)
+
+    def test_injected_errors(self):
+        """Test that error rate makes the server answer with the configured error status"""
+        self.server.error_rate = 1.0
+
+        with self.assertRaises(InternalServerError):
+            self.manager.generate_ticket(1, False)
+        self.assertEqual(self.server.error_count, 1)
+
+
+class TestLoadTest(unittest.TestCase):
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([], 99), 0.0)
+
+    def test_run_load_test_reports_throughput_and_errors(self):
+        """Test that the load test driver counts operations, errors and latencies"""
+        with MockQubeServer(queues_count=5, error_rate=0.5, seed=1) as server:
+            client = RestClient("api_key", 1, base_url=server.base_url)
+            report = run_load_test(build_operation(client, "generate_ticket", 10), operations=40, concurrency=4)
+
+        self.assertEqual(report.operations, 40)
+        self.assertEqual(report.errors, server.error_count)
+        self.assertEqual(len(report.latencies), 40)
+        self.assertGreater(report.throughput, 0)
+        self.assertLessEqual(report.p50, report.p99)
+
+    def test_main_with_connection_pool(self):
+        """Test that the command line driver runs the load test through a shared session"""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            report = main(["--operations", "20", "--concurrency", "4", "--queues", "5", "--pool-size", "4"])
+
+        self.assertEqual(report.operations, 20)
+        self.assertEqual(report.errors, 0)
+        self.assertIn("http_requests=20", output.getvalue())
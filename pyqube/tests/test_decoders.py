@@ -0,0 +1,129 @@
+import unittest
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from pyqube.decoders import compile_decoder, decode, decode_list, get_decoder
+from pyqube.testing.rest_server import MockQubeServer
+from pyqube.types import (
+    Answering,
+    Counter,
+    LocationAccessWithCurrentCounter,
+    Queue,
+    QueueGeneralDetails,
+    QueueWithWaitingTickets,
+    Ticket,
+)
+
+
+@dataclass
+class Item:
+    id: int
+    name: Optional[str]
+    tags: List[str] = field(default_factory=list)
+    quantity: int = 1
+
+
+class TestDecoders(unittest.TestCase):
+
+    def setUp(self):
+        self.server = MockQubeServer()
+        self.ticket_data = self.server.build_ticket(1, 2, False)
+
+    def test_decode_equals_initialization(self):
+        """Test that decoded models are equal to models initialized with the same data"""
+        self.assertEqual(decode(Ticket, self.ticket_data), Ticket(**self.ticket_data))
+        queue_data = self.server.build_queue(1, 3)
+        self.assertEqual(decode(Queue, queue_data), Queue(**queue_data))
+
+    def test_decode_converts_datetimes(self):
+        """Test that __post_init__ conversions are applied"""
+        ticket = decode(Ticket, self.ticket_data)
+
+        self.assertIsInstance(ticket.created_at, datetime)
+        self.assertIsInstance(ticket.updated_at, datetime)
+
+    def test_decode_ignores_unknown_fields(self):
+        """Test that fields added by the server don't break decoding"""
+        ticket = decode(Ticket, {**self.ticket_data, "new_field": "value"})
+
+        self.assertEqual(ticket, Ticket(**self.ticket_data))
+        self.assertFalse(hasattr(ticket, "new_field"))
+
+    def test_decode_missing_fields(self):
+        """Test that missing fields take their defaults, None if Optional, or raise TypeError otherwise"""
+        self.assertEqual(decode(Item, {"id": 1}), Item(id=1, name=None))
+
+        with self.assertRaises(TypeError) as context:
+            decode(Item, {"name": "item"})
+        self.assertIn("['id']", str(context.exception))
+
+    def test_decode_default_factory_is_not_shared(self):
+        """Test that default factories create a new value for each instance"""
+        first_item, second_item = decode_list(Item, [{"id": 1}, {"id": 2}])
+
+        first_item.tags.append("tag")
+
+        self.assertEqual(second_item.tags, [])
+
+    def test_decode_from_other_type(self):
+        """Test that data that is not a dict raises TypeError"""
+        with self.assertRaises(TypeError):
+            decode(Item, [1, 2])
+
+    def test_decode_nested_models(self):
+        """Test that nested models are decoded, ignoring their unknown fields"""
+        answering_data = self.server.build_answering(1, 1)
+        answering_data["ticket"]["new_field"] = "value"
+
+        answering = decode(Answering, answering_data)
+
+        self.assertIsInstance(answering.ticket, Ticket)
+        self.assertIsInstance(answering.ticket.created_at, datetime)
+
+        location_access = decode(LocationAccessWithCurrentCounter, self.server.build_location_access(1, 1, 7))
+        self.assertIsInstance(location_access.current_counter, Counter)
+        self.assertEqual(location_access.current_counter.id, 7)
+
+        queue_with_waiting_tickets = decode(
+            QueueWithWaitingTickets, {
+                "queue": {
+                    "id": 1,
+                    "tag": "A",
+                    "name": "Queue A",
+                    "new_field": "value",
+                },
+                "waiting_tickets": 3,
+            }
+        )
+        self.assertEqual(queue_with_waiting_tickets.queue, QueueGeneralDetails(id=1, tag="A", name="Queue A"))
+
+    def test_decoders_are_compiled_once(self):
+        """Test that each model's decoder is compiled once"""
+        self.assertIs(get_decoder(Ticket), get_decoder(Ticket))
+
+    def test_decode_with_hook(self):
+        """Test that models with a decode classmethod are decoded by it"""
+
+        class Custom:
+
+            def __init__(self, value):
+                self.value = value
+
+            @classmethod
+            def decode(cls, data):
+                return cls(data["nested"]["value"])
+
+        self.assertEqual(decode(Custom, {"nested": {"value": 3}}).value, 3)
+
+    def test_decode_other_classes(self):
+        """Test that classes that are not dataclasses are initialized with the data"""
+
+        class Plain:
+
+            def __init__(self, value):
+                self.value = value
+
+        self.assertEqual(compile_decoder(Plain)({"value": 3}).value, 3)
+        with self.assertRaises(TypeError):
+            decode(Plain, {"value": 3, "unknown": 4})
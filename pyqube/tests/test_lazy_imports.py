@@ -0,0 +1,48 @@
+import subprocess
+import sys
+import unittest
+
+import pyqube
+
+
+def imported_transports(statement: str) -> list:
+    """Runs a statement in a fresh interpreter and returns the transport packages it imported."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys; {statement}; print(','.join(m for m in ('paho', 'requests') if m in sys.modules))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return [module for module in result.stdout.strip().split(",") if module]
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_import_pyqube_does_not_import_transports(self):
+        """Test that importing the package doesn't import paho-mqtt nor requests"""
+        self.assertEqual(imported_transports("import pyqube"), [])
+
+    def test_import_types_does_not_import_transports(self):
+        """Test that models can be used without importing the transports"""
+        self.assertEqual(imported_transports("import pyqube.types, pyqube.decoders, pyqube.events.handlers"), [])
+
+    def test_rest_client_does_not_import_paho(self):
+        """Test that REST-only processes don't import paho-mqtt"""
+        self.assertEqual(imported_transports("from pyqube.rest.clients import RestClient"), ["requests"])
+
+    def test_qube_client_is_loaded_on_first_use(self):
+        """Test that QubeClient is imported from its module when it is first accessed"""
+        self.assertEqual(imported_transports("from pyqube import QubeClient"), ["paho", "requests"])
+
+        from pyqube.client import QubeClient
+        self.assertIs(pyqube.QubeClient, QubeClient)
+        self.assertIn("QubeClient", dir(pyqube))
+
+    def test_unknown_attribute_raises_attribute_error(self):
+        """Test that unknown names of the package still raise AttributeError"""
+        with self.assertRaises(AttributeError):
+            pyqube.UnknownClient
@@ -0,0 +1,44 @@
+import json
+import unittest
+
+from pyqube import serialization
+from pyqube.serialization import JSON_BACKENDS, get_json_backend, loads, set_json_backend
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(set_json_backend, get_json_backend())
+
+    def test_default_backend(self):
+        """Test that orjson is used when it is installed"""
+        expected_backend = "orjson" if serialization.orjson is not None else "json"
+        self.assertEqual(get_json_backend(), expected_backend)
+
+    def test_loads_every_input_type(self):
+        """Test that every backend parses bytes, bytearray, memoryview and str"""
+        document = '{"name": "Fila é", "tags": [1, 2]}'
+        expected = {
+            "name": "Fila é",
+            "tags": [1, 2],
+        }
+        for backend in JSON_BACKENDS:
+            set_json_backend(backend)
+            encoded = document.encode('utf-8')
+            for data in (encoded, bytearray(encoded), memoryview(encoded), document):
+                with self.subTest(backend=backend, type=type(data).__name__):
+                    self.assertEqual(loads(data), expected)
+
+    def test_loads_invalid_documents(self):
+        """Test that invalid JSON and invalid UTF-8 raise JSONDecodeError with every backend"""
+        for backend in JSON_BACKENDS:
+            set_json_backend(backend)
+            for data in (b"{invalid", b'"\xff"'):
+                with self.subTest(backend=backend, data=data):
+                    with self.assertRaises(json.JSONDecodeError):
+                        loads(data)
+
+    def test_set_unknown_backend(self):
+        """Test that unknown backends are refused"""
+        with self.assertRaises(ValueError):
+            set_json_backend("unknown")
@@ -1,6 +1,9 @@
+from array import array
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
+
+from pyqube.decoders import decode
 
 
 def convert_str_to_datetime(dt_str: str) -> datetime:
@@ -13,11 +16,11 @@ def convert_str_to_datetime(dt_str: str) -> datetime:
     """
     try:
         if dt_str.endswith("Z"):
-            # Handle format with 'Z' as UTC indicator
-            return datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%S.%fZ")
+            # Handle format with 'Z' as UTC indicator, returning a naive datetime
+            return datetime.fromisoformat(dt_str[:-1])
         else:
             # Handle format with explicit timezone offset
-            return datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%S.%f%z")
+            return datetime.fromisoformat(dt_str)
     except ValueError as e:
         raise ValueError(f"Invalid datetime format: {dt_str}") from e
 
@@ -113,6 +116,10 @@ class Answering:
     local_runner: Optional[int]
     transferred_from_answering: Optional[int]
 
+    def __post_init__(self):
+        if isinstance(self.ticket, dict):
+            self.ticket = decode(Ticket, self.ticket)
+
 
 @dataclass
 class AnsweringTicket:
@@ -185,6 +192,114 @@ class QueueWithWaitingTickets:
     waiting_tickets: int
 
 
+class QueuesMetricBatch:
+    """
+    Columnar representation of a payload with one metric per queue (a list of `{"queue": {...}, <metric>: value}`).
+    Instead of one object per queue, it keeps the ids of the queues and their values in two compact arrays, which can
+    be exported to NumPy without copies.
+    """
+
+    metric = None  # Key of the metric in each item of the payload
+    typecode = "q"  # Typecode of the array of values
+
+    __slots__ = ("queue_ids", "values", "_indexes")
+
+    def __init__(self, queue_ids: array, values: array):
+        self.queue_ids = queue_ids
+        self.values = values
+        self._indexes = None
+
+    @classmethod
+    def decode(cls, data: list) -> "QueuesMetricBatch":
+        """
+        Decodes a payload into columns, in one pass over its items.
+        Args:
+            data (list): Parsed payload.
+        Returns:
+            QueuesMetricBatch: The batch.
+        Raises:
+            TypeError: If the payload is not a list of items with the queue and the metric.
+        """
+        if not isinstance(data, list):
+            raise TypeError(f"{cls.__name__} must be decoded from a list, not {type(data).__name__}")
+        try:
+            queue_ids = array("q", [item["queue"]["id"] for item in data])
+            values = array(cls.typecode, [item[cls.metric] for item in data])
+        except (KeyError, TypeError) as e:
+            raise TypeError(f"Invalid item of {cls.__name__}: {e}") from None
+        return cls(queue_ids, values)
+
+    def __len__(self) -> int:
+        return len(self.queue_ids)
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        return zip(self.queue_ids, self.values)
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.queue_ids == other.queue_ids and self.values == other.values
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)})"
+
+    def get(self, queue_id: int, default=None):
+        """
+        Gets the value of a queue.
+        Args:
+            queue_id (int): Queue's id.
+            default (optional): Value returned if the queue is not in the batch. Defaults to None.
+        """
+        if self._indexes is None:
+            self._indexes = {queue_id: index for index, queue_id in enumerate(self.queue_ids)}
+        index = self._indexes.get(queue_id)
+        return default if index is None else self.values[index]
+
+    def to_numpy(self):
+        """
+        Exports the columns as NumPy arrays that share memory with the batch (NumPy is an optional dependency).
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: Queues' ids and values.
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("NumPy is needed to export batches, install it with `pip install numpy`.") from e
+        return (
+            numpy.frombuffer(self.queue_ids, dtype=numpy.int64),
+            numpy.frombuffer(self.values, dtype=numpy.float64 if self.typecode == "d" else numpy.int64),
+        )
+
+
+class QueuesWaitingTicketsBatch(QueuesMetricBatch):
+    """
+    Columnar representation of the 'changed waiting number' event: number of waiting tickets of each queue.
+    """
+
+    metric = "waiting_tickets"
+    __slots__ = ()
+
+    @property
+    def waiting_tickets(self) -> array:
+        return self.values
+
+
+class QueuesAverageWaitingTimeBatch(QueuesMetricBatch):
+    """
+    Columnar representation of the 'changed average waiting time' event: average waiting time of each queue.
+    """
+
+    metric = "average_waiting_time"
+    typecode = "d"
+    __slots__ = ()
+
+    @property
+    def average_waiting_time(self) -> array:
+        return self.values
+
+
 @dataclass
 class Counter:
     """
@@ -224,6 +339,10 @@ class LocationAccessWithCurrentCounter:
     updated_at: Optional[datetime]
     deleted_at: Optional[datetime]
 
+    def __post_init__(self):
+        if isinstance(self.current_counter, dict):
+            self.current_counter = decode(Counter, self.current_counter)
+
 
 @dataclass
 class Queue: